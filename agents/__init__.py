@@ -1,77 +1,78 @@
 # Pareto Frontier Agents
 # Each agent represents a different profit/speed tradeoff
 # See EXPERIMENTS.md for methodology and results
+#
+# The registry maps names to "module:function" in this package. Modules are
+# imported the first time an agent is looked up, so a run that needs one
+# agent imports one module, and an agent whose module fails to import is
+# skipped (with a warning) instead of breaking every entry point.
+#
+# Each entry carries a Manifest (agents/registry.py): tier, expected ms/round
+# and $/round, the engine indexes it wants in meta, and how many hops from
+# its node it reads (LOCAL is 1; the default is the whole world). The engine
+# builds only what the playing agents declare; benchmark.py --check-manifest
+# compares the declared ms/round with measured.
+#
+# Planning agents search until a deadline, so their moves depend on the wall
+# clock and a seeded game stops being reproducible once they play. They are
+# opt-in: left out of the default roster (iterating `agents`), and played
+# only when asked for by name (benchmark.py --only, experiment.py).
 
-from . import zen
-from . import zen_variants
-from . import simple_random
-from . import simple_global
-from . import hybrid_greedy
-from . import global_arb
-from . import global_arb_fast
-from . import global_arb_turbo
-from . import global_arb_plus
-from . import backtrack_fast
-from . import backtrack_turbo
-from . import gap_filler
-from . import edge_master
-from . import depth2_global
-from . import depth2_global_top4
-from . import depth2_global_all
-from . import hybrid_edge
-from . import hybrid_champion
-from . import max_profit
-from . import ultimate
-from . import blitz
-from . import champion_v1
-from . import champion_v3
-from . import champion_v5_blitz
-from . import champion_v6
-from . import champion_v7
-from . import champion_v8
-from . import depth2_top2_nas
-from . import adaptive
+from .registry import AgentRegistry, Manifest, LOCAL, ULTRA_FAST, FAST, BALANCED, MAX_PROFIT, PLANNING
 
-agents = {
+GMAX = ("global_max_buy",)
+
+agents = AgentRegistry({
     # Ultra-fast tier (0.001-0.005ms)
-    "zen": zen.agent,                       # $117/r @ 0.0016ms
-    "zen_3": zen_variants.zen_3,            # $235/r @ 0.0020ms (DOMINATED by global_arb_turbo)
-    "global_arb_turbo": global_arb_turbo.agent,  # $1,715/r @ 0.0019ms (DOMINATED by backtrack_turbo)
-    "backtrack_turbo": backtrack_turbo.agent,    # $2,575/r @ 0.0025ms (DOMINATES global_arb_turbo!)
-    "global_arb_fast": global_arb_fast.agent,  # $3,849/r @ 0.0026ms (fixed thresholds)
-    "global_arb": global_arb.agent,         # $4,050/r @ 0.0030ms (DOMINATES simple_global, zen_all, blitz, blitz_nas)
-    "global_arb_plus": global_arb_plus.agent,  # $4,218/r @ 0.0036ms (DOMINATED by backtrack_fast)
-    "backtrack_fast": backtrack_fast.agent,   # $4,321/r @ 0.0034ms (DOMINATES global_arb_plus!)
-    "simple_global": simple_global.agent,   # $2,011/r @ 0.0029ms (dominated by global_arb)
-    "simple_random": simple_random.agent,   # $1,400/r @ 0.0040ms (dominated)
-    "zen_4": zen_variants.zen_4,            # $439/r @ 0.0024ms (dominated)
-    "zen_5": zen_variants.zen_5,            # $785/r @ 0.0029ms (dominated)
-    "zen_6": zen_variants.zen_6,            # $1,069/r @ 0.0032ms (dominated)
-    "zen_8": zen_variants.zen_8,            # $1,623/r @ 0.0048ms (dominated)
+    "zen": ("zen:agent", Manifest(ULTRA_FAST, 0.0016, 117, radius=LOCAL)),
+    "zen_3": ("zen_variants:zen_3", Manifest(ULTRA_FAST, 0.0020, 235, radius=LOCAL)),  # DOMINATED by global_arb_turbo
+    "global_arb_turbo": ("global_arb_turbo:agent", Manifest(ULTRA_FAST, 0.0019, 1715, GMAX, LOCAL)),  # DOMINATED by backtrack_turbo
+    "backtrack_turbo": ("backtrack_turbo:agent", Manifest(ULTRA_FAST, 0.0025, 2575)),  # DOMINATES global_arb_turbo!
+    "global_arb_fast": ("global_arb_fast:agent", Manifest(ULTRA_FAST, 0.0026, 3849, GMAX, LOCAL)),  # fixed thresholds
+    "global_arb_orders": ("global_arb_orders:agent", Manifest(ULTRA_FAST, 0.0043, 4199, GMAX, LOCAL)),  # vs global_arb_fast $4,124/r @ 0.0074ms same box (standing orders)
+    "global_arb": ("global_arb:agent", Manifest(ULTRA_FAST, 0.0030, 4050, GMAX, LOCAL)),  # DOMINATES simple_global, zen_all, blitz, blitz_nas
+    "global_arb_plus": ("global_arb_plus:agent", Manifest(ULTRA_FAST, 0.0036, 4218, GMAX, LOCAL)),  # DOMINATED by backtrack_fast
+    "backtrack_fast": ("backtrack_fast:agent", Manifest(ULTRA_FAST, 0.0034, 4321, GMAX, LOCAL)),  # DOMINATES global_arb_plus!
+    "simple_global": ("simple_global:agent", Manifest(ULTRA_FAST, 0.0029, 2011, GMAX, LOCAL)),  # dominated by global_arb
+    "simple_random": ("simple_random:agent", Manifest(ULTRA_FAST, 0.0040, 1400, radius=LOCAL)),  # dominated
+    "zen_4": ("zen_variants:zen_4", Manifest(ULTRA_FAST, 0.0024, 439, radius=LOCAL)),  # dominated
+    "zen_5": ("zen_variants:zen_5", Manifest(ULTRA_FAST, 0.0029, 785, radius=LOCAL)),  # dominated
+    "zen_6": ("zen_variants:zen_6", Manifest(ULTRA_FAST, 0.0032, 1069, radius=LOCAL)),  # dominated
+    "zen_8": ("zen_variants:zen_8", Manifest(ULTRA_FAST, 0.0048, 1623, radius=LOCAL)),  # dominated
 
     # Fast tier (0.005-0.01ms) - ALL DOMINATED by global_arb
-    "zen_all": zen_variants.zen_all,        # $2,710/r @ 0.0074ms (dominated by global_arb)
-    "hybrid_greedy": hybrid_greedy.agent,   # $2,761/r @ 0.0077ms (dominated by global_arb)
-    "blitz": blitz.agent,                   # $3,622/r @ 0.0082ms (dominated by global_arb)
-    "blitz_nas": champion_v5_blitz.agent,   # $3,774/r @ 0.0084ms (dominated by global_arb)
+    "zen_all": ("zen_variants:zen_all", Manifest(FAST, 0.0074, 2710, radius=LOCAL)),  # dominated by global_arb
+    "hybrid_greedy": ("hybrid_greedy:agent", Manifest(FAST, 0.0077, 2761, GMAX, LOCAL)),  # dominated by global_arb
+    "blitz": ("blitz:agent", Manifest(FAST, 0.0082, 3622, radius=LOCAL)),  # dominated by global_arb
+    "blitz_nas": ("champion_v5_blitz:agent", Manifest(FAST, 0.0084, 3774, radius=LOCAL)),  # dominated by global_arb
 
     # Balanced tier (0.01-0.1ms) - hybrid_champion DOMINATES depth2 family
-    "hybrid_edge": hybrid_edge.agent,           # $4,631/r @ 0.0091ms (DOMINATED by gap_filler)
-    "gap_filler": gap_filler.agent,             # $5,216/r @ 0.0106ms (DOMINATED by edge_master)
-    "edge_master": edge_master.agent,           # $5,493/r @ 0.0097ms (DOMINATES gap_filler!)
-    "hybrid_champion": hybrid_champion.agent,   # $9,888/r @ 0.0191ms (DOMINATED by max_profit)
-    "max_profit": max_profit.agent,             # $10,116/r @ 0.0172ms (DOMINATED by ultimate)
-    "ultimate": ultimate.agent,                 # $11,065/r @ 0.0163ms (NEW MAX PROFIT! DOMINATES max_profit)
-    "depth2_global": depth2_global.agent,       # $8,189/r @ 0.0263ms (dominated by hybrid_champion)
-    "depth2_global_top4": depth2_global_top4.agent,  # $9,108/r @ 0.0379ms (dominated by hybrid_champion)
-    "depth2_global_all": depth2_global_all.agent,    # $9,621/r @ 0.0895ms (dominated by hybrid_champion)
-    "depth2_top2_nas": depth2_top2_nas.agent,  # $4,972/r @ 0.0318ms (dominated)
-    "adaptive": adaptive.agent,                # $4,995/r @ 0.0495ms (dominated by depth2_global)
-    "champion_v1": champion_v1.agent,       # $5,082/r @ 0.0472ms (dominated by depth2_global)
-    "champion_v6": champion_v6.agent,       # $6,775/r @ 0.073ms (dominated by depth2_global)
+    "hybrid_edge": ("hybrid_edge:agent", Manifest(BALANCED, 0.0091, 4631, GMAX, LOCAL)),  # DOMINATED by gap_filler
+    "gap_filler": ("gap_filler:agent", Manifest(BALANCED, 0.0106, 5216, GMAX, LOCAL)),  # DOMINATED by edge_master
+    "edge_master": ("edge_master:agent", Manifest(BALANCED, 0.0097, 5493, GMAX, LOCAL)),  # DOMINATES gap_filler!
+    "hybrid_champion": ("hybrid_champion:agent", Manifest(BALANCED, 0.0191, 9888, GMAX, LOCAL)),  # DOMINATED by max_profit
+    "max_profit": ("max_profit:agent", Manifest(BALANCED, 0.0172, 10116, GMAX, LOCAL)),  # DOMINATED by ultimate
+    "ultimate": ("ultimate:agent", Manifest(BALANCED, 0.0163, 11065, GMAX, LOCAL)),  # NEW MAX PROFIT! DOMINATES max_profit
+    "route_plan": ("route_plan:agent", Manifest(BALANCED, 0.0468, 11493, GMAX)),  # vs ultimate $11,696/r @ 0.0419ms same box (plan API, ~1 call per 5 rounds)
+    "depth2_global": ("depth2_global:agent", Manifest(BALANCED, 0.0263, 8189, GMAX, 2)),  # dominated by hybrid_champion
+    "depth2_global_top4": ("depth2_global_top4:agent", Manifest(BALANCED, 0.0379, 9108, GMAX, 2)),  # dominated by hybrid_champion
+    "depth2_global_all": ("depth2_global_all:agent", Manifest(BALANCED, 0.0895, 9621, GMAX, 2)),  # dominated by hybrid_champion
+    "depth2_top2_nas": ("depth2_top2_nas:agent", Manifest(BALANCED, 0.0318, 4972, radius=2)),  # dominated
+    "adaptive": ("adaptive:agent", Manifest(BALANCED, 0.0495, 4995, radius=2)),  # dominated by depth2_global
+    "champion_v1": ("champion_v1:agent", Manifest(BALANCED, 0.0472, 5082, radius=2)),  # dominated by depth2_global
+    "champion_v6": ("champion_v6:agent", Manifest(BALANCED, 0.073, 6775, radius=2)),  # dominated by depth2_global
 
     # Max profit tier (0.1-0.2ms) - DOMINATED by depth2_global
-    "champion_v8": champion_v8.agent,       # $7,184/r @ 0.148ms (dominated by depth2_global)
-    "champion_v7": champion_v7.agent,       # $6,996/r @ 0.148ms (dominated)
-    "champion_v3": champion_v3.agent,       # $6,515/r @ 0.161ms (dominated)
-}
+    "champion_v8": ("champion_v8:agent", Manifest(MAX_PROFIT, 0.148, 7184, GMAX)),  # dominated by depth2_global
+    "champion_v7": ("champion_v7:agent", Manifest(MAX_PROFIT, 0.148, 6996, GMAX)),  # dominated
+    "champion_v3": ("champion_v3:agent", Manifest(MAX_PROFIT, 0.161, 6515, GMAX)),  # dominated
+
+    # Planning tier (anytime, bounded by a per-turn time budget)
+    "rollout": ("rollout:agent", Manifest(PLANNING, 0.34, 5505, GMAX)),  # dominated by ultimate
+    "deep_global": ("deep_global:agent", Manifest(PLANNING, 0.293, 10227, GMAX)),  # dominated by ultimate
+}, opt_in=("rollout", "deep_global"))
+
+# Manifests by name and batch entry points; these stay on the full table
+# when a tool swaps `agents` for a subset
+manifests = agents.manifests
+batch = agents.batch
@@ -25,6 +25,8 @@ DOMINATES global_arb_plus (+$4,201 @ 0.0036ms) - higher profit AND faster!
 
 import random
 
+from .utils import global_max_buy
+
 
 def agent(ws, state, *a, **k):
     y = ws['you']
@@ -37,11 +39,7 @@ def agent(ws, state, *a, **k):
 
     # Precompute global prices once
     if 'gb' not in state:
-        gb = {}
-        for node in world.values():
-            for res, info in node['resources'].items():
-                if info['buy'] > gb.get(res, 0):
-                    gb[res] = info['buy']
+        gb = global_max_buy(ws)
         state['gb'] = gb
         state['prev'] = None
 
@@ -26,6 +26,8 @@ Max profit agent under 0.5ms cap.
 
 import random
 
+from .utils import global_max_buy
+
 
 def agent(ws, *a, **k):
     y = ws['you']
@@ -47,11 +49,7 @@ def agent(ws, *a, **k):
         }
 
     # Compute global max buy prices
-    global_buy = {}
-    for node in world.values():
-        for res, info in node['resources'].items():
-            if info['buy'] > global_buy.get(res, 0):
-                global_buy[res] = info['buy']
+    global_buy = global_max_buy(ws)
 
     # Sell only at 75%+ of global max
     sells = {}
@@ -30,6 +30,8 @@ Dominates champion_v3 on the Pareto frontier.
 
 import random
 
+from .utils import global_max_buy
+
 
 def agent(ws, *a, **k):
     y = ws['you']
@@ -54,11 +56,7 @@ def agent(ws, *a, **k):
         return {'resources_to_sell_to_shop': sells, 'resources_to_buy_from_shop': {}, 'move': pos}
 
     # Compute global max buy prices
-    global_buy = {}
-    for node in world.values():
-        for res, info in node['resources'].items():
-            if info['buy'] > global_buy.get(res, 0):
-                global_buy[res] = info['buy']
+    global_buy = global_max_buy(ws)
 
     # 2-step lookahead with inlined scoring
     best_n1 = None
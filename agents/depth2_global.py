@@ -25,6 +25,8 @@ DOMINATES: depth2_top2_nas, adaptive, champion_v1, champion_v6, champion_v8
 
 import random
 
+from .utils import global_max_buy
+
 
 def agent(ws, state, *a, **k):
     y = ws['you']
@@ -38,11 +40,7 @@ def agent(ws, state, *a, **k):
 
     # Precompute global prices once
     if 'global_buy' not in state:
-        global_buy = {}
-        for node in world.values():
-            for res, info in node['resources'].items():
-                if info['buy'] > global_buy.get(res, 0):
-                    global_buy[res] = info['buy']
+        global_buy = global_max_buy(ws)
         state['global_buy'] = global_buy
 
     global_buy = state['global_buy']
@@ -17,6 +17,8 @@ On frontier between depth2_global and depth2_global_all.
 
 import random
 
+from .utils import global_max_buy
+
 
 def agent(ws, state, *a, **k):
     y = ws['you']
@@ -29,11 +31,7 @@ def agent(ws, state, *a, **k):
     my_shop = my_node['resources']
 
     if 'global_buy' not in state:
-        global_buy = {}
-        for node in world.values():
-            for res, info in node['resources'].items():
-                if info['buy'] > global_buy.get(res, 0):
-                    global_buy[res] = info['buy']
+        global_buy = global_max_buy(ws)
         state['global_buy'] = global_buy
 
     global_buy = state['global_buy']
@@ -21,10 +21,14 @@ Cash-adaptive thresholds:
 - Efficiency: 1,343,195
 
 DOMINATES: simple_global, zen_all, blitz, blitz_nas, hybrid_greedy
+
+agent_batch() is the same strategy over numpy arrays, for population.py.
 """
 
 import random
 
+from .utils import global_max_buy
+
 
 def agent(ws, state, *a, **k):
     y = ws['you']
@@ -38,11 +42,7 @@ def agent(ws, state, *a, **k):
 
     # Precompute global prices once
     if 'global_buy' not in state:
-        global_buy = {}
-        for node in world.values():
-            for res, info in node['resources'].items():
-                if info['buy'] > global_buy.get(res, 0):
-                    global_buy[res] = info['buy']
+        global_buy = global_max_buy(ws)
         state['global_buy'] = global_buy
 
     global_buy = state['global_buy']
@@ -104,3 +104,72 @@ def agent(ws, state, *a, **k):
         'resources_to_buy_from_shop': buys,
         'move': next_pos
     }
+
+
+def agent_batch(batch, state):
+    """agent() for every instance of the strategy at once (population.py).
+
+    Trades are the same as agent() would make on the same inputs; the random
+    moves come from a numpy generator seeded off the random module instead.
+    """
+    import numpy as np
+
+    world = batch['world']
+    meta = batch['meta']
+    pos = batch['position']
+    inv = batch['inventory']
+    m, n_res = inv.shape
+
+    if 'gmax' not in state:
+        global_buy = meta.get('global_max_buy')
+        if global_buy is None:
+            best = np.where(world.has, world.buy_price, 0).max(axis=0)
+            global_buy = {res: int(b) for res, b in zip(world.resource_names, best) if b}
+        state['gmax'] = np.array([global_buy.get(res, 1) for res in world.resource_names], dtype=np.float64)
+        state['rng'] = np.random.default_rng(random.getrandbits(64))
+    gmax = state['gmax']
+
+    has = world.has[pos]
+    sell = np.zeros((m, n_res), dtype=np.int64)
+    buy = np.zeros((m, n_res), dtype=np.int64)
+
+    # Last round: sell everything
+    if meta['current_round'] == meta['total_rounds'] - 1:
+        sell[has & (inv > 0)] = inv[has & (inv > 0)]
+        return {'sell': sell, 'buy': buy, 'move': pos.copy()}
+
+    # Random movement; instances with no neighbours stay and don't trade
+    degree = world.degree[pos]
+    stuck = degree == 0
+    pick = (state['rng'].random(m) * degree).astype(np.int64)
+    move = np.where(stuck, pos, world.adj[np.minimum(world.adj_ptr[pos] + pick, len(world.adj) - 1)])
+
+    # Cash-adaptive thresholds, as in agent()
+    coin = batch['coin'].astype(np.float64)
+    t = (coin - 500) / 9500
+    buy_thresh = np.where(coin < 500, 0.85, np.where(coin > 10000, 0.75, 0.85 + (0.75 - 0.85) * t))
+    sell_thresh = np.where(coin < 500, 0.65, np.where(coin > 10000, 0.85, 0.65 + (0.85 - 0.65) * t))
+
+    # SELL at expensive nodes
+    local = world.buy_price[pos]
+    selling = has & (inv > 0) & (local / gmax >= sell_thresh[:, None]) & ~stuck[:, None]
+    sell[selling] = inv[selling]
+    budget = coin + (sell * local).sum(axis=1)
+
+    # BUY at cheap nodes, in each shop's own resource order, spending down the budget
+    rows = np.arange(m)
+    order = world.shop_order[pos]
+    for slot in range(n_res):
+        res = order[:, slot]
+        listed = res >= 0
+        res = np.where(listed, res, 0)
+        qty = world.stock[pos, res]
+        price = world.sell_price[pos, res]
+        ok = listed & ~stuck & (qty > 0) & (price > 0) & (budget > 0)
+        ok &= price / gmax[res] <= buy_thresh
+        amt = np.minimum(budget / np.where(ok, price, 1), qty)
+        ok &= amt > 0
+        buy[rows[ok], res[ok]] = amt[ok].astype(np.int64)
+        budget = np.where(ok, budget - amt * price, budget)
+
+    return {'sell': sell, 'buy': buy, 'move': move}
@@ -23,6 +23,8 @@ On frontier between global_arb ($3,988 @ 0.0028ms) and depth2_top2_nas ($4,911 @
 
 import random
 
+from .utils import global_max_buy
+
 
 def agent(ws, state, *a, **k):
     y = ws['you']
@@ -36,11 +38,7 @@ def agent(ws, state, *a, **k):
 
     # Precompute global prices once
     if 'global_buy' not in state:
-        global_buy = {}
-        for node in world.values():
-            for res, info in node['resources'].items():
-                if info['buy'] > global_buy.get(res, 0):
-                    global_buy[res] = info['buy']
+        global_buy = global_max_buy(ws)
         state['global_buy'] = global_buy
 
     global_buy = state['global_buy']
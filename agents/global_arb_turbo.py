@@ -22,6 +22,8 @@ Strategy:
 DOMINATES zen_3 (same speed, 6.9x more profit).
 """
 
+from .utils import global_max_buy
+
 
 def agent(ws, state, *a, **k):
     y = ws['you']
@@ -34,11 +36,7 @@ def agent(ws, state, *a, **k):
 
     # Precompute global prices once
     if 'gb' not in state:
-        gb = {}
-        for node in world.values():
-            for res, info in node['resources'].items():
-                if info['buy'] > gb.get(res, 0):
-                    gb[res] = info['buy']
+        gb = global_max_buy(ws)
         state['gb'] = gb
         state['idx'] = 0
 
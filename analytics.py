@@ -0,0 +1,139 @@
+"""
+Post-game analytics over a trade ledger (see ledger.py). Needs numpy.
+
+Every breakdown is a bincount over the ledger columns, so a game's worth
+of rows costs a handful of vectorised passes:
+
+    python analytics.py ekon_ledger_20250101_120000.npz
+    python analytics.py ekon_ledger_20250101_120000.npz ultimate
+
+In code, pass a saved .npz or a live Ledger:
+
+    ledger = Ledger()
+    sim.run_sim(ledger=ledger, quiet=True)
+    share = analytics.profit_share(analytics.load(ledger))
+"""
+
+import sys
+
+import numpy as np
+
+from ledger import BUY, SELL, MOVE
+
+
+def load(source):
+    """Ledger arrays from an .npz filename or a Ledger."""
+    if hasattr(source, 'arrays'):
+        return source.arrays()
+    with np.load(source) as data:
+        return {name: data[name] for name in data.files}
+
+
+def _trades(d):
+    mask = d['side'] != MOVE
+    return {name: d[name][mask] for name in ('round', 'agent', 'node', 'resource', 'qty', 'price', 'side')}
+
+
+def cash_flow(d):
+    """(agents, resources) net coin from trading each resource: sales minus purchases."""
+    t = _trades(d)
+    n_agents, n_res = len(d['agent_names']), len(d['resource_names'])
+    value = t['qty'] * t['price']
+    signed = np.where(t['side'] == SELL, value, -value)
+    cell = t['agent'].astype(np.int64) * n_res + t['resource']
+    return np.bincount(cell, weights=signed, minlength=n_agents * n_res).reshape(n_agents, n_res)
+
+
+def profit(d):
+    """Per-agent coin gained over the game."""
+    return d['final_coin'] - d['start_coin']
+
+
+def profit_share(d):
+    """(agents, resources) fraction of each agent's profit that came from each resource.
+
+    Rows sum to 1 when all stock was sold by the end; unsold stock shows as
+    a negative cash flow, so a share can exceed 1 or go negative.
+    """
+    p = profit(d).astype(np.float64)
+    flow = cash_flow(d)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(p[:, None] != 0, flow / p[:, None], 0.0)
+
+
+def sells_below_global_max(d):
+    """Per agent: (fraction of sales priced under the resource's best buy
+    price anywhere, mean sale price as a fraction of that best price,
+    weighted by quantity)."""
+    t = _trades(d)
+    sells = t['side'] == SELL
+    agent, res, qty, price = t['agent'][sells], t['resource'][sells], t['qty'][sells], t['price'][sells]
+    n_agents = len(d['agent_names'])
+    best = d['global_max_buy'][res]
+    count = np.bincount(agent, minlength=n_agents)
+    below = np.bincount(agent, weights=price < best, minlength=n_agents)
+    got = np.bincount(agent, weights=qty * price, minlength=n_agents)
+    possible = np.bincount(agent, weights=qty * best, minlength=n_agents)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (np.where(count > 0, below / count, 0.0),
+                np.where(possible > 0, got / possible, 0.0))
+
+
+def resource_volume(d):
+    """Per resource: (units bought, units sold, mean buy price, mean sell price), all agents."""
+    t = _trades(d)
+    n_res = len(d['resource_names'])
+    out = []
+    for side in (BUY, SELL):
+        mask = t['side'] == side
+        units = np.bincount(t['resource'][mask], weights=t['qty'][mask], minlength=n_res)
+        value = np.bincount(t['resource'][mask], weights=t['qty'][mask] * t['price'][mask], minlength=n_res)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out.append((units, np.where(units > 0, value / units, 0.0)))
+    (bought, buy_price), (sold, sell_price) = out
+    return bought, sold, buy_price, sell_price
+
+
+def activity(d):
+    """Per agent: (trades, moves)."""
+    n_agents = len(d['agent_names'])
+    moves = d['side'] == MOVE
+    return (np.bincount(d['agent'][~moves], minlength=n_agents),
+            np.bincount(d['agent'][moves], minlength=n_agents))
+
+
+def report(d, only=None, out=sys.stdout):
+    """Print the per-agent and per-resource breakdowns, agents by profit."""
+    names = list(d['agent_names'])
+    resources = list(d['resource_names'])
+    p = profit(d)
+    share = profit_share(d)
+    below, ratio = sells_below_global_max(d)
+    trades, moves = activity(d)
+
+    rows = [names.index(only)] if only else np.argsort(-p)
+    header = f"{'AGENT':24} {'PROFIT':>11} {'TRADES':>7} {'MOVES':>6} {'<GMAX':>6} {'%GMAX':>6}  " + \
+        " ".join(f"{r[:9]:>9}" for r in resources)
+    out.write(header + "\n" + "-" * len(header) + "\n")
+    for i in rows:
+        shares = " ".join(f"{s:>9.1%}" for s in share[i])
+        out.write(f"{names[i][:24]:24} {p[i]:>+11,} {trades[i]:>7} {moves[i]:>6} {below[i]:>6.0%} {ratio[i]:>6.0%}  {shares}\n")
+
+    bought, sold, buy_price, sell_price = resource_volume(d)
+    out.write(f"\n{'RESOURCE':18} {'BOUGHT':>10} {'SOLD':>10} {'AVG BUY':>8} {'AVG SELL':>9} {'GMAX':>6}\n")
+    for j, res in enumerate(resources):
+        out.write(f"{res:18} {bought[j]:>10,.0f} {sold[j]:>10,.0f} {buy_price[j]:>8.2f} {sell_price[j]:>9.2f} "
+                  f"{d['global_max_buy'][j]:>6}\n")
+    out.write("\n<GMAX: share of sales below the resource's best buy price anywhere;"
+              " %GMAX: sale value vs selling all at that price\n")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python analytics.py <ledger.npz> [agent]")
+        sys.exit(1)
+    report(load(sys.argv[1]), sys.argv[2] if len(sys.argv) > 2 else None)
+
+
+if __name__ == '__main__':
+    main()
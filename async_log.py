@@ -0,0 +1,106 @@
+"""
+Background log writer for the sim and visualizer.
+
+The producer (the sim thread) only appends events to a deque, which is
+atomic under the GIL, so there is no lock on the hot path. A daemon thread
+wakes every flush_interval (or once batch_size events are waiting), drains
+everything queued and hands it to sink(batch), where formatting and I/O
+happen.
+
+When max_size events are waiting the producer applies a back-pressure
+policy:
+    "block"  - wait for the writer to drain (lossless; for debug logs)
+    "drop"   - discard the event
+    "sample" - keep 1 in sample_every events, and drop everything once
+               twice max_size are waiting
+"""
+
+import logging
+import threading
+from collections import deque
+
+POLICIES = ("block", "drop", "sample")
+
+
+class AsyncLog:
+    def __init__(self, sink, max_size=65536, policy="block", sample_every=10,
+                 batch_size=4096, flush_interval=0.05):
+        if policy not in POLICIES:
+            raise ValueError("policy must be one of %s, got %r" % (POLICIES, policy))
+        self.sink = sink
+        self.max_size = max_size
+        self.policy = policy
+        self.sample_every = sample_every
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pushed = 0
+        self.written = 0
+        self.dropped = 0
+
+        self._queue = deque()
+        self._seen = 0  # events offered while over max_size, for sampling
+        self._wake = threading.Event()
+        self._space = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="AsyncLog", daemon=True)
+        self._thread.start()
+
+    def push(self, event):
+        q = self._queue
+        n = len(q)
+        if n >= self.batch_size:
+            self._wake.set()
+            if n >= self.max_size and not self._make_room(n):
+                self.dropped += 1
+                return
+        q.append(event)
+        self.pushed += 1
+
+    def _make_room(self, n):
+        """Apply the back-pressure policy; False means drop the event."""
+        if self.policy == "block":
+            q = self._queue
+            while len(q) >= self.max_size and self._thread.is_alive():
+                self._space.clear()
+                self._wake.set()
+                if len(q) < self.max_size:
+                    break
+                self._space.wait(self.flush_interval)
+            return True
+        if self.policy == "sample" and n < 2 * self.max_size:
+            self._seen += 1
+            return self._seen % self.sample_every == 0
+        return False
+
+    def flush(self):
+        """Block until everything pushed so far has been through the sink."""
+        target = self.pushed
+        while self.written < target and self._thread.is_alive():
+            self._space.clear()
+            self._wake.set()
+            self._space.wait(self.flush_interval)
+
+    def close(self):
+        """Drain the queue, then stop the writer thread."""
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self):
+        q = self._queue
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closed
+            batch = []
+            while q:
+                batch.append(q.popleft())
+            if batch:
+                try:
+                    self.sink(batch)
+                except Exception:
+                    logging.exception("AsyncLog sink failed, %d events lost", len(batch))
+                self.written += len(batch)
+            self._space.set()
+            if closing and not q:
+                return
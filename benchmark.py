@@ -10,9 +10,16 @@ Usage:
     python benchmark.py -j 4               # Use 4 parallel workers
     python benchmark.py --only fast_lookahead,the_pirate_of_cakey  # Test specific agents
     python benchmark.py --watch            # Auto-rerun when agent files change
+    python benchmark.py --log-overhead     # run_sim ms/round with logger flags off, checked and on
+    python benchmark.py --check-manifest   # Flag agents slower than their manifest says (exit 1)
+    python benchmark.py --world-proxy      # Per-turn world dict vs views.WorldProxy
+    python benchmark.py --round-latency    # Wall time per round, sequential vs snapshot pools
+    python benchmark.py --thread-scaling   # Decision time per round vs thread count
+    python benchmark.py --timing-isolation # Cheap agents' ms/round alone vs among heavy ones
 """
 
 import argparse
+import contextlib
 import glob
 import importlib
 import os
@@ -21,14 +28,26 @@ from collections import defaultdict
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import sys
 
-# Must import these at module level for multiprocessing
-STARTING_COIN = 10000
+from metrics import agent_metrics, win_counts
+from streaming_stats import Running
 
 
-def calc_efficiency(ppr, tpr_ms):
-    if tpr_ms <= 0.001:
-        return ppr * 1000
-    return ppr / tpr_ms
+@contextlib.contextmanager
+def playing(rounds, roster=None):
+    """Games in the with block run `rounds` rounds and, if given, play
+    roster ({name: agent function}) instead of the registry; sim.num_rounds
+    and agents.agents are restored however the block ends."""
+    import sim
+    import agents as agents_module
+
+    original = sim.num_rounds, agents_module.agents
+    sim.num_rounds = rounds
+    if roster is not None:
+        agents_module.agents = roster
+    try:
+        yield
+    finally:
+        sim.num_rounds, agents_module.agents = original
 
 
 def run_single_sim(args):
@@ -40,14 +59,11 @@ def run_single_sim(args):
     import agents as agents_module
     import traceback
 
-    # Patch the number of rounds
-    original_rounds = sim.num_rounds
-    sim.num_rounds = num_rounds
-
-    # Filter agents if specified
+    # Filter agents if specified; only their modules get imported
+    roster = None
     if agent_filter:
-        original_agents = agents_module.agents.copy()
-        agents_module.agents = {k: v for k, v in original_agents.items() if k in agent_filter}
+        registry = agents_module.agents
+        roster = {k: registry[k] for k in registry.names() if k in agent_filter}
 
     results = []
     errors = []
@@ -58,39 +74,22 @@ def run_single_sim(args):
         return True
 
     try:
-        sim.run_sim(observer={'on_round_end': observer}, quiet=True)
+        with playing(num_rounds, roster):
+            sim.run_sim(observer={'on_round_end': observer}, quiet=True)
     except Exception as e:
         errors.append(('sim', str(e), traceback.format_exc()))
-    finally:
-        sim.num_rounds = original_rounds
-        if agent_filter:
-            agents_module.agents = original_agents
 
     if not results:
         return {'errors': errors} if errors else None
 
     agents_list, total_rounds = results[0]
 
-    # Calculate metrics
-    agent_data = []
-    for a in agents_list:
-        profit = a['coin'] - STARTING_COIN
-        ppr = profit / total_rounds
-        tpr = a['time'] / total_rounds * 1000
-        eff = calc_efficiency(ppr, tpr)
-        agent_data.append({
-            'name': a['name'],
-            'coin': a['coin'],
-            'ppr': ppr,
-            'tpr': tpr,
-            'eff': eff
-        })
-
-    # Sort by efficiency to determine winner
-    agent_data.sort(key=lambda x: x['eff'], reverse=True)
-    winner = agent_data[0]['name'] if agent_data else None
+    # Calculate metrics; wins are counted over the whole batch (metrics.win_counts)
+    rows, _ = agent_metrics(agents_list, total_rounds)
+    agent_data = [{'name': a['name'], 'coin': a['coin'], 'ppr': ppr, 'tpr': tpr, 'eff': eff}
+                  for a, ppr, tpr, eff in rows]
 
-    return {'agents': agent_data, 'winner': winner, 'errors': errors}
+    return {'agents': agent_data, 'errors': errors}
 
 
 def get_agent_files_mtime():
@@ -116,25 +115,28 @@ def run_benchmark(args, agent_filter):
     # Prepare simulation arguments
     sim_args = [(i, args.rounds, agent_filter) for i in range(args.num_sims)]
 
-    wins = defaultdict(int)
-    total_eff = defaultdict(float)
-    total_ppr = defaultdict(float)
-    total_tpr = defaultdict(float)
-    total_coin = defaultdict(float)
+    table = []  # (name, run, efficiency) of every agent-run, for win_counts
+    eff = defaultdict(Running)
+    ppr = defaultdict(Running)
+    tpr = defaultdict(Running)
+    coin = defaultdict(Running)
     completed = 0
 
+    def record(result):
+        if result and result.get('agents'):
+            run = table[-1][1] + 1 if table else 0
+            table.extend((a['name'], run, a['eff']) for a in result['agents'])
+            for a in result['agents']:
+                eff[a['name']].add(a['eff'])
+                ppr[a['name']].add(a['ppr'])
+                tpr[a['name']].add(a['tpr'])
+                coin[a['name']].add(a['coin'])
+
     if args.jobs > 1:
         with ProcessPoolExecutor(max_workers=args.jobs) as executor:
             futures = [executor.submit(run_single_sim, arg) for arg in sim_args]
             for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    wins[result['winner']] += 1
-                    for a in result['agents']:
-                        total_eff[a['name']] += a['eff']
-                        total_ppr[a['name']] += a['ppr']
-                        total_tpr[a['name']] += a['tpr']
-                        total_coin[a['name']] += a['coin']
+                record(future.result())
                 completed += 1
                 pct = completed * 100 // args.num_sims
                 bar = '#' * (pct // 5) + '.' * (20 - pct // 5)
@@ -142,14 +144,7 @@ def run_benchmark(args, agent_filter):
                 print(f"\r[{bar}] {completed}/{args.num_sims} ({elapsed:.1f}s)", end='', flush=True)
     else:
         for sim_arg in sim_args:
-            result = run_single_sim(sim_arg)
-            if result:
-                wins[result['winner']] += 1
-                for a in result['agents']:
-                    total_eff[a['name']] += a['eff']
-                    total_ppr[a['name']] += a['ppr']
-                    total_tpr[a['name']] += a['tpr']
-                    total_coin[a['name']] += a['coin']
+            record(run_single_sim(sim_arg))
             completed += 1
             pct = completed * 100 // args.num_sims
             bar = '#' * (pct // 5) + '.' * (20 - pct // 5)
@@ -161,20 +156,308 @@ def run_benchmark(args, agent_filter):
     print()
 
     # Results
-    print(f"{'AGENT':28} {'WINS':>6} {'WIN%':>7} {'AVG EFF':>12} {'AVG $/r':>10} {'AVG ms/r':>12}")
-    print("-" * 80)
+    print(f"{'AGENT':28} {'WINS':>6} {'WIN%':>7} {'AVG EFF':>12} {'AVG $/r':>10} {'±95%':>7} {'AVG ms/r':>12} {'±95%':>9}")
+    print("-" * 98)
 
     n = args.num_sims
-    for name in sorted(total_eff.keys(), key=lambda x: total_eff[x], reverse=True):
-        avg_eff = total_eff[name] / n
-        avg_ppr = total_ppr[name] / n
-        avg_tpr = total_tpr[name] / n
-        win_pct = wins[name] * 100 / n
-        print(f"{name:28} {wins[name]:>6} {win_pct:>6.1f}% {avg_eff:>12,.1f} {avg_ppr:>+10,.0f} {avg_tpr:>12.5f}")
+    runs = table[-1][1] + 1 if table else 0
+    wins = win_counts([name for name, _, _ in table], [r for _, r, _ in table], [e for _, _, e in table], runs)
+    for name in sorted(eff.keys(), key=lambda x: eff[x].mean, reverse=True):
+        win_pct = wins.get(name, 0) * 100 / n
+        print(f"{name:28} {wins.get(name, 0):>6} {win_pct:>6.1f}% {eff[name].mean:>12,.1f} {ppr[name].mean:>+10,.0f} "
+              f"{ppr[name].ci():>7,.0f} {tpr[name].mean:>12.5f} {tpr[name].ci():>9.5f}")
 
     print()
     print(f"Throughput: {n / elapsed:.1f} sims/sec, {n * args.rounds / elapsed:.0f} rounds/sec")
-    return elapsed
+    if args.check_manifest:
+        return check_manifest(tpr, args.tolerance)
+    return []
+
+
+def check_manifest(tpr, tolerance):
+    """Declared (agents/__init__.py manifests) vs measured ms/round. An agent
+    fails when the lower end of its 95% CI is over tolerance x declared.
+    Returns the failing names."""
+    import agents
+
+    print()
+    print(f"{'AGENT':28} {'TIER':>10} {'DECLARED':>10} {'MEASURED':>10} {'RATIO':>7}")
+    print("-" * 70)
+    failed = []
+    for name in sorted(tpr, key=lambda x: tpr[x].mean):
+        manifest = agents.manifests.get(name)
+        declared = manifest.ms_per_round if manifest else None
+        if declared is None:
+            print(f"{name:28} {'-':>10} {'-':>10} {tpr[name].mean:>10.4f} {'-':>7}  no manifest")
+            continue
+        ratio = tpr[name].mean / declared
+        over = tpr[name].mean - tpr[name].ci() > declared * tolerance
+        if over:
+            failed.append(name)
+        print(f"{name:28} {manifest.tier:>10} {declared:>10.4f} {tpr[name].mean:>10.4f} {ratio:>6.2f}x"
+              f"{'  SLOWER THAN DECLARED' if over else ''}")
+    print(f"\n{len(failed)} of {len(tpr)} agents over {tolerance:g}x their declared ms/round")
+    return failed
+
+
+def log_overhead(num_agents=30, rounds=200, seed=1, repeats=5):
+    """Engine ms per round (wall less the agents' own time) of one seeded
+    run_sim game by logger setup: every flag off (configure()'s no-ops, the
+    per-turn call skipped), every flag off but each call entering its
+    function to test them, as before configure() existed, and round and
+    agent output on. Printing goes to os.devnull. The roster is the
+    num_agents cheapest agents by manifest, so the engine's share of a
+    round shows; `repeats` games each, interleaved."""
+    import logging
+    import sim
+    import agents as agents_module
+    import utils.logger as L
+
+    registry = agents_module.agents
+    cheapest = sorted(registry, key=lambda name: agents_module.manifests.get(name, sim.DEFAULT_MANIFEST).ms_per_round)
+    roster = {name: registry[name] for name in cheapest[:num_agents]}
+
+    def flags_off():
+        L.configure()
+
+    def flag_checks():
+        L.configure()
+        for name in ('print_agent', 'invalid', 'print_node', 'print_nodes', 'print_round_start', 'print_round_end'):
+            setattr(L, name, getattr(L, '_' + name))
+
+    def flags_on():
+        L.configure(round_info=True, other_agents=True)
+
+    def game(setup):
+        """Engine seconds (wall less the agents' own time) of each round."""
+        rounds_s = []
+        last = [0.0, 0.0]
+
+        def observer(round_num, total_rounds, agents_list, shops):
+            now, spent = time.perf_counter(), sum(a['time'] for a in agents_list)
+            rounds_s.append(now - last[0] - (spent - last[1]))
+            last[:] = [time.perf_counter(), spent]
+            return True
+
+        original_level = logging.getLogger().level
+        logging.getLogger().setLevel(logging.CRITICAL)
+        setup()
+        try:
+            with playing(rounds, roster), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                last[0] = time.perf_counter()
+                # quiet=False: quiet would call configure() and undo setup()
+                sim.run_sim(observer={'on_round_end': observer}, seed=seed)
+        finally:
+            logging.getLogger().setLevel(original_level)
+            L.configure()
+        return rounds_s[1:]  # the first round also times the game's setup
+
+    modes = (("flags off", flags_off), ("flag checks", flag_checks), ("round + agent output", flags_on))
+    best, games = {}, defaultdict(list)
+    for _ in range(repeats):
+        for label, setup in modes:
+            times = game(setup)
+            games[label].append(sum(times) / len(times) * 1000)
+            # Each round's fastest showing across the games
+            best[label] = [min(pair) for pair in zip(best[label], times)] if label in best else times
+    best = {label: sum(times) / len(times) * 1000 for label, times in best.items()}
+    noise = max(max(ms) - min(ms) for ms in games.values())
+
+    print(f"One seeded game (seed {seed}), {len(roster)} cheapest agents, {rounds} rounds, best of {repeats}")
+    print(f"{'LOGGER':24} {'ENGINE ms/round':>16}")
+    for label, _ in modes:
+        print(f"{label:24} {best[label]:>16.4f}")
+    saving = best["flag checks"] - best["flags off"]
+    print(f"Saving with flags off vs flag checks: {saving * 1000:.1f} us/round "
+          f"({saving / best['flag checks'] * 100:.1f}% of the round)")
+    print(f"ENGINE is wall time less the agents' own, each round's best of the games; games with "
+          f"one setup differ by up to {noise * 1000:.1f} us/round.")
+
+
+def world_proxy_overhead(agent_names=('ultimate', 'depth2_global_all'), sizes=(400, 1600, 6400, 25600),
+                         degree=8, turns=200, repeats=3):
+    """Per-turn cost of a whole-world agent: building the world dict and
+    calling the agent with it, vs calling it with one shared WorldProxy.
+
+    Worlds past 400 nodes are random graphs of the same mean degree as
+    sim.build_graph's (it is quadratic in nodes). Agents walk where they
+    choose and trade nothing, so each turn repeats their real lookups."""
+    import random
+    import sim
+    import agents
+    from views import WorldProxy
+
+    def make_world(n):
+        if n == sim.node_count:
+            graph = sim.build_graph(n, sim.edge_ratio)
+        else:
+            graph = {0: {}}
+            for w in range(1, n):
+                graph[w] = {}
+                other = random.randrange(w)
+                graph[w][other] = graph[other][w] = 1
+            for _ in range(n * degree // 2 - (n - 1)):
+                a, b = random.randrange(n), random.randrange(n)
+                if a != b:
+                    graph[a][b] = graph[b][a] = 1
+        return graph, sim.make_world_shops(graph)
+
+    def per_turn(func, graph, shops, proxy):
+        """(seconds building worlds, seconds in the agent) per turn"""
+        random.seed(1)
+        state = {}
+        position = next(iter(graph))
+        resources = {}
+        building = calling = 0.0
+        for turn in range(turns):
+            start = time.perf_counter()
+            world = proxy if proxy is not None else \
+                {w: {"neighbours": neighbours, "resources": shops[w]} for w, neighbours in graph.items()}
+            built = time.perf_counter()
+            move = func({"you": {"coin": sim.traveller_start_gold, "position": position, "resources": resources,
+                                 "fills": []},
+                         "meta": {"current_round": turn, "total_rounds": turns + 1, "time_used": 0.0},
+                         "world": world}, state)
+            done = time.perf_counter()
+            building += built - start
+            calling += done - built
+            if move.get("move") in graph[position]:
+                position = move["move"]
+        return building / turns, calling / turns
+
+    print("Whole-world agents, us/turn: world dict built each turn vs one shared WorldProxy")
+    print(f"{'AGENT':20} {'NODES':>7} {'BUILD':>9} {'AGENT':>9} {'PROXY AGENT':>12} {'PROXY/DICT':>11}")
+    for name in agent_names:
+        func = agents.agents[name]
+        for n in sizes:
+            random.seed(n)
+            graph, shops = make_world(n)
+            proxy = WorldProxy(graph, shops)
+            build, call = min((per_turn(func, graph, shops, None) for _ in range(repeats)), key=sum)
+            _, proxied = min(per_turn(func, graph, shops, proxy) for _ in range(repeats))
+            print(f"{name:20} {n:>7} {build * 1e6:>9.1f} {call * 1e6:>9.1f} {proxied * 1e6:>12.1f} "
+                  f"{proxied / (build + call):>10.2f}x")
+    print("BUILD is engine time, AGENT the agent's own (scored) time; PROXY/DICT compares whole turns.")
+
+
+def round_latency(rounds=200, workers=None, seed=1):
+    """Wall ms per round of one game, sequential vs the snapshot round model
+    (rounds.py) with each pool, next to the agents' summed ms per round."""
+    import sim
+
+    def game(**kw):
+        played = []
+
+        def observer(round_num, total_rounds, agents_list, shops):
+            played[:] = [round_num + 1, sum(a['time'] for a in agents_list)]
+            return True
+
+        start = time.perf_counter()
+        with playing(rounds):
+            sim.run_sim(observer={'on_round_end': observer}, quiet=True, seed=seed, **kw)
+        wall = time.perf_counter() - start
+        return wall / played[0] * 1000, played[1] / played[0] * 1000
+
+    workers = workers or os.cpu_count() or 1
+    print(f"One game, {rounds} rounds, {workers} workers, {os.cpu_count()} cores")
+    print(f"{'MODEL':24} {'WALL ms/round':>14} {'AGENTS ms/round':>16}")
+    for label, kw in (("sequential", {}),
+                      ("snapshot", {'round_model': 'snapshot'}),
+                      ("snapshot, threads", {'round_model': 'snapshot', 'pool': 'thread', 'workers': workers}),
+                      ("snapshot, processes", {'round_model': 'snapshot', 'pool': 'process', 'workers': workers})):
+        wall, agent = game(**kw)
+        print(f"{label:24} {wall:>14.2f} {agent:>16.2f}")
+    print("WALL includes process start-up; AGENTS is the sum of every agent's own time.")
+
+
+def thread_scaling(agent_name='depth2_global_all', copies=16, rounds=20, threads=(1, 2, 4, 8), seed=1):
+    """Wall time of one round's decisions for copies of one agent on a
+    rounds.ThreadDecider of each size. Only a free-threaded build (3.13t)
+    runs their Python in parallel; with the GIL more threads can't help."""
+    import random
+    import engine
+    import sim
+    import agents
+    import rounds as snapshot_rounds
+
+    random.seed(seed)
+    graph = sim.build_graph(sim.node_count, sim.edge_ratio)
+    shops = sim.make_world_shops(graph)
+    func = agents.agents[agent_name]
+    manifest = agents.manifests.get(agent_name, sim.DEFAULT_MANIFEST)
+    indexes = engine.build_indexes(shops, [manifest])
+    starts = [random.choice(list(graph)) for _ in range(copies)]
+
+    print(f"{copies} x {agent_name}, {rounds} rounds, {os.cpu_count()} cores, "
+          f"GIL {'off (free-threaded)' if snapshot_rounds.free_threaded() else 'on'}")
+    print(f"{'THREADS':>8} {'WALL ms/round':>14} {'AGENTS ms/round':>16} {'SPEEDUP':>8}")
+    base = None
+    for n in threads:
+        world_agents = [{"name": f"{agent_name}#{i}", "func": func, "coin": sim.traveller_start_gold,
+                         "position": start, "resources": {}, "time": 0, "state": {}, "fills": [],
+                         "radius": manifest.radius, "indexes": {k: indexes[k] for k in manifest.indexes}}
+                        for i, start in enumerate(starts)]
+        decider = snapshot_rounds.ThreadDecider(n, graph, shops, rounds)
+        wall = 0.0
+        for round_number in range(rounds):
+            start = time.perf_counter()
+            decided = decider.decide(world_agents, round_number)
+            wall += time.perf_counter() - start
+            # Walk where they choose, trading nothing, so the rounds differ
+            for agent, (move, *_) in zip(world_agents, decided):
+                if isinstance(move, dict) and move.get("move") in graph[agent["position"]]:
+                    agent["position"] = move["move"]
+        decider.close()
+        wall = wall / rounds * 1000
+        base = base or wall
+        print(f"{n:>8} {wall:>14.2f} {sum(a['time'] for a in world_agents) / rounds * 1000:>16.2f} "
+              f"{base / wall:>7.2f}x")
+    print("AGENTS is the sum of the agents' own times, which grows when threads contend.")
+
+
+def churn(world_state, state):
+    """A heavy agent that trades nothing: it allocates ~20k objects a turn,
+    enough to trigger the GC and evict the caches."""
+    state['junk'] = [{'node': w, 'path': [w] * 4} for w in range(20000)]
+    return {}
+
+
+def timing_isolation(rounds=200, seed=1, heavy=4, tiers=('ultra-fast', 'fast'), repeats=3):
+    """How much heavy agents inflate the cheap ones' measured time: the
+    cheap tiers' ms/round alone and with `heavy` churn() agents in the same
+    game, in process and with a worker process per agent
+    (rounds.AgentProcessDecider); best of `repeats` games. churn() never
+    trades and is added after the cheap agents, so they start in the same
+    places."""
+    import sim
+    import agents as agents_module
+
+    registry = agents_module.agents
+    cheap = [name for name in registry  # skips agents that fail to import
+             if agents_module.manifests.get(name, sim.DEFAULT_MANIFEST).tier in tiers]
+
+    def cheap_ms(roster, pool):
+        times = {}
+
+        def observer(round_num, total_rounds, agents_list, shops):
+            times.update((a['name'], a['time'] / (round_num + 1) * 1000) for a in agents_list)
+            return True
+
+        with playing(rounds, roster):
+            sim.run_sim(observer={'on_round_end': observer}, quiet=True, seed=seed,
+                        round_model='snapshot', pool=pool)
+        return sum(times[name] for name in cheap)
+
+    alone = {name: registry[name] for name in cheap}
+    among = {**alone, **{f'churn_{i}': churn for i in range(heavy)}}
+    print(f"{len(cheap)} {'/'.join(tiers)} agents' total ms/round, alone and with {heavy} heavy agents, "
+          f"{rounds} snapshot rounds")
+    print(f"{'MODE':24} {'ALONE':>9} {'WITH HEAVY':>11} {'INFLATION':>10}")
+    for label, pool in (("in process", None), ("process per agent", "agent")):
+        by_itself = min(cheap_ms(alone, pool) for _ in range(repeats))
+        with_heavy = min(cheap_ms(among, pool) for _ in range(repeats))
+        print(f"{label:24} {by_itself:>9.4f} {with_heavy:>11.4f} {with_heavy / by_itself:>9.2f}x")
+    print("Process per agent counts each worker's CPU time (time.process_time).")
 
 
 def main():
@@ -185,8 +468,38 @@ def main():
     parser.add_argument('--only', type=str, help='Comma-separated list of agents to test')
     parser.add_argument('-w', '--watch', action='store_true', help='Watch for file changes and rerun')
     parser.add_argument('-d', '--debug', action='store_true', help='Run single sim with full debug output')
+    parser.add_argument('--log-overhead', action='store_true', help='Measure run_sim wall time per round with logger flags off vs on')
+    parser.add_argument('--world-proxy', action='store_true', help='Measure the world dict vs views.WorldProxy per turn')
+    parser.add_argument('--round-latency', action='store_true',
+                        help='Measure wall time per round, sequential vs snapshot rounds on each pool')
+    parser.add_argument('--thread-scaling', action='store_true',
+                        help='Measure one round of decisions on 1-8 threads (scales on free-threaded builds)')
+    parser.add_argument('--timing-isolation', action='store_true',
+                        help="Measure cheap agents' ms/round alone vs among heavy agents, with and without "
+                             "a process per agent")
+    parser.add_argument('--workers', type=int, help='Pool size for --round-latency (default: one per core)')
+    parser.add_argument('--check-manifest', action='store_true',
+                        help='Compare measured ms/round with each agent manifest; exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=2.0,
+                        help='Allowed measured/declared ms/round ratio for --check-manifest (default: 2.0)')
     args = parser.parse_args()
 
+    if args.log_overhead:
+        log_overhead()
+        return
+    if args.world_proxy:
+        world_proxy_overhead()
+        return
+    if args.timing_isolation:
+        timing_isolation()
+        return
+    if args.thread_scaling:
+        thread_scaling()
+        return
+    if args.round_latency:
+        round_latency(args.rounds, args.workers)
+        return
+
     agent_filter = set(args.only.split(',')) if args.only else None
 
     # Debug mode - run single sim with verbose output
@@ -195,7 +508,7 @@ def main():
         print("Running single simulation with debug output...")
         print("=" * 70)
         sim.run_sim(debug_log=True, quiet=False)
-        print("\nDebug log written to: debug_log.txt")
+        print("\nDebug log written to ekon_debug_*.bin (python debug_logger.py <file> for text)")
         return
 
     if args.watch:
@@ -220,7 +533,8 @@ def main():
         except KeyboardInterrupt:
             print("\nStopped.")
     else:
-        run_benchmark(args, agent_filter)
+        if run_benchmark(args, agent_filter):
+            sys.exit(1)
 
 
 if __name__ == '__main__':
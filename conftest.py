@@ -0,0 +1,33 @@
+"""Shared fixtures for the test_*.py modules (python -m pytest)."""
+
+import pytest
+
+import agents
+import sim
+
+
+@pytest.fixture
+def play(monkeypatch):
+    """play(roster, rounds=10, each_round=None, **run_sim_kwargs) runs a
+    quiet game of a {name: agent function} roster on a small world and
+    returns the agent records after the last round played. each_round, if
+    given, is called as each_round(round_number, world_agents, world_shops);
+    an observer passed in gets every callback but on_round_end."""
+    monkeypatch.setattr(sim, "node_count", 30)
+    monkeypatch.setattr(sim, "edge_ratio", 0.1)
+
+    def play(roster, rounds=10, each_round=None, observer=None, **kwargs):
+        monkeypatch.setattr(agents, "agents", roster)
+        monkeypatch.setattr(sim, "num_rounds", rounds)
+        final = []
+
+        def on_round_end(round_number, total_rounds, world_agents, world_shops):
+            final[:] = world_agents
+            if each_round:
+                each_round(round_number, world_agents, world_shops)
+            return True
+
+        sim.run_sim(observer={**(observer or {}), "on_round_end": on_round_end}, quiet=True, **kwargs)
+        return final
+
+    return play
@@ -1,102 +1,384 @@
 """
 Debug logger for Ekon simulation.
-Writes detailed game state to a log file for debugging.
+
+Writes a compact binary event log instead of flushed text lines, so it is
+cheap enough to leave on. Records are fixed-width structs (trades, moves,
+turns, rounds) with agent, resource and message names interned to small
+ids; the setup and final results are written once as JSON blobs. Records
+are buffered and written in blocks. run_sim packs and writes them on a
+background thread (see async_log), so the sim only pays for a queue append.
+
+Nothing derivable is stored: shops, coin, positions and holdings are
+rebuilt by replaying trades and moves from the setup snapshot. To get the
+old text log:
+
+    python debug_logger.py ekon_debug_20250101_120000.bin > debug.log
 """
 
 import json
+import struct
+import sys
 from datetime import datetime
 
+MAGIC = b"EKONLOG1"
+BLOCK_SIZE = 1 << 16
+
+# Record types
+NAME, BLOB, ROUND_START, ROUND_END, TURN, TRADE, MOVE, EXCEPTION = range(8)
+
+# Interned name kinds
+AGENT, RESOURCE, TEXT = range(3)
+
+# TRADE flags: bit 0 = sell, bits 1-7 = status: an index into STATUSES, or
+# STATUS_TEXT with the reason interned as TEXT in the reason field
+STATUSES = [None, "insufficient quantity", "insufficient coin", "shop out of stock"]
+STATUS_TEXT = len(STATUSES)
+
+# MOVE flags: bit 0 = ok, bit 1 = destinations interned as TEXT (not ints)
+MOVE_OK, MOVE_TEXT = 1, 2
+
+_type = struct.Struct("<B")
+_name = struct.Struct("<BBII")       # type, kind, id, byte length (+ utf-8 bytes)
+_blob = struct.Struct("<BI")         # type, byte length (+ json bytes)
+_round_start = struct.Struct("<BIIH")  # type, round, total rounds, agent count (+ agent ids, H each)
+_turn = struct.Struct("<BHB")        # type, agent, move is a dict
+_trade = struct.Struct("<BHHBIqq")   # type, agent, resource, flags, reason, quantity, price
+_move = struct.Struct("<BHBqq")      # type, agent, flags, from, to
+_exception = struct.Struct("<BHI")   # type, agent, message
+
+_int64 = range(-(1 << 63), 1 << 63)
+
 
 class DebugLogger:
-    def __init__(self, filename=None):
+    """With a policy ("block", "drop" or "sample", see async_log) the log_*
+    calls only snapshot their arguments; packing and file writes happen on
+    an AsyncLog writer thread. Without one everything is written inline."""
+
+    def __init__(self, filename=None, policy=None):
         if filename is None:
-            filename = f"ekon_debug_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+            filename = f"ekon_debug_{datetime.now().strftime('%Y%m%d_%H%M%S')}.bin"
         self.filename = filename
-        self.file = open(filename, 'w')
-        self._write(f"=== Ekon Debug Log Started {datetime.now()} ===\n")
+        self.file = open(filename, 'wb')
+        self.buf = bytearray(MAGIC)
+        self.names = ({}, {}, {})  # per kind: name -> id
+        self.queue = None
+        if policy is not None:
+            from async_log import AsyncLog
+            self.queue = AsyncLog(self._write_batch, policy=policy)
+            self._emit = self.queue.push
+        self._emit((self._blob, (json.dumps({"started": str(datetime.now())}),)))
 
-    def _write(self, msg):
-        self.file.write(msg + "\n")
-        self.file.flush()
+    def _emit(self, event):
+        write, args = event
+        write(*args)
 
-    def log_setup(self, world_graph, world_shops, world_agents):
-        """Log initial game setup."""
-        self._write("\n=== GAME SETUP ===")
-        self._write(f"Nodes: {len(world_graph)}")
-        self._write(f"Agents: {len(world_agents)}")
+    def _write_batch(self, batch):
+        for write, args in batch:
+            write(*args)
+
+    def _intern(self, kind, name):
+        ids = self.names[kind]
+        i = ids.get(name)
+        if i is None:
+            i = ids[name] = len(ids)
+            data = str(name).encode()
+            self.buf += _name.pack(NAME, kind, i, len(data))
+            self.buf += data
+        return i
 
-        self._write("\n--- Initial Agent States ---")
-        for agent in world_agents:
-            self._write(f"  {agent['name']}:")
-            self._write(f"    coin: {agent['coin']}")
-            self._write(f"    position: {agent['position']}")
-            self._write(f"    resources: {agent['resources']}")
+    def _blob(self, text):
+        data = text.encode()
+        self.buf += _blob.pack(BLOB, len(data))
+        self.buf += data
+        self._maybe_flush()
 
-        self._write("\n--- Sample Shop States (first 5) ---")
-        for i, (node, shop) in enumerate(list(world_shops.items())[:5]):
-            self._write(f"  Node {node}: {shop}")
+    def _maybe_flush(self):
+        if len(self.buf) >= BLOCK_SIZE:
+            self.file.write(self.buf)
+            self.buf = bytearray()
+
+    def log_setup(self, world_graph, world_shops, world_agents):
+        """Log initial game setup."""
+        setup = json.dumps({
+            "nodes": len(world_graph),
+            "agents": [[a['name'], a['coin'], a['position'], a['resources']] for a in world_agents],
+            "shops": [[node, shop] for node, shop in world_shops.items()],
+        })
+        self._emit((self._blob, (setup,)))
 
     def log_round_start(self, round_num, total_rounds, agents):
-        """Log start of round with agent standings."""
-        self._write(f"\n{'='*60}")
-        self._write(f"ROUND {round_num + 1}/{total_rounds}")
-        self._write(f"{'='*60}")
+        """Log start of round, with the agent order (it breaks standings ties)."""
+        self._emit((self._round_start, (round_num, total_rounds, tuple(a['name'] for a in agents))))
 
-        sorted_agents = sorted(agents, key=lambda a: a['coin'], reverse=True)
-        self._write("Standings:")
-        for i, agent in enumerate(sorted_agents):
-            self._write(f"  {i+1}. {agent['name']}: ${agent['coin']:,} at node {agent['position']} | resources: {agent['resources']}")
+    def _round_start(self, round_num, total_rounds, names):
+        ids = [self._intern(AGENT, name) for name in names]
+        self.buf += _round_start.pack(ROUND_START, round_num, total_rounds, len(ids))
+        self.buf += struct.pack("<%dH" % len(ids), *ids)
+        self._maybe_flush()
 
     def log_agent_turn(self, agent, state_passed, move_returned):
-        """Log an agent's turn details."""
-        self._write(f"\n--- {agent['name']}'s Turn ---")
-        self._write(f"  Position: {agent['position']}")
-        self._write(f"  Coin: {agent['coin']}")
-        self._write(f"  Resources: {agent['resources']}")
+        """Log that an agent was called; its trades and move follow."""
+        self._emit((self._turn, (agent['name'], isinstance(move_returned, dict))))
 
-        current_shop = state_passed['world'][agent['position']]['resources']
-        self._write(f"  Current shop resources: {current_shop}")
-
-        if move_returned:
-            self._write(f"  Move returned: {move_returned}")
-        else:
-            self._write(f"  Move returned: None/Invalid")
+    def _turn(self, name, is_dict):
+        self.buf += _turn.pack(TURN, self._intern(AGENT, name), is_dict)
+        self._maybe_flush()
 
     def log_transaction(self, agent_name, tx_type, resource, quantity, price, success, reason=None):
         """Log a buy/sell transaction."""
-        status = "OK" if success else f"FAILED ({reason})"
-        self._write(f"  [{tx_type.upper()}] {agent_name}: {quantity} {resource} @ ${price} = ${quantity * price} - {status}")
+        self._emit((self._trade, (agent_name, tx_type, resource, quantity, price, success, reason)))
+
+    def _trade(self, agent_name, tx_type, resource, quantity, price, success, reason):
+        status = 0
+        extra = 0
+        if not success:
+            if reason in STATUSES:
+                status = STATUSES.index(reason)
+            else:
+                status = STATUS_TEXT
+                extra = self._intern(TEXT, reason)
+        if quantity not in _int64:  # absurd failed requests only
+            quantity = max(min(quantity, _int64[-1]), _int64[0])
+        self.buf += _trade.pack(TRADE, self._intern(AGENT, agent_name), self._intern(RESOURCE, resource),
+                                (tx_type == "sell") | (status << 1), extra, quantity, price)
+        self._maybe_flush()
 
     def log_movement(self, agent_name, from_pos, to_pos, success, reason=None):
-        """Log agent movement."""
-        if success:
-            self._write(f"  [MOVE] {agent_name}: {from_pos} -> {to_pos}")
-        else:
-            self._write(f"  [MOVE] {agent_name}: {from_pos} -> {to_pos} FAILED ({reason})")
+        """Log agent movement. Failed moves are always 'invalid destination'."""
+        if not (isinstance(from_pos, int) and isinstance(to_pos, int)):
+            from_pos, to_pos = str(from_pos), str(to_pos)  # snapshot agent-supplied objects
+        self._emit((self._move, (agent_name, from_pos, to_pos, success)))
+
+    def _move(self, agent_name, from_pos, to_pos, success):
+        flags = MOVE_OK if success else 0
+        if not (isinstance(from_pos, int) and isinstance(to_pos, int) and from_pos in _int64 and to_pos in _int64):
+            flags |= MOVE_TEXT
+            from_pos = self._intern(TEXT, str(from_pos))
+            to_pos = self._intern(TEXT, str(to_pos))
+        self.buf += _move.pack(MOVE, self._intern(AGENT, agent_name), flags, from_pos, to_pos)
+        self._maybe_flush()
 
     def log_agent_exception(self, agent_name, exception):
         """Log when an agent throws an exception."""
-        self._write(f"  [EXCEPTION] {agent_name}: {type(exception).__name__}: {exception}")
+        self._emit((self._exception, (agent_name, f"{type(exception).__name__}: {exception}")))
+
+    def _exception(self, agent_name, message):
+        self.buf += _exception.pack(EXCEPTION, self._intern(AGENT, agent_name), self._intern(TEXT, message))
+        self._maybe_flush()
 
     def log_round_end(self, agents):
-        """Log end of round summary."""
-        total_wealth = sum(a['coin'] for a in agents)
-        total_resources = sum(sum(a['resources'].values()) for a in agents)
-        self._write(f"\nRound Summary: Total wealth=${total_wealth:,}, Total resources={total_resources}")
+        """Log end of round."""
+        self._emit((self._round_end, ()))
+
+    def _round_end(self):
+        self.buf += _type.pack(ROUND_END)
+        self._maybe_flush()
 
     def log_final_results(self, agents):
-        """Log final game results."""
-        self._write(f"\n{'='*60}")
-        self._write("FINAL RESULTS")
-        self._write(f"{'='*60}")
-
-        sorted_agents = sorted(agents, key=lambda a: a['coin'], reverse=True)
-        for i, agent in enumerate(sorted_agents):
-            self._write(f"  {i+1}. {agent['name']}")
-            self._write(f"     Coin: ${agent['coin']:,}")
-            self._write(f"     Resources: {agent['resources']}")
-            self._write(f"     Time spent: {agent['time']:.4f}s")
+        """Log final game results (time spent can't be replayed)."""
+        final = json.dumps({"final": [[a['name'], a['time']] for a in agents]})
+        self._emit((self._blob, (final,)))
 
     def close(self):
-        self._write(f"\n=== Log Ended {datetime.now()} ===")
+        self._emit((self._blob, (json.dumps({"ended": str(datetime.now())}),)))
+        if self.queue is not None:
+            self.queue.close()
+        self.file.write(self.buf)
+        self.buf = bytearray()
         self.file.close()
+
+
+def read_events(filename):
+    """
+    Yield decoded records as tuples, with names resolved:
+        ("blob", obj)
+        ("round_start", round, total, [agent, ...])
+        ("round_end",)
+        ("turn", agent, move_is_dict)
+        ("trade", agent, "buy"/"sell", resource, quantity, price, success, reason)
+        ("move", agent, from, to, success)
+        ("exception", agent, message)
+    """
+    with open(filename, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError("%s is not an Ekon binary log" % filename)
+
+    names = ([], [], [])
+    pos = len(MAGIC)
+    end = len(data)
+    while pos < end:
+        kind = data[pos]
+        if kind == TRADE:
+            _, agent, resource, flags, extra, quantity, price = _trade.unpack_from(data, pos)
+            pos += _trade.size
+            status = flags >> 1
+            reason = names[TEXT][extra] if status == STATUS_TEXT else STATUSES[status]
+            yield ("trade", names[AGENT][agent], "sell" if flags & 1 else "buy",
+                   names[RESOURCE][resource], quantity, price, status == 0, reason)
+        elif kind == MOVE:
+            _, agent, flags, from_pos, to_pos = _move.unpack_from(data, pos)
+            pos += _move.size
+            if flags & MOVE_TEXT:
+                from_pos, to_pos = names[TEXT][from_pos], names[TEXT][to_pos]
+            yield ("move", names[AGENT][agent], from_pos, to_pos, bool(flags & MOVE_OK))
+        elif kind == TURN:
+            _, agent, is_dict = _turn.unpack_from(data, pos)
+            pos += _turn.size
+            yield ("turn", names[AGENT][agent], bool(is_dict))
+        elif kind == NAME:
+            _, name_kind, i, length = _name.unpack_from(data, pos)
+            pos += _name.size
+            names[name_kind].append(data[pos:pos + length].decode())
+            pos += length
+        elif kind == ROUND_START:
+            _, round_num, total, count = _round_start.unpack_from(data, pos)
+            pos += _round_start.size
+            order = struct.unpack_from("<%dH" % count, data, pos)
+            pos += 2 * count
+            yield ("round_start", round_num, total, [names[AGENT][i] for i in order])
+        elif kind == ROUND_END:
+            pos += _type.size
+            yield ("round_end",)
+        elif kind == EXCEPTION:
+            _, agent, message = _exception.unpack_from(data, pos)
+            pos += _exception.size
+            yield ("exception", names[AGENT][agent], names[TEXT][message])
+        elif kind == BLOB:
+            _, length = _blob.unpack_from(data, pos)
+            pos += _blob.size
+            yield ("blob", json.loads(data[pos:pos + length]))
+            pos += length
+        else:
+            raise ValueError("corrupt log %s: record type %d at byte %d" % (filename, kind, pos))
+
+
+def to_text(filename, out):
+    """
+    Render a binary log in the text format DebugLogger used to write.
+
+    Shops, standings and holdings are rebuilt by replaying the trades and
+    moves. "Move returned" lists the orders and move the engine then
+    processed for that turn (quantities after int()), not the raw dict.
+    """
+    def w(msg):
+        out.write(msg + "\n")
+
+    events = list(read_events(filename))
+    agents = {}
+    shops = {}
+
+    for i, event in enumerate(events):
+        kind = event[0]
+        if kind == "blob":
+            obj = event[1]
+            if "started" in obj:
+                w(f"=== Ekon Debug Log Started {obj['started']} ===\n")
+            elif "shops" in obj:
+                for name, coin, position, resources in obj["agents"]:
+                    agents[name] = {'name': name, 'coin': coin, 'position': position, 'resources': resources}
+                shops = {node: shop for node, shop in obj["shops"]}
+                w("\n=== GAME SETUP ===")
+                w(f"Nodes: {obj['nodes']}")
+                w(f"Agents: {len(agents)}")
+                w("\n--- Initial Agent States ---")
+                for agent in agents.values():
+                    w(f"  {agent['name']}:")
+                    w(f"    coin: {agent['coin']}")
+                    w(f"    position: {agent['position']}")
+                    w(f"    resources: {agent['resources']}")
+                w("\n--- Sample Shop States (first 5) ---")
+                for node, shop in list(shops.items())[:5]:
+                    w(f"  Node {node}: {shop}")
+            elif "final" in obj:
+                w(f"\n{'='*60}")
+                w("FINAL RESULTS")
+                w(f"{'='*60}")
+                times = dict(obj["final"])
+                in_order = [agents[name] for name, _ in obj["final"]]
+                for n, agent in enumerate(sorted(in_order, key=lambda a: a['coin'], reverse=True)):
+                    w(f"  {n+1}. {agent['name']}")
+                    w(f"     Coin: ${agent['coin']:,}")
+                    w(f"     Resources: {agent['resources']}")
+                    w(f"     Time spent: {times.get(agent['name'], 0):.4f}s")
+            elif "ended" in obj:
+                w(f"\n=== Log Ended {obj['ended']} ===")
+
+        elif kind == "round_start":
+            w(f"\n{'='*60}")
+            w(f"ROUND {event[1] + 1}/{event[2]}")
+            w(f"{'='*60}")
+            w("Standings:")
+            in_order = [agents[name] for name in event[3]]
+            for n, agent in enumerate(sorted(in_order, key=lambda a: a['coin'], reverse=True)):
+                w(f"  {n+1}. {agent['name']}: ${agent['coin']:,} at node {agent['position']} | resources: {agent['resources']}")
+
+        elif kind == "turn":
+            agent = agents[event[1]]
+            w(f"\n--- {agent['name']}'s Turn ---")
+            w(f"  Position: {agent['position']}")
+            w(f"  Coin: {agent['coin']}")
+            w(f"  Resources: {agent['resources']}")
+            w(f"  Current shop resources: {shops[agent['position']]}")
+            if event[2]:
+                w(f"  Move returned: {_turn_orders(events, i)}")
+            else:
+                w(f"  Move returned: None/Invalid")
+
+        elif kind == "trade":
+            _, name, tx_type, resource, quantity, price, success, reason = event
+            status = "OK" if success else f"FAILED ({reason})"
+            w(f"  [{tx_type.upper()}] {name}: {quantity} {resource} @ ${price} = ${quantity * price} - {status}")
+            if success:
+                agent = agents[name]
+                shop = shops[agent['position']]
+                if tx_type == "sell":
+                    shop[resource]['quantity'] += quantity
+                    agent['resources'][resource] -= quantity
+                    agent['coin'] += quantity * price
+                else:
+                    shop[resource]['quantity'] -= quantity
+                    agent['resources'][resource] = agent['resources'].get(resource, 0) + quantity
+                    agent['coin'] -= quantity * price
+
+        elif kind == "move":
+            _, name, from_pos, to_pos, success = event
+            if success:
+                w(f"  [MOVE] {name}: {from_pos} -> {to_pos}")
+                agents[name]['position'] = to_pos
+            else:
+                w(f"  [MOVE] {name}: {from_pos} -> {to_pos} FAILED (invalid destination)")
+
+        elif kind == "exception":
+            w(f"  [EXCEPTION] {event[1]}: {event[2]}")
+
+        elif kind == "round_end":
+            total_wealth = sum(a['coin'] for a in agents.values())
+            total_resources = sum(sum(a['resources'].values()) for a in agents.values())
+            w(f"\nRound Summary: Total wealth=${total_wealth:,}, Total resources={total_resources}")
+
+
+def _turn_orders(events, i):
+    """Rebuild the orders processed for the turn at events[i]."""
+    name = events[i][1]
+    sells, buys, move = {}, {}, None
+    for event in events[i + 1:]:
+        if event[0] in ("turn", "round_end", "round_start"):
+            break
+        if event[1] != name:
+            continue
+        if event[0] == "trade":
+            (sells if event[2] == "sell" else buys)[event[3]] = event[4]
+        elif event[0] == "move":
+            move = event[3]
+    orders = {'resources_to_sell_to_shop': sells, 'resources_to_buy_from_shop': buys}
+    if move is not None:
+        orders['move'] = move
+    return orders
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python debug_logger.py <ekon_debug_*.bin>", file=sys.stderr)
+        sys.exit(2)
+    to_text(sys.argv[1], sys.stdout)
@@ -0,0 +1,305 @@
+"""
+Engine rules shared by run_sim and the tools that replay its turns
+(experiment.py, population.py, rounds.py): the state an agent is called
+with, engine indexes, committed plans and standing orders, and fork(),
+the snapshot planning agents simulate their moves on.
+
+Importing it has no side effects: no logging setup and no agent imports,
+unlike sim.py, which configures logging when imported.
+"""
+
+import copy
+
+from agents.registry import WORLD
+from views import neighbourhood
+
+STARTING_COIN = 10000  # every agent's coin at the start of a game
+
+
+def global_max_buy(world_shops):
+    """Best buy price per resource over every shop. Prices never change, so
+    it holds for the whole game."""
+    best = {}
+    for shop in world_shops.values():
+        for res, info in shop.items():
+            if info["buy"] > best.get(res, 0):
+                best[res] = info["buy"]
+    return best
+
+
+# Indexes an agent can ask for in its manifest (agents/registry.py). Each is
+# built once per game, only if a playing agent lists it, and handed to those
+# agents as meta[name]; agents must treat it as read-only.
+ENGINE_INDEXES = {
+    "global_max_buy": global_max_buy,
+}
+
+
+def build_indexes(world_shops, manifests):
+    """The ENGINE_INDEXES any of the manifests ask for, by name."""
+    wanted = {name for manifest in manifests for name in manifest.indexes}
+    unknown = wanted - ENGINE_INDEXES.keys()
+    if unknown:
+        raise ValueError("unknown engine indexes %s, expected %s" % (sorted(unknown), sorted(ENGINE_INDEXES)))
+    return {name: ENGINE_INDEXES[name](world_shops) for name in wanted}
+
+
+def world_view(world_graph, world_shops, position, radius, proxy=None):
+    """The state's "world": every node (proxy, if given, stands in for them),
+    or for a manifest radius k only the nodes within k hops of the agent."""
+    if radius is not WORLD:
+        return neighbourhood(world_graph, world_shops, position, radius)
+    if proxy is not None:
+        return proxy
+    return {w: {"neighbours": neighbours, "resources": world_shops[w]} for w, neighbours in world_graph.items()}
+
+
+def agent_state(agent, round_number, total_rounds, world_graph, world_shops, proxy=None):
+    """The state an agent is called with, less meta["deadline_ns"], which
+    the caller stamps just before the call."""
+    return {
+        "you": {
+            "coin":agent["coin"],
+            "position":agent["position"],
+            "resources": copy.deepcopy(agent["resources"]),
+            "fills": agent["fills"]
+        },
+        "meta": {
+            "current_round" : round_number,
+            "total_rounds" : total_rounds,
+            "time_used" : agent["time"],
+            **agent["indexes"]
+        },
+        "world": world_view(world_graph, world_shops, agent["position"], agent["radius"], proxy)
+    }
+
+
+def next_plan_step(agent, shop, neighbours):
+    """
+    Pop the agent's next committed move, if it still executes as planned.
+
+    Agents may add "plan": [move, ...] to a move; those moves are played in
+    the following rounds without calling the agent. A planned move may carry
+    "min_sell_price" / "max_buy_price" dicts ({resource: price}) as
+    conditions on its orders. If any order would be rejected or miss its
+    price condition, or the move is illegal, the rest of the plan is dropped
+    and None is returned so the agent gets called as usual.
+    """
+    plan = agent["plan"]
+    if not plan:
+        return None
+    step = plan.popleft()
+    if not isinstance(step, dict):
+        plan.clear()
+        return None
+
+    coin = agent["coin"]
+    held = agent["resources"]
+    min_sell = step.get("min_sell_price", {})
+    for resource_name, quantity in step.get("resources_to_sell_to_shop", {}).items():
+        quantity = int(quantity)
+        info = shop.get(resource_name)
+        if (info is None or quantity < 0 or quantity > held.get(resource_name, 0) or
+                info["buy"] < min_sell.get(resource_name, 0)):
+            plan.clear()
+            return None
+        coin += quantity * info["buy"]
+
+    max_buy = step.get("max_buy_price", {})
+    for resource_name, quantity in step.get("resources_to_buy_from_shop", {}).items():
+        quantity = int(quantity)
+        info = shop.get(resource_name)
+        if (info is None or quantity < 0 or quantity > info["quantity"] or
+                info["sell"] > max_buy.get(resource_name, info["sell"])):
+            plan.clear()
+            return None
+        coin -= quantity * info["sell"]
+        if coin < 0:
+            plan.clear()
+            return None
+
+    destination = step.get("move")
+    if destination is not None and destination != agent["position"] and destination not in neighbours:
+        plan.clear()
+        return None
+
+    return step
+
+
+def set_standing_orders(agent, orders):
+    """
+    Replace the agent's standing orders with move["standing_orders"].
+
+    Format: {"sell": {resource: min_price}, "buy": {resource: [max_qty, max_price]}}.
+    A sell order sells everything held whenever the shop's buy price is at
+    least min_price. A buy order buys (coin permitting) whenever the shop's
+    sell price is at most max_price, up to max_qty in total. Returns an
+    error message, or None if the orders were accepted.
+    """
+    if not isinstance(orders, dict):
+        return "Standing orders expected to be type dict, actual: %s" % orders
+    sells = orders.get("sell", {})
+    buys = orders.get("buy", {})
+    if not isinstance(sells, dict) or not isinstance(buys, dict):
+        return "Standing orders expected dict sell/buy entries, actual: %s" % orders
+    try:
+        sells = {resource_name: float(price) for resource_name, price in sells.items()}
+        buys = {resource_name: [int(quantity), float(price)] for resource_name, (quantity, price) in buys.items()}
+    except (TypeError, ValueError):
+        return "Standing orders expected numeric prices and [max_qty, max_price] buys, actual: %s" % orders
+    agent["orders"] = (sells, buys) if sells or buys else None
+    return None
+
+
+def match_standing_orders(agent, shop):
+    """
+    Fill the agent's standing orders against the shop it is standing at.
+
+    Sells run before buys, as for a move. Fills are appended to
+    agent["fills"] (reported as you["fills"] on the agent's next call) and
+    returned as (action, resource_name, quantity, price) tuples.
+    """
+    sells, buys = agent["orders"]
+    held = agent["resources"]
+    fills = []
+
+    for resource_name, min_price in sells.items():
+        quantity = held.get(resource_name, 0)
+        info = shop.get(resource_name)
+        if quantity > 0 and info is not None and info["buy"] >= min_price:
+            info["quantity"] += quantity
+            held[resource_name] = 0
+            agent["coin"] += quantity * info["buy"]
+            fills.append(("sell", resource_name, quantity, info["buy"]))
+
+    for resource_name, order in list(buys.items()):
+        info = shop.get(resource_name)
+        if info is None or not 0 < info["sell"] <= order[1]:
+            continue
+        quantity = min(order[0], info["quantity"], agent["coin"] // info["sell"])
+        if quantity <= 0:
+            continue
+        info["quantity"] -= quantity
+        held[resource_name] = held.get(resource_name, 0) + quantity
+        agent["coin"] -= quantity * info["sell"]
+        fills.append(("buy", resource_name, quantity, info["sell"]))
+        order[0] -= quantity
+        if order[0] <= 0:
+            del buys[resource_name]
+
+    if not sells and not buys:
+        agent["orders"] = None
+    agent["fills"].extend(fills)
+    return fills
+
+
+# Forks for planning agents. An agent never holds the engine's own world:
+# it may run in a worker thread or process (rounds.py) and is handed a view
+# of it, so a fork is taken over that view. Prices never change during a
+# game, so a fork only tracks the shop quantities a rollout touched; forking
+# it again copies that small overlay. fork() and child forks take ~0.5us on
+# the default world, against ~8ms for a deepcopy of it. With a radius the
+# fork is also confined to the nodes within that many hops of origin, which
+# costs a search of them up front (~130us for 3 hops here, nearly the whole
+# world). WorldFork.settle follows run_sim: sells before buys, quantities
+# truncated with int(), and anything run_sim would reject skipped.
+
+def fork(world, origin=None, radius=None):
+    """A WorldFork of the agent's world, confined to the nodes within radius
+    hops of origin if both are given."""
+    return WorldFork(world, origin, radius)
+
+
+class WorldFork:
+    __slots__ = ('world', 'nodes', 'quantities')
+
+    def __init__(self, world, origin=None, radius=None):
+        self.world = world
+        # anything with `in`: the world view itself when not confined
+        self.nodes = world if radius is None else _within(world, origin, radius)
+        self.quantities = {}  # (node, resource) -> quantity, only when touched
+
+    def fork(self):
+        """Cheap child fork sharing the base world and node set."""
+        child = WorldFork.__new__(WorldFork)
+        child.world = self.world
+        child.nodes = self.nodes
+        child.quantities = self.quantities.copy()
+        return child
+
+    def shop(self, node):
+        """Read-only shop dict from the base world (prices are static)."""
+        return self.world[node]['resources']
+
+    def quantity(self, node, resource):
+        q = self.quantities.get((node, resource))
+        if q is None:
+            return self.world[node]['resources'][resource]['quantity']
+        return q
+
+    def neighbours(self, node):
+        """Neighbours of node that are inside the fork."""
+        nodes = self.nodes
+        return [n for n in self.world[node]['neighbours'] if n in nodes]
+
+    def can_move(self, from_node, to_node):
+        return to_node in self.nodes and (
+            to_node == from_node or to_node in self.world[from_node]['neighbours'])
+
+    def settle(self, node, coin, holdings, sells, buys):
+        """
+        Apply a move's sells then buys at node, mutating holdings in place.
+
+        Returns the agent's coin afterwards.
+        """
+        shop = self.world[node]['resources']
+        quantities = self.quantities
+
+        for res, qty in sells.items():
+            qty = int(qty)
+            if qty < 0 or res not in shop or qty > holdings.get(res, 0):
+                continue
+            key = (node, res)
+            quantities[key] = quantities.get(key, shop[res]['quantity']) + qty
+            holdings[res] -= qty
+            coin += qty * shop[res]['buy']
+
+        for res, qty in buys.items():
+            qty = int(qty)
+            if qty < 0 or res not in shop:
+                continue
+            key = (node, res)
+            stock = quantities.get(key, shop[res]['quantity'])
+            cost = qty * shop[res]['sell']
+            if qty > stock or cost > coin:
+                continue
+            quantities[key] = stock - qty
+            holdings[res] = holdings.get(res, 0) + qty
+            coin -= cost
+
+        return coin
+
+    def stock(self, node):
+        """Shop view for node with this fork's quantities, as best_buys expects."""
+        shop = self.world[node]['resources']
+        quantities = self.quantities
+        return {
+            res: {'buy': info['buy'], 'sell': info['sell'],
+                  'quantity': quantities.get((node, res), info['quantity'])}
+            for res, info in shop.items()
+        }
+
+
+def _within(world, origin, radius):
+    """Nodes within radius hops of origin (BFS)."""
+    seen = {origin}
+    frontier = [origin]
+    for _ in range(radius):
+        nxt = []
+        for node in frontier:
+            for n in world[node]['neighbours']:
+                if n not in seen:
+                    seen.add(n)
+                    nxt.append(n)
+        frontier = nxt
+    return frozenset(seen)
@@ -0,0 +1,125 @@
+"""
+Per-round event batches for sim observers.
+
+Observers are still dicts of callbacks. To receive trades and moves, add:
+
+    'on_round_events': fn(events)       # once per round, before on_round_end
+    'events': ('trades', 'moves')        # kinds wanted, default both
+
+events is a RoundEvents whose trades/moves are column tables (parallel
+lists, one row per applied trade or move), or None for kinds nobody asked
+for. The engine only fills tables somebody subscribed to, so observers
+with just on_round_end cost nothing per trade.
+
+The old per-action 'on_agent_action'(agent_name, action_type, details)
+callback still works; its strings are now built from the batch at round
+end, only when someone subscribed.
+"""
+
+TRADES, MOVES = "trades", "moves"
+KINDS = (TRADES, MOVES)
+
+
+class Trades:
+    """Applied trades, in engine order. side is "buy" or "sell"; standing marks order fills."""
+    __slots__ = ("turn", "agent", "node", "resource", "quantity", "price", "side", "standing")
+
+    def __init__(self):
+        for column in self.__slots__:
+            setattr(self, column, [])
+
+    def append(self, turn, agent, node, resource, quantity, price, side, standing=False):
+        self.turn.append(turn)
+        self.agent.append(agent)
+        self.node.append(node)
+        self.resource.append(resource)
+        self.quantity.append(quantity)
+        self.price.append(price)
+        self.side.append(side)
+        self.standing.append(standing)
+
+    def __len__(self):
+        return len(self.turn)
+
+
+class Moves:
+    """Applied moves that changed position, in engine order."""
+    __slots__ = ("turn", "agent", "origin", "dest")
+
+    def __init__(self):
+        for column in self.__slots__:
+            setattr(self, column, [])
+
+    def append(self, turn, agent, origin, dest):
+        self.turn.append(turn)
+        self.agent.append(agent)
+        self.origin.append(origin)
+        self.dest.append(dest)
+
+    def __len__(self):
+        return len(self.turn)
+
+
+class RoundEvents:
+    """One round's batch. turn is the index of the agent's turn in that round."""
+    __slots__ = ("round", "trades", "moves")
+
+    def __init__(self, round_number, trades, moves):
+        self.round = round_number
+        self.trades = Trades() if trades else None
+        self.moves = Moves() if moves else None
+
+    def actions(self):
+        """(agent_name, action_type, details) tuples in play order, as on_agent_action gets them."""
+        t, m = self.trades, self.moves
+        nt, nm = len(t) if t else 0, len(m) if m else 0
+        i = j = 0
+        while i < nt or j < nm:
+            # A turn's trades come before its move
+            if i < nt and (j >= nm or t.turn[i] <= m.turn[j]):
+                quantity, price = t.quantity[i], t.price[i]
+                details = f"{quantity} {t.resource[i]} for ${quantity * price:,}"
+                if t.standing[i]:
+                    details += " (standing order)"
+                yield t.agent[i], "sold" if t.side[i] == "sell" else "bought", details
+                i += 1
+            else:
+                yield m.agent[j], "moved", f"to node {m.dest[j]}"
+                j += 1
+
+
+class Dispatch:
+    """Which kinds a set of observers want, and delivery of the round's batch."""
+    __slots__ = ("trades", "moves", "on_round_events", "on_agent_action")
+
+    def __init__(self, observers):
+        self.on_round_events = []
+        self.on_agent_action = []
+        wanted = set()
+        for observer in observers:
+            if observer.get('on_round_events'):
+                kinds = set(observer.get('events', KINDS))
+                unknown = kinds - set(KINDS)
+                if unknown:
+                    raise ValueError("unknown observer event kinds %s, expected %s" % (sorted(unknown), KINDS))
+                wanted |= kinds
+                self.on_round_events.append(observer['on_round_events'])
+            if observer.get('on_agent_action'):
+                wanted.update(KINDS)
+                self.on_agent_action.append(observer['on_agent_action'])
+        self.trades = TRADES in wanted
+        self.moves = MOVES in wanted
+
+    def begin(self, round_number):
+        """A batch to fill for this round, or None if nobody wants events."""
+        if self.trades or self.moves:
+            return RoundEvents(round_number, self.trades, self.moves)
+        return None
+
+    def deliver(self, events):
+        for callback in self.on_round_events:
+            callback(events)
+        if self.on_agent_action:
+            for action in events.actions():
+                for callback in self.on_agent_action:
+                    callback(*action)
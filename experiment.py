@@ -13,15 +13,21 @@ import copy
 import random
 import time
 import sys
+from collections import deque
+
+from agents.registry import DEFAULT_MANIFEST
+from engine import build_indexes, match_standing_orders, next_plan_step, set_standing_orders, world_view
+from metrics import STARTING_COIN, per_run, win_counts
+from streaming_stats import Running
 
 # Simulation parameters (must match sim.py)
 NUM_ROUNDS = 200
-STARTING_COIN = 10000
 RESOURCE_PRICES = [5, 25]
 STARTING_QUANTITY = [10, 1000]
 NODE_COUNT = 400
 EDGE_RATIO = 0.02
 RESOURCE_NAMES = ["GOLD", "SILVER", "NANOCHIPS", "CAKE", "AZURE_INSTANCES"]
+TURN_BUDGET_NS = 1000000
 
 
 def build_graph(node_count, edge_ratio):
@@ -68,47 +74,67 @@ def make_world_shops(world_graph):
     return shops
 
 
-def run_single_agent(agent_func, seed=None):
-    """Run a single agent through a full simulation."""
+def run_single_agent(agent_func, seed=None, manifest=DEFAULT_MANIFEST):
+    """Run a single agent through a full simulation, giving it the view radius
+    and indexes its manifest declares."""
     if seed is not None:
         random.seed(seed)
 
     world_graph = build_graph(NODE_COUNT, EDGE_RATIO)
     world_shops = make_world_shops(world_graph)
+    indexes = build_indexes(world_shops, [manifest])
 
     agent_state = {
         "coin": STARTING_COIN,
         "position": random.choice(list(world_graph.keys())),
         "resources": {},
         "time": 0,
-        "persistent_state": {}  # Persistent state across rounds - agents can use for caching
+        "persistent_state": {},  # Persistent state across rounds - agents can use for caching
+        "plan": deque(),
+        "orders": None,
+        "fills": []
     }
 
     for round_number in range(NUM_ROUNDS):
-        state_to_pass = {
-            "you": {
-                "coin": agent_state["coin"],
-                "position": agent_state["position"],
-                "resources": copy.deepcopy(agent_state["resources"])
-            },
-            "meta": {
-                "current_round": round_number,
-                "total_rounds": NUM_ROUNDS
-            },
-            "world": {w: {"neighbours": neighbours, "resources": world_shops[w]}
-                      for w, neighbours in world_graph.items()}
-        }
+        if agent_state["orders"]:
+            match_standing_orders(agent_state, world_shops[agent_state["position"]])
+
+        move = next_plan_step(agent_state, world_shops[agent_state["position"]],
+                              world_graph[agent_state["position"]])
+        if move is None:
+            state_to_pass = {
+                "you": {
+                    "coin": agent_state["coin"],
+                    "position": agent_state["position"],
+                    "resources": copy.deepcopy(agent_state["resources"]),
+                    "fills": agent_state["fills"]
+                },
+                "meta": {
+                    "current_round": round_number,
+                    "total_rounds": NUM_ROUNDS,
+                    "time_used": agent_state["time"],
+                    **indexes
+                },
+                "world": world_view(world_graph, world_shops, agent_state["position"], manifest.radius)
+            }
+            state_to_pass["meta"]["deadline_ns"] = time.monotonic_ns() + TURN_BUDGET_NS
+            agent_state["fills"] = []
+
+            start = time.perf_counter()
+            try:
+                move = agent_func(state_to_pass, agent_state["persistent_state"])
+            except Exception as e:
+                print(f"Agent error: {e}")
+                continue
+            agent_state["time"] += (time.perf_counter() - start)
 
-        start = time.perf_counter()
-        try:
-            move = agent_func(state_to_pass, agent_state["persistent_state"])
-        except Exception as e:
-            print(f"Agent error: {e}")
-            continue
-        agent_state["time"] += (time.perf_counter() - start)
+            if not isinstance(move, dict):
+                continue
 
-        if not isinstance(move, dict):
-            continue
+            if isinstance(move.get("plan"), list):
+                agent_state["plan"].extend(move["plan"])
+            if "standing_orders" in move:
+                set_standing_orders(agent_state, move["standing_orders"])
 
         current_shop = world_shops[agent_state["position"]]
 
@@ -147,31 +173,34 @@ def run_single_agent(agent_func, seed=None):
     return agent_state["coin"], agent_state["time"] * 1000
 
 
-def run_experiment(agent_func, name, num_runs=20, seeds=None):
-    """Run multiple simulations and collect stats."""
+def run_experiment(agent_func, name, num_runs=20, seeds=None, manifest=DEFAULT_MANIFEST):
+    """Run multiple simulations and collect stats (ppr_ci/tpr_ci: 95% CI
+    half-widths; run_efficiency: each run's efficiency, in seed order)."""
     coins = []
-    times = []
-
+    times_s = []
     for i in range(num_runs):
         seed = seeds[i] if seeds else None
-        coin, time_ms = run_single_agent(agent_func, seed)
+        coin, time_ms = run_single_agent(agent_func, seed, manifest)
         coins.append(coin)
-        times.append(time_ms)
+        times_s.append(time_ms / 1000)
 
-    avg_coin = sum(coins) / len(coins)
-    avg_time = sum(times) / len(times)
-    profit = avg_coin - STARTING_COIN
-    ppr = profit / NUM_ROUNDS
-    tpr = avg_time / NUM_ROUNDS
-    efficiency = ppr / tpr if tpr > 0.0001 else ppr * 10000
+    ppr, tpr, eff = per_run(coins, times_s, NUM_ROUNDS)
+    pprs, tprs, effs = Running(), Running(), Running()
+    for p, t, e in zip(ppr, tpr, eff):
+        pprs.add(float(p))
+        tprs.add(float(t))
+        effs.add(float(e))
 
     return {
         "name": name,
-        "avg_coin": avg_coin,
-        "profit": profit,
-        "ppr": ppr,
-        "tpr": tpr,
-        "efficiency": efficiency
+        "avg_coin": STARTING_COIN + pprs.mean * NUM_ROUNDS,
+        "profit": pprs.mean * NUM_ROUNDS,
+        "ppr": pprs.mean,
+        "ppr_ci": pprs.ci(),
+        "tpr": tprs.mean,
+        "tpr_ci": tprs.ci(),
+        "efficiency": effs.mean,
+        "run_efficiency": [float(e) for e in eff],
     }
 
 
@@ -210,8 +239,10 @@ See EXPERIMENTS.md for full methodology.
     import agents as agent_registry
 
     if args.all:
-        # Run ALL agents in the registry (all are frontier agents now)
-        variants = [(func, name) for name, func in agent_registry.agents.items()]
+        # Run ALL agents in the registry (all are frontier agents now); each
+        # plays alone, so the opt-in planning agents are included
+        registry = agent_registry.agents
+        variants = [(registry[name], name) for name in registry.names() if name in registry]
         print(f"Running ALL {len(variants)} frontier agents...\n")
     else:
         # Run key frontier agents (the actual Pareto frontier)
@@ -229,15 +260,15 @@ See EXPERIMENTS.md for full methodology.
     seeds = [random.randint(0, 1000000) for _ in range(num_runs)]
 
     print(f"{num_runs} simulations each\n")
-    print("=" * 80)
-    print(f"{'Variant':<20} {'$/round':>10} {'ms/round':>10} {'Efficiency':>12} {'Δ$/r':>10}")
-    print("=" * 80)
+    print("=" * 96)
+    print(f"{'Variant':<20} {'$/round':>10} {'±95%':>7} {'ms/round':>10} {'±95%':>8} {'Efficiency':>12} {'Δ$/r':>10}")
+    print("=" * 96)
 
     results = []
     baseline_result = None
 
     for agent_func, name in variants:
-        result = run_experiment(agent_func, name, num_runs, seeds)
+        result = run_experiment(agent_func, name, num_runs, seeds, agent_registry.manifests.get(name, DEFAULT_MANIFEST))
         results.append(result)
 
         if baseline_result is None:
@@ -246,9 +277,17 @@ See EXPERIMENTS.md for full methodology.
         else:
             delta = f"{result['ppr'] - baseline_result['ppr']:+.1f}"
 
-        print(f"{name:<20} {result['ppr']:>+10.1f} {result['tpr']:>10.4f} {result['efficiency']:>12.1f} {delta:>10}")
+        print(f"{name:<20} {result['ppr']:>+10.1f} {result['ppr_ci']:>7.1f} {result['tpr']:>10.4f} "
+              f"{result['tpr_ci']:>8.4f} {result['efficiency']:>12.1f} {delta:>10}")
+
+    print("=" * 96)
 
-    print("=" * 80)
+    # Every variant plays the same seeds, so each seed is a run they all
+    # entered; the most efficient wins it
+    flat = [(r['name'], run, e) for r in results for run, e in enumerate(r['run_efficiency'])]
+    counts = win_counts([name for name, _, _ in flat], [run for _, run, _ in flat], [e for _, _, e in flat], num_runs)
+    print("Wins (most efficient on a seed): " +
+          ", ".join(f"{r['name']} {counts.get(r['name'], 0)}" for r in results))
 
     # Pareto dominance check
     print("\n--- Pareto Frontier Analysis ---")
@@ -0,0 +1,124 @@
+"""
+Columnar trade ledger for post-game analysis.
+
+run_sim(ledger=...) records every applied trade and move as one row of
+typed columns (stdlib arrays, preallocated and doubled when full):
+
+    round     int32   round number
+    agent     int16   index into agent_names
+    node      int32   shop the trade happened at, or the move destination
+    resource  int8    index into resource_names, -1 for moves
+    qty       int64   0 for moves
+    price     int64   unit price, 0 for moves
+    side      int8    BUY, SELL or MOVE
+
+Rows are filled from the engine's per-round event batch (events.py), so the
+turn loop itself does no extra work. save() writes an .npz with the columns
+plus agent_names, resource_names, global_max_buy, start_coin and
+final_coin; numpy is only needed for that and for analytics.py.
+"""
+
+from array import array
+from datetime import datetime
+
+BUY, SELL, MOVE = 0, 1, 2
+COLUMNS = (("round", "i"), ("agent", "h"), ("node", "i"), ("resource", "b"),
+           ("qty", "q"), ("price", "q"), ("side", "b"))
+_SIDES = {"buy": BUY, "sell": SELL}
+
+
+def require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("saving a ledger needs numpy: pip install numpy") from None
+    return numpy
+
+
+class Ledger:
+    def __init__(self, capacity=1 << 14):
+        self.capacity = capacity
+        self.columns = {name: array(code, bytes(array(code).itemsize * capacity)) for name, code in COLUMNS}
+        self.rows = 0
+        self.agent_names = []
+        self.resource_names = []
+        self.global_max_buy = []
+        self.start_coin = []
+        self.final_coin = []
+        self._agent_ids = {}
+        self._resource_ids = {}
+
+    def start(self, world_shops, world_agents, resource_names):
+        """Fix the id tables and record each resource's best buy price in the world."""
+        self.agent_names = [a['name'] for a in world_agents]
+        self.start_coin = [a['coin'] for a in world_agents]
+        self._agent_ids = {name: i for i, name in enumerate(self.agent_names)}
+        self.resource_names = list(resource_names)
+        self._resource_ids = {name: i for i, name in enumerate(self.resource_names)}
+        best = dict.fromkeys(self.resource_names, 0)
+        for shop in world_shops.values():
+            for res, info in shop.items():
+                if info['buy'] > best[res]:
+                    best[res] = info['buy']
+        self.global_max_buy = [best[res] for res in self.resource_names]
+
+    def observer(self):
+        """Observer dict subscribing the ledger to the sim's event batches."""
+        return {'on_round_events': self.add_round, 'events': ('trades', 'moves')}
+
+    def add_round(self, events):
+        trades, moves = events.trades, events.moves
+        n = len(trades) + len(moves)
+        if self.rows + n > self.capacity:
+            self._grow(self.rows + n)
+        start, end = self.rows, self.rows + len(trades)
+        agent_ids, resource_ids = self._agent_ids, self._resource_ids
+        c = self.columns
+        c["round"][start:end] = array("i", [events.round]) * len(trades)
+        c["agent"][start:end] = array("h", [agent_ids[name] for name in trades.agent])
+        c["node"][start:end] = array("i", trades.node)
+        c["resource"][start:end] = array("b", [resource_ids[res] for res in trades.resource])
+        c["qty"][start:end] = array("q", trades.quantity)
+        c["price"][start:end] = array("q", trades.price)
+        c["side"][start:end] = array("b", [_SIDES[side] for side in trades.side])
+        start, end = end, end + len(moves)
+        c["round"][start:end] = array("i", [events.round]) * len(moves)
+        c["agent"][start:end] = array("h", [agent_ids[name] for name in moves.agent])
+        c["node"][start:end] = array("i", moves.dest)
+        c["resource"][start:end] = array("b", [-1]) * len(moves)
+        c["qty"][start:end] = array("q", bytes(8 * len(moves)))
+        c["price"][start:end] = array("q", bytes(8 * len(moves)))
+        c["side"][start:end] = array("b", [MOVE]) * len(moves)
+        self.rows = end
+
+    def finish(self, world_agents):
+        coin = {a['name']: a['coin'] for a in world_agents}
+        self.final_coin = [coin[name] for name in self.agent_names]
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, code in COLUMNS:
+            self.columns[name].extend(array(code, bytes(array(code).itemsize * (capacity - self.capacity))))
+        self.capacity = capacity
+
+    def arrays(self):
+        """The ledger as a dict of numpy arrays, trimmed to the rows used."""
+        import numpy as np
+        out = {name: np.frombuffer(self.columns[name], dtype=np.dtype(code))[:self.rows].copy()
+               for name, code in COLUMNS}
+        out["agent_names"] = np.array(self.agent_names)
+        out["resource_names"] = np.array(self.resource_names)
+        out["global_max_buy"] = np.array(self.global_max_buy, dtype=np.int64)
+        out["start_coin"] = np.array(self.start_coin, dtype=np.int64)
+        out["final_coin"] = np.array(self.final_coin, dtype=np.int64)
+        return out
+
+    def save(self, filename=None):
+        """Write the ledger as .npz (needs numpy); returns the filename."""
+        np = require_numpy()
+        if filename is None or filename is True:
+            filename = f"ekon_ledger_{datetime.now().strftime('%Y%m%d_%H%M%S')}.npz"
+        np.savez_compressed(filename, **self.arrays())
+        return filename
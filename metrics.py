@@ -0,0 +1,87 @@
+"""
+Derived per-run metrics, shared by the visualizer, benchmark.py and
+experiment.py so they all score agents the same way.
+
+Inputs are columns: one entry per agent in a run (or per agent-run), with
+coin, time in seconds and rounds played. Efficiency is $/round per ms of
+agent CPU per round; times at or under EFFICIENCY_FLOOR_MS count as that
+floor so near-zero-cost agents don't divide by zero. Aggregates are the
+mean of per-run values everywhere. A run's winner is its most efficient
+agent, the first listed on ties.
+
+The column functions are vectorised with numpy when it's installed; on a
+bare install they fall back to plain lists, with the same results.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from engine import STARTING_COIN
+
+EFFICIENCY_FLOOR_MS = 0.001
+
+
+def efficiency(ppr, tpr_ms):
+    """Profit per round per ms of CPU time per round."""
+    return ppr / max(tpr_ms, EFFICIENCY_FLOOR_MS)
+
+
+def per_run(coin, time_s, rounds, start_coin=STARTING_COIN):
+    """Columns (ppr, tpr_ms, efficiency) for columns of coin and seconds spent.
+    rounds may be a number or a column."""
+    if np is not None:
+        rounds = np.asarray(rounds, dtype=np.float64)
+        ppr = (np.asarray(coin, dtype=np.float64) - start_coin) / rounds
+        tpr = np.asarray(time_s, dtype=np.float64) / rounds * 1000
+        return ppr, tpr, ppr / np.maximum(tpr, EFFICIENCY_FLOOR_MS)
+    if not isinstance(rounds, (list, tuple)):
+        rounds = [rounds] * len(coin)
+    ppr = [(c - start_coin) / r for c, r in zip(coin, rounds)]
+    tpr = [t / r * 1000 for t, r in zip(time_s, rounds)]
+    return ppr, tpr, [efficiency(p, t) for p, t in zip(ppr, tpr)]
+
+
+def ranking(values):
+    """Indices ordering values from best (highest) to worst; ties keep input order."""
+    if np is not None:
+        return [int(i) for i in np.argsort(-np.asarray(values, dtype=np.float64), kind='stable')]
+    return sorted(range(len(values)), key=lambda i: -values[i])
+
+
+def wins(run, eff, n_runs):
+    """Index of each run's winner (highest efficiency) in a flat agent-run table
+    whose run column holds 0..n_runs-1; -1 for a run with no rows."""
+    if np is not None:
+        run = np.asarray(run, dtype=np.int64)
+        eff = np.asarray(eff, dtype=np.float64)
+        # Sort by run, then efficiency descending; the first row of each run wins
+        order = np.lexsort((-eff, run))
+        first = np.full(n_runs, -1)
+        starts = np.flatnonzero(np.r_[True, run[order][1:] != run[order][:-1]])
+        first[run[order][starts]] = order[starts]
+        return [int(i) for i in first]
+    best = [-1] * n_runs
+    for i, (r, e) in enumerate(zip(run, eff)):
+        if best[r] < 0 or e > eff[best[r]]:
+            best[r] = i
+    return best
+
+
+def win_counts(names, run, eff, n_runs):
+    """{name: runs won} over a flat agent-run table (see wins); names that
+    never won are left out."""
+    counts = {}
+    for i in wins(run, eff, n_runs):
+        if i >= 0:
+            counts[names[i]] = counts.get(names[i], 0) + 1
+    return counts
+
+
+def agent_metrics(agents, total_rounds):
+    """One finished run: rows of (agent, ppr, tpr_ms, efficiency) in the given
+    order, and the index of the winner by efficiency (None if no agents)."""
+    ppr, tpr, eff = per_run([a['coin'] for a in agents], [a['time'] for a in agents], total_rounds)
+    rows = [(a, float(p), float(t), float(e)) for a, p, t, e in zip(agents, ppr, tpr, eff)]
+    return rows, (ranking(eff)[0] if rows else None)
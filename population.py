@@ -0,0 +1,366 @@
+"""
+Population mode: thousands of agents drawn from a few strategies, to study
+crowding at a scale run_sim's per-agent dicts can't reach. Needs numpy.
+
+    python population.py global_arb=5000 zen=5000 -r 50
+
+Agent records are arrays (coin, position, time spent, an agents x resources
+inventory), and the shops' prices and stock are nodes x resources arrays.
+Each round:
+
+- turn order is a permutation of the agent indices;
+- every agent is called, in that order, on the world as it stood at the
+  start of the round (whole-world strategies share one world dict per
+  round, radius-k ones get views.neighbourhood);
+- the round's orders are then settled at once: all valid sells, then buys
+  filled per shop and resource in turn order until the stock runs out.
+
+So unlike run_sim an agent doesn't see the trades made earlier in the same
+round; crowding shows up instead as partly filled buys (fill_rate). Plans
+and standing orders are ignored. An agent's buys are accepted while their
+running cost fits its coin after its sells, in the order it gave them.
+
+A strategy whose module also defines "<function>_batch" (agent_batch for
+"global_arb:agent") is called once per round for all its instances:
+
+    agent_batch(batch, state) -> {"sell": int[m, R], "buy": int[m, R], "move": int[m]}
+
+batch holds "position" (int[m]), "coin" (int[m]), "inventory" (int[m, R],
+columns in resource_names order), "meta" (current_round, total_rounds and
+the manifest's indexes) and "world", a BatchWorld. state is one dict per
+strategy, kept across rounds. Each instance is charged an equal share of
+the call's time.
+"""
+
+import random
+import sys
+import time
+import warnings
+
+import numpy as np
+
+import agents as agent_registry
+import engine
+import sim
+from agents.registry import DEFAULT_MANIFEST, WORLD
+from views import neighbourhood
+
+
+class Population:
+    """A population game's state: struct-of-arrays agent records and shop
+    stock, plus per-round history."""
+
+    def __init__(self, strategies, counts, world_graph, world_shops, resource_names, rng):
+        self.strategies = list(strategies)
+        self.strategy = np.repeat(np.arange(len(counts)), counts)  # strategy index per agent
+        n = len(self.strategy)
+        nodes = list(world_graph)
+        self.resource_names = list(resource_names)
+        self.coin = np.full(n, sim.traveller_start_gold, dtype=np.int64)
+        self.position = np.array(nodes, dtype=np.int64)[rng.integers(len(nodes), size=n)]
+        self.time = np.zeros(n)
+        self.inventory = np.zeros((n, len(resource_names)), dtype=np.int64)
+
+        shape = (len(nodes), len(resource_names))
+        self.buy_price = np.zeros(shape, dtype=np.int64)
+        self.sell_price = np.zeros(shape, dtype=np.int64)
+        self.stock = np.zeros(shape, dtype=np.int64)
+        res_id = {res: j for j, res in enumerate(resource_names)}
+        for w, shop in world_shops.items():
+            for res, info in shop.items():
+                j = res_id[res]
+                self.buy_price[w, j] = info['buy']
+                self.sell_price[w, j] = info['sell']
+                self.stock[w, j] = info['quantity']
+
+        # Total stock per resource at the start and after each round, and
+        # per round the fraction of accepted buy units that were filled
+        self.stock_history = [self.stock.sum(axis=0)]
+        self.fill_rate = []
+
+    def __len__(self):
+        return len(self.strategy)
+
+    def summary(self, rounds):
+        """Per strategy: (name, count, mean $/round, std $/round, mean ms/round)."""
+        ppr = (self.coin - sim.traveller_start_gold) / rounds
+        tpr = self.time / rounds * 1000
+        out = []
+        for k, name in enumerate(self.strategies):
+            mask = self.strategy == k
+            out.append((name, int(mask.sum()), float(ppr[mask].mean()), float(ppr[mask].std()),
+                        float(tpr[mask].mean())))
+        return out
+
+
+class BatchWorld:
+    """The world as arrays, for batch entry points. Shop arrays are nodes x
+    resources (in resource_names order); stock is live, the rest is fixed.
+
+    has[w, j]        shop w trades resource j
+    shop_order[w]    the shop's resources in its own dict order, -1 padded
+    adj[adj_ptr[w]:adj_ptr[w + 1]]    w's neighbours, in dict order
+    """
+
+    def __init__(self, pop, world_graph, world_shops):
+        self.resource_names = pop.resource_names
+        self.buy_price = pop.buy_price
+        self.sell_price = pop.sell_price
+        self.stock = pop.stock
+        n_nodes, n_res = pop.stock.shape
+        res_id = {res: j for j, res in enumerate(self.resource_names)}
+        self.has = np.zeros((n_nodes, n_res), dtype=bool)
+        self.shop_order = np.full((n_nodes, n_res), -1, dtype=np.int64)
+        for w, shop in world_shops.items():
+            for slot, res in enumerate(shop):
+                self.has[w, res_id[res]] = True
+                self.shop_order[w, slot] = res_id[res]
+        self.degree = np.array([len(world_graph[w]) for w in range(n_nodes)], dtype=np.int64)
+        self.adj_ptr = np.r_[0, np.cumsum(self.degree)]
+        self.adj = np.array([n for w in range(n_nodes) for n in world_graph[w]], dtype=np.int64)
+        self._edges = np.sort(np.repeat(np.arange(n_nodes), self.degree) * n_nodes + self.adj)
+
+    def valid_moves(self, position, dest):
+        """Mask of dest entries that are position itself or one of its neighbours."""
+        n_nodes = len(self.degree)
+        inside = (dest >= 0) & (dest < n_nodes)
+        key = position * n_nodes + np.where(inside, dest, 0)
+        found = np.searchsorted(self._edges, key)
+        edge = self._edges[np.minimum(found, len(self._edges) - 1)] == key
+        return inside & ((dest == position) | edge)
+
+
+def settle(pop, rank, sells, buys):
+    """Apply one round's orders. sells/buys are (agent, resource, quantity)
+    arrays; rank is each agent's turn. Returns the buy units accepted and
+    filled, and the shop cells (node * resources + resource) that changed."""
+    n_res = len(pop.resource_names)
+    touched = []
+
+    si, sj, sq = sells
+    ok = sq <= pop.inventory[si, sj]
+    si, sj, sq = si[ok], sj[ok], sq[ok]
+    node = pop.position[si]
+    np.subtract.at(pop.inventory, (si, sj), sq)
+    np.add.at(pop.coin, si, sq * pop.buy_price[node, sj])
+    np.add.at(pop.stock, (node, sj), sq)
+    touched.append(node * n_res + sj)
+
+    bi, bj, bq = buys
+    node = pop.position[bi]
+    price = pop.sell_price[node, bj]
+    # Orders arrive grouped by agent; keep each agent's prefix that it can pay for
+    cost = bq * price
+    running = np.cumsum(cost)
+    starts = np.flatnonzero(np.r_[True, bi[1:] != bi[:-1]]) if len(bi) else np.array([], dtype=np.int64)
+    before = np.repeat(running[starts] - cost[starts], np.diff(np.r_[starts, len(bi)]))
+    ok = running - before <= pop.coin[bi]
+    bi, bj, bq, node, price = bi[ok], bj[ok], bq[ok], node[ok], price[ok]
+
+    # Within each shop and resource, fill in turn order until the stock runs out
+    cell = node * n_res + bj
+    order = np.lexsort((rank[bi], cell))
+    bi, bj, bq, node, price, cell = bi[order], bj[order], bq[order], node[order], price[order], cell[order]
+    wanted = np.cumsum(bq)
+    starts = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]]) if len(cell) else np.array([], dtype=np.int64)
+    before = np.repeat(wanted[starts] - bq[starts], np.diff(np.r_[starts, len(cell)]))
+    ahead = wanted - bq - before  # units wanted by earlier turns at this shop
+    fill = np.clip(pop.stock[node, bj] - ahead, 0, bq)
+    np.add.at(pop.inventory, (bi, bj), fill)
+    np.subtract.at(pop.coin, bi, fill * price)
+    np.subtract.at(pop.stock, (node, bj), fill)
+    touched.append(cell)
+
+    return int(bq.sum()), int(fill.sum()), np.unique(np.concatenate(touched))
+
+
+def run_population(population, rounds=None, seed=None, observer=None, batch=True):
+    """
+    Play a population game and return the Population.
+
+    Args:
+        population: {strategy name: number of agents}, names from the registry
+        rounds: Defaults to sim.num_rounds
+        seed: Seeds the world, start positions and turn orders
+        observer: Optional dict with on_round_end(round_num, total_rounds, population)
+            -> bool, False to stop early
+        batch: Use strategies' batch entry points where they have one;
+            False calls every instance one by one
+    """
+    rounds = sim.num_rounds if rounds is None else rounds
+    if seed is not None:
+        random.seed(seed)
+    rng = np.random.default_rng(seed)
+
+    world_graph = sim.build_graph(sim.node_count, sim.edge_ratio)
+    world_shops = sim.make_world_shops(world_graph)
+    names = sim.resource_names
+    res_id = {res: j for j, res in enumerate(names)}
+
+    strategies = list(population)
+    funcs = [agent_registry.agents[name] for name in strategies]
+    manifests = [agent_registry.manifests.get(name, DEFAULT_MANIFEST) for name in strategies]
+    indexes = engine.build_indexes(world_shops, manifests)
+    extra_meta = [{name: indexes[name] for name in m.indexes} for m in manifests]
+    radii = [m.radius for m in manifests]
+
+    pop = Population(strategies, [population[name] for name in strategies], world_graph, world_shops, names, rng)
+    n = len(pop)
+    strategy = pop.strategy.tolist()
+    states = [{} for _ in range(n)]
+
+    batch_funcs = [agent_registry.batch(name) if batch else None for name in strategies]
+    batched = np.array([f is not None for f in batch_funcs])
+    batch_world = BatchWorld(pop, world_graph, world_shops) if batched.any() else None
+    batch_states = [{} for _ in strategies]
+    members = [np.flatnonzero(pop.strategy == k) for k in range(len(strategies))]
+    rank = np.empty(n, dtype=np.int64)
+    ignored = set()
+
+    for round_number in range(rounds):
+        order = rng.permutation(n)
+        rank[order] = np.arange(n)
+        positions = pop.position.tolist()
+        coins = pop.coin.tolist()
+        held = pop.inventory.tolist()
+        spent = pop.time.tolist()
+        dest = list(positions)
+        si, sj, sq, bi, bj, bq = [], [], [], [], [], []
+        full_world = None
+
+        for i in order[~batched[pop.strategy[order]]].tolist():
+            k = strategy[i]
+            pos = positions[i]
+            if radii[k] is WORLD:
+                if full_world is None:
+                    full_world = engine.world_view(world_graph, world_shops, pos, WORLD)
+                world = full_world
+            else:
+                world = neighbourhood(world_graph, world_shops, pos, radii[k])
+            state = {
+                "you": {
+                    "coin": coins[i],
+                    "position": pos,
+                    "resources": {names[j]: q for j, q in enumerate(held[i]) if q},
+                    "fills": []
+                },
+                "meta": {
+                    "current_round": round_number,
+                    "total_rounds": rounds,
+                    "time_used": spent[i],
+                    **extra_meta[k]
+                },
+                "world": world
+            }
+            state["meta"]["deadline_ns"] = time.monotonic_ns() + sim.turn_budget_ns
+
+            start = time.perf_counter()
+            try:
+                move = funcs[k](state, states[i])
+            except Exception:
+                spent[i] += time.perf_counter() - start
+                continue
+            spent[i] += time.perf_counter() - start
+            if not isinstance(move, dict):
+                continue
+            if strategies[k] not in ignored and (move.get("plan") or move.get("standing_orders")):
+                ignored.add(strategies[k])
+                warnings.warn("population mode ignores plans and standing orders (%s)" % strategies[k])
+
+            shop = world_shops[pos]
+            for res, quantity in move.get("resources_to_sell_to_shop", {}).items():
+                quantity = int(quantity)
+                if quantity > 0 and res in shop:
+                    si.append(i); sj.append(res_id[res]); sq.append(quantity)
+            for res, quantity in move.get("resources_to_buy_from_shop", {}).items():
+                quantity = int(quantity)
+                if quantity > 0 and res in shop:
+                    bi.append(i); bj.append(res_id[res]); bq.append(quantity)
+            target = move.get("move")
+            if target is not None and (target == pos or target in world_graph[pos]):
+                dest[i] = target
+
+        pop.time[:] = spent
+        dest = np.array(dest, dtype=np.int64)
+        sells = [(np.array(si, dtype=np.int64), np.array(sj, dtype=np.int64), np.array(sq, dtype=np.int64))]
+        buys = [(np.array(bi, dtype=np.int64), np.array(bj, dtype=np.int64), np.array(bq, dtype=np.int64))]
+        for k, func in enumerate(batch_funcs):
+            if func is None or not len(members[k]):
+                continue
+            idx = members[k]
+            position = pop.position[idx]
+            start = time.perf_counter()
+            out = func({
+                "position": position.copy(),
+                "coin": pop.coin[idx],
+                "inventory": pop.inventory[idx],
+                "meta": {"current_round": round_number, "total_rounds": rounds, **extra_meta[k]},
+                "world": batch_world
+            }, batch_states[k])
+            pop.time[idx] += (time.perf_counter() - start) / len(idx)
+            listed = batch_world.has[position]
+            for orders, arrays in ((out["sell"], sells), (out["buy"], buys)):
+                rows, cols = np.nonzero((orders > 0) & listed)
+                arrays.append((idx[rows], cols, orders[rows, cols].astype(np.int64)))
+            target = np.asarray(out["move"], dtype=np.int64)
+            ok = batch_world.valid_moves(position, target)
+            dest[idx[ok]] = target[ok]
+
+        sells = tuple(np.concatenate(column) for column in zip(*sells))
+        buys = tuple(np.concatenate(column) for column in zip(*buys))
+        accepted, filled, touched = settle(pop, rank, sells, buys)
+        pop.position[:] = dest
+
+        # Agents read shops through the dicts; copy back the stock that moved
+        n_res = len(names)
+        for cell in touched.tolist():
+            w, j = divmod(cell, n_res)
+            world_shops[w][names[j]]['quantity'] = int(pop.stock[w, j])
+
+        pop.stock_history.append(pop.stock.sum(axis=0))
+        pop.fill_rate.append(filled / accepted if accepted else 1.0)
+        if observer and 'on_round_end' in observer:
+            if not observer['on_round_end'](round_number, rounds, pop):
+                break
+
+    return pop
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Population game: many agents from a few strategies')
+    parser.add_argument('population', nargs='+', help='strategy=count, e.g. global_arb=5000')
+    parser.add_argument('-r', '--rounds', type=int, default=sim.num_rounds, help='Rounds to play')
+    parser.add_argument('--seed', type=int, help='Seed for the world and turn orders')
+    parser.add_argument('--no-batch', action='store_true', help='Call every instance on its own, even with a batch entry point')
+    args = parser.parse_args()
+
+    population = {}
+    for item in args.population:
+        name, _, count = item.partition('=')
+        population[name] = int(count or 1)
+
+    start = time.perf_counter()
+    pop = run_population(population, args.rounds, args.seed, batch=not args.no_batch)
+    elapsed = time.perf_counter() - start
+    rounds = len(pop.fill_rate)
+
+    print(f"{len(pop)} agents, {rounds} rounds in {elapsed:.1f}s "
+          f"({len(pop) * rounds / elapsed:,.0f} agent-turns/s, {pop.time.sum() / elapsed:.0%} in agents)")
+    print(f"\n{'STRATEGY':24} {'COUNT':>7} {'$/r':>10} {'STD':>9} {'ms/r':>9}")
+    for name, count, ppr, std, tpr in pop.summary(rounds):
+        print(f"{name:24} {count:>7} {ppr:>+10,.1f} {std:>9,.1f} {tpr:>9.4f}")
+
+    start_stock = pop.stock_history[0]
+    print(f"\n{'RESOURCE':18} {'STOCK START':>12} {'STOCK END':>12} {'LEFT':>6}")
+    for j, res in enumerate(pop.resource_names):
+        left = pop.stock_history[-1][j] / start_stock[j] if start_stock[j] else 0
+        print(f"{res:18} {start_stock[j]:>12,} {pop.stock_history[-1][j]:>12,} {left:>6.0%}")
+    tenth = max(1, rounds // 10)
+    print(f"\nBuy fill rate: first {tenth} rounds {np.mean(pop.fill_rate[:tenth]):.0%}, "
+          f"last {tenth} rounds {np.mean(pop.fill_rate[-tenth:]):.0%}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Game recordings and a replay engine for Ekon.
+
+run_sim(record=...) writes a JSON-lines recording:
+
+    line 1     header: seed, config, graph, shop prices, agent names
+    line 2..   one line per round: the turn order, every trade and move the
+               engine applied, each agent's time at round end, and every
+               KEYFRAME_EVERY rounds a keyframe of the full world state at
+               round start (coin, position, holdings, time, shop stock)
+
+Only applied outcomes are stored, never agent calls, so a replay needs no
+agents and no engine rules: seeking restores the nearest keyframe and
+re-applies at most KEYFRAME_EVERY rounds of trades and moves. Playing
+forward from the last seek is one round of deltas per step.
+
+    python replay.py ekon_replay_20250101_120000.jsonl        # final standings
+    python replay.py ekon_replay_20250101_120000.jsonl 57     # after round 58
+    python run_visual.py --replay ekon_replay_20250101_120000.jsonl
+"""
+
+import bisect
+import json
+import sys
+from datetime import datetime
+
+KEYFRAME_EVERY = 20
+
+
+class Recorder:
+    """Engine side: collects one round of outcomes and writes it at round end."""
+
+    def __init__(self, filename=None, keyframe_every=KEYFRAME_EVERY):
+        if filename is None or filename is True:
+            filename = f"ekon_replay_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        self.filename = filename
+        self.keyframe_every = keyframe_every
+        self.file = open(filename, 'w')
+        self.index = {}
+        self.round = None
+
+    def start(self, seed, config, world_graph, world_shops, world_agents):
+        self.index = {a['name']: i for i, a in enumerate(world_agents)}
+        self._line({
+            "seed": seed,
+            "config": config,
+            "keyframe_every": self.keyframe_every,
+            "graph": [[node, list(neighbours.items())] for node, neighbours in world_graph.items()],
+            "prices": [[node, {res: [info['buy'], info['sell']] for res, info in shop.items()}]
+                       for node, shop in world_shops.items()],
+            "agents": [a['name'] for a in world_agents],
+        })
+
+    def round_start(self, round_number, world_agents, world_shops):
+        index = self.index
+        self.round = {"round": round_number, "order": [index[a['name']] for a in world_agents], "ops": []}
+        if round_number % self.keyframe_every == 0:
+            agents = [None] * len(world_agents)
+            for a in world_agents:
+                agents[index[a['name']]] = [a['coin'], a['position'], dict(a['resources']), a['time']]
+            self.round["keyframe"] = {
+                "agents": agents,
+                "stock": [[node, {res: info['quantity'] for res, info in shop.items()}]
+                          for node, shop in world_shops.items()],
+            }
+
+    def trade(self, agent_name, action, resource, quantity, price):
+        self.round["ops"].append((self.index[agent_name], "s" if action == "sell" else "b", resource, quantity, price))
+
+    def move(self, agent_name, to_pos):
+        self.round["ops"].append((self.index[agent_name], "m", to_pos))
+
+    def round_end(self, world_agents):
+        times = [0.0] * len(world_agents)
+        for a in world_agents:
+            times[self.index[a['name']]] = a['time']
+        self.round["times"] = times
+        self._line(self.round)
+        self.round = None
+
+    def close(self):
+        self.file.close()
+
+    def _line(self, obj):
+        self.file.write(json.dumps(obj))
+        self.file.write("\n")
+
+
+class Replay:
+    """
+    Load a recording and reconstruct the world after any round.
+
+    seek() returns (agents, shops) shaped like run_sim's world_agents (in that
+    round's turn order) and world_shops. They are the replay's live state:
+    copy them if you need them past the next seek.
+    """
+
+    def __init__(self, filename):
+        with open(filename) as f:
+            header = json.loads(f.readline())
+            self.rounds = [json.loads(line) for line in f if line.strip()]
+        self.seed = header["seed"]
+        self.config = header["config"]
+        self.keyframe_every = header["keyframe_every"]
+        self.names = header["agents"]
+        self.graph = {node: dict(neighbours) for node, neighbours in header["graph"]}
+        self.prices = {node: prices for node, prices in header["prices"]}
+        self.total_rounds = self.config["num_rounds"]
+        self.keyframes = [i for i, rnd in enumerate(self.rounds) if "keyframe" in rnd]
+        self.agents = None
+        self._by_index = None  # the same agent dicts, in header order
+        self.shops = None
+        self.position = -1  # last round applied to agents/shops, -1 = none
+
+    def __len__(self):
+        return len(self.rounds)
+
+    def seek(self, round_number):
+        """World state at the end of round_number (0-based)."""
+        if not 0 <= round_number < len(self.rounds):
+            raise IndexError("round %d not in recording (0-%d)" % (round_number, len(self.rounds) - 1))
+        start = self._keyframe_before(round_number)
+        if not start <= self.position <= round_number:
+            self._restore(start)
+        while self.position < round_number:
+            self._apply(self.position + 1)
+        return self.agents, self.shops
+
+    def frames(self, start=0, stop=None):
+        """Yield (round, agents, shops) for each round from start, one round of deltas per step."""
+        stop = len(self.rounds) if stop is None else min(stop, len(self.rounds))
+        for round_number in range(start, stop):
+            agents, shops = self.seek(round_number)
+            yield round_number, agents, shops
+
+    def actions(self, round_number):
+        """The round's trades and moves as observer (agent_name, action_type, details) tuples."""
+        out = []
+        for op in self.rounds[round_number]["ops"]:
+            name = self.names[op[0]]
+            if op[1] == "m":
+                out.append((name, "moved", f"to node {op[2]}"))
+            else:
+                _, kind, res, qty, price = op
+                out.append((name, "sold" if kind == "s" else "bought", f"{qty} {res} for ${qty * price:,}"))
+        return out
+
+    def play(self, observer, start=0, stop=None):
+        """Drive run_sim-style observer callbacks from the recording; no agents are called."""
+        for round_number, agents, shops in self.frames(start, stop):
+            if 'on_agent_action' in observer:
+                for action in self.actions(round_number):
+                    observer['on_agent_action'](*action)
+            if 'on_round_end' in observer:
+                if not observer['on_round_end'](round_number, self.total_rounds, agents, shops):
+                    break
+
+    def _keyframe_before(self, round_number):
+        return self.keyframes[bisect.bisect_right(self.keyframes, round_number) - 1]
+
+    def _restore(self, round_number):
+        """Load the keyframe taken at the start of round_number."""
+        keyframe = self.rounds[round_number]["keyframe"]
+        self._by_index = [
+            {"name": name, "coin": coin, "position": position, "resources": dict(resources), "time": time}
+            for name, (coin, position, resources, time) in zip(self.names, keyframe["agents"])
+        ]
+        stock = dict(keyframe["stock"])
+        self.shops = {
+            node: {res: {"buy": buy, "sell": sell, "quantity": stock[node][res]}
+                   for res, (buy, sell) in prices.items()}
+            for node, prices in self.prices.items()
+        }
+        self.agents = self._by_index
+        self.position = round_number - 1
+
+    def _apply(self, round_number):
+        rnd = self.rounds[round_number]
+        agents, shops = self._by_index, self.shops
+        for op in rnd["ops"]:
+            agent = agents[op[0]]
+            if op[1] == "m":
+                agent["position"] = op[2]
+                continue
+            _, kind, res, qty, price = op
+            held = agent["resources"]
+            stock = shops[agent["position"]][res]
+            if kind == "s":
+                stock["quantity"] += qty
+                held[res] -= qty
+                agent["coin"] += qty * price
+            else:
+                stock["quantity"] -= qty
+                held[res] = held.get(res, 0) + qty
+                agent["coin"] -= qty * price
+        for agent, t in zip(agents, rnd["times"]):
+            agent["time"] = t
+        self.agents = [agents[i] for i in rnd["order"]]
+        self.position = round_number
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python replay.py <recording.jsonl> [round]")
+        sys.exit(1)
+    replay = Replay(sys.argv[1])
+    round_number = int(sys.argv[2]) if len(sys.argv) > 2 else len(replay) - 1
+    agents, _ = replay.seek(round_number)
+    print(f"Round {round_number + 1}/{replay.total_rounds} (seed {replay.seed})")
+    for n, agent in enumerate(sorted(agents, key=lambda a: a['coin'], reverse=True)):
+        print(f"  {n + 1}. {agent['name']}: ${agent['coin']:,} at node {agent['position']} | {agent['resources']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,425 @@
+"""
+Snapshot rounds: every agent decides against the world as it stood at the
+start of the round, then the moves are settled in the round's turn order.
+
+    run_sim(round_model="snapshot")                              # one after another
+    run_sim(round_model="snapshot", pool="thread")               # ThreadDecider
+    run_sim(round_model="snapshot", pool="process", workers=4)   # ProcessDecider
+    run_sim(round_model="snapshot", pool="auto")                 # threads if free-threaded
+    run_sim(round_model="snapshot", pool="agent")                # AgentProcessDecider
+
+No agent sees another's trades until the round settles, so the decisions
+are independent and can run on a pool. Settling goes through run_sim's
+usual code, so sells, plans and standing orders work as in sequential
+rounds. Buys are the exception: where the buys at one shop ask for more of
+a resource than it holds, resolve_buys() splits that stock in proportion
+to the quantities asked (each capped at what the agent can pay for), and
+hands out the units left over by largest remainder, ties drawn from an RNG
+seeded with the game. Standing orders fill for every agent before anyone
+decides, so the split covers what they leave. No agent gets a better fill
+for its place in the turn order. Sells made this round don't feed this
+round's buys.
+
+Each agent's time is taken around its own call, in whichever thread or
+process made it. Processes run in parallel but hold their agents' state
+dicts for the whole game (the engine's agent["state"] stays empty) and
+cost a copy of the shop quantities per worker per round; with pool="agent"
+every agent has a process to itself, reads the quantities from shared
+memory and is timed by its own CPU clock. Threads share the
+engine's world, read-only: the engine writes nothing while decisions run,
+and thread-pool agents see the graph and shops through read_only() views,
+so a write raises TypeError in the agent instead of racing another thread.
+On a GIL build threads only overlap where agents release the GIL (numpy
+work); on a free-threaded build (3.13t) they run Python in parallel.
+pool="auto" takes threads there and processes otherwise. Agents that draw
+from the random module make a pooled game irreproducible.
+"""
+
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pipe, Process
+from multiprocessing.shared_memory import SharedMemory
+from types import MappingProxyType
+
+import engine
+import sim
+from agents.registry import WORLD
+from views import WorldProxy, within
+
+
+def free_threaded():
+    """True on a free-threaded build running with the GIL off."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def read_only(world_graph, world_shops):
+    """Read-only views of the graph and shops, down to each resource's
+    prices and quantity. They are views, not copies: made once per game,
+    they follow the engine's writes between rounds."""
+    graph = {w: MappingProxyType(neighbours) for w, neighbours in world_graph.items()}
+    shops = {w: MappingProxyType({resource_name: MappingProxyType(info) for resource_name, info in shop.items()})
+             for w, shop in world_shops.items()}
+    return MappingProxyType(graph), MappingProxyType(shops)
+
+
+class Decider:
+    """Calls agents one after another in the engine's thread."""
+
+    def __init__(self, world_graph, world_shops, total_rounds, proxy=None):
+        self.world_graph = world_graph
+        self.world_shops = world_shops
+        self.total_rounds = total_rounds
+        self.proxy = proxy
+
+    def decide(self, agents, round_number):
+        """(move, called, error, state) for each agent, adding its time."""
+        states = []
+        for agent in agents:
+            states.append(engine.agent_state(agent, round_number, self.total_rounds,
+                                          self.world_graph, self.world_shops, self.proxy))
+            agent["fills"] = []
+        return self.map(call, agents, states)
+
+    def map(self, func, *columns):
+        return list(map(func, *columns))
+
+    def close(self):
+        pass
+
+
+class ThreadDecider(Decider):
+    """Calls agents on a thread pool, with read_only() views of the world;
+    states are built before any call."""
+
+    def __init__(self, workers, world_graph, world_shops, total_rounds, proxy=None):
+        world_graph, world_shops = read_only(world_graph, world_shops)
+        if proxy is not None:
+            proxy = WorldProxy(world_graph, world_shops)
+        super().__init__(world_graph, world_shops, total_rounds, proxy)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def map(self, func, *columns):
+        return list(self.executor.map(func, *columns))
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+def call(agent, state):
+    state["meta"]["deadline_ns"] = time.monotonic_ns() + sim.turn_budget_ns
+    start = time.time()
+    move = error = None
+    try:
+        move = agent["func"](state, agent["state"])
+    except Exception as e:
+        error = e
+    agent["time"] += time.time() - start  # one call per agent per round, so no race
+    return move, True, error, state
+
+
+class ProcessDecider:
+    """Agents pinned to worker processes for the whole game.
+
+    Agents are dealt to workers by their manifest ms/round, heaviest first
+    to the least loaded, so the slowest worker sets the round's latency.
+    Each round a worker gets the shop quantities and, per agent it calls,
+    the agent's coin, position, holdings, fills and time used; it returns
+    the moves and the time each call took.
+    """
+
+    def __init__(self, workers, world_graph, world_shops, world_agents, total_rounds, proxy=None):
+        workers = max(1, min(workers, len(world_agents)))
+        seats = [[] for _ in range(workers)]
+        load = [0.0] * workers
+        self.worker_of = {}
+        for agent in sorted(world_agents, key=lambda a: -(a["manifest"].ms_per_round or 0)):
+            w = load.index(min(load))
+            load[w] += agent["manifest"].ms_per_round or 0
+            seats[w].append((agent["name"], agent["func"], agent["radius"], agent["indexes"]))
+            self.worker_of[agent["name"]] = w
+
+        self.cells = [info for shop in world_shops.values() for info in shop.values()]
+        self.conns = []
+        self.processes = []
+        for seated in seats:
+            conn, child = Pipe()
+            process = Process(target=worker, daemon=True,
+                              args=(child, world_graph, world_shops, seated, total_rounds,
+                                    proxy is not None, sim.turn_budget_ns))
+            process.start()
+            child.close()
+            self.conns.append(conn)
+            self.processes.append(process)
+
+    def decide(self, agents, round_number):
+        jobs = [[] for _ in self.conns]
+        for agent in agents:
+            jobs[self.worker_of[agent["name"]]].append(
+                (agent["name"], agent["coin"], agent["position"], agent["resources"], agent["fills"], agent["time"]))
+            agent["fills"] = []
+        quantities = [info["quantity"] for info in self.cells]
+        for conn, job in zip(self.conns, jobs):
+            if job:
+                conn.send((round_number, quantities, job))
+        results = {}
+        for conn, job in zip(self.conns, jobs):
+            if job:
+                results.update(conn.recv())
+        decided = []
+        for agent in agents:
+            move, error, elapsed = results[agent["name"]]
+            agent["time"] += elapsed
+            decided.append((move, True, error, None))
+        return decided
+
+    def close(self):
+        stop(self.conns, self.processes)
+
+
+def stop(conns, processes, timeout=1.0):
+    """Ask workers to exit and terminate those that don't within timeout.
+    Safe on dead workers and on workers still busy with a round."""
+    for conn in conns:
+        try:
+            conn.send(None)
+        except OSError:  # the worker is gone
+            pass
+    for process in processes:
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    for conn in conns:
+        conn.close()
+    conns.clear()
+    processes.clear()
+
+
+def worker(conn, world_graph, world_shops, seated, total_rounds, use_proxy, turn_budget_ns):
+    """ProcessDecider's worker loop: a copy of the world, and the agents
+    seated here with their state dicts."""
+    cells = [info for shop in world_shops.values() for info in shop.values()]
+    proxy = WorldProxy(world_graph, world_shops) if use_proxy else None
+    agents = {name: {"func": func, "state": {}, "radius": radius, "indexes": indexes}
+              for name, func, radius, indexes in seated}
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        round_number, quantities, job = message
+        for info, quantity in zip(cells, quantities):
+            info["quantity"] = quantity
+        results = {}
+        for name, coin, position, resources, fills, time_used in job:
+            agent = agents[name]
+            agent.update(coin=coin, position=position, resources=resources, fills=fills, time=time_used)
+            state = engine.agent_state(agent, round_number, total_rounds, world_graph, world_shops, proxy)
+            state["meta"]["deadline_ns"] = time.monotonic_ns() + turn_budget_ns
+            start = time.time()
+            move = error = None
+            try:
+                move = agent["func"](state, agent["state"])
+            except Exception as e:
+                error = e
+            results[name] = sendable(move, error, time.time() - start)
+        conn.send(results)
+
+
+class AgentProcessDecider:
+    """Each agent in a worker process of its own, for the whole game.
+
+    Shop quantities live in one shared-memory array of int64, written by
+    the engine once per round before any call; a worker copies the cells
+    its agent can see (its manifest radius, or all) into its own shop dicts
+    before starting the clock. Over each agent's pipe go only its
+    coin/position/holdings in and its move out. Time is the worker's CPU
+    time (time.process_time), so it doesn't count other agents' work,
+    whatever they left in the caches, or waiting for a core.
+    """
+
+    def __init__(self, world_graph, world_shops, world_agents, total_rounds, proxy=None):
+        self.cells = [info for shop in world_shops.values() for info in shop.values()]
+        self.memory = SharedMemory(create=True, size=8 * max(1, len(self.cells)))
+        self.quantities = self.memory.buf.cast("q")
+        self.conns = {}
+        self.processes = []
+        for agent in world_agents:
+            conn, child = Pipe()
+            process = Process(target=agent_worker, daemon=True,
+                              args=(child, self.memory, world_graph, world_shops, agent["func"], agent["radius"],
+                                    agent["indexes"], total_rounds, proxy is not None, sim.turn_budget_ns))
+            process.start()
+            child.close()
+            self.conns[agent["name"]] = conn
+            self.processes.append(process)
+
+    def decide(self, agents, round_number):
+        for i, info in enumerate(self.cells):
+            self.quantities[i] = info["quantity"]
+        for agent in agents:
+            self.conns[agent["name"]].send(
+                (round_number, agent["coin"], agent["position"], agent["resources"], agent["fills"], agent["time"]))
+            agent["fills"] = []
+        decided = []
+        for agent in agents:
+            move, error, elapsed = self.conns[agent["name"]].recv()
+            agent["time"] += elapsed
+            decided.append((move, True, error, None))
+        return decided
+
+    def close(self):
+        stop(list(self.conns.values()), self.processes)
+        self.conns.clear()
+        if self.memory is not None:
+            self.quantities.release()  # memory.close() fails while a view of it is exported
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
+
+
+def agent_worker(conn, memory, world_graph, world_shops, func, radius, indexes, total_rounds, use_proxy,
+                 turn_budget_ns):
+    """AgentProcessDecider's worker loop, for one agent."""
+    quantities = memory.buf.cast("q")
+    node_cells = {}
+    i = 0
+    for w, shop in world_shops.items():
+        node_cells[w] = []
+        for info in shop.values():
+            node_cells[w].append((info, i))
+            i += 1
+    proxy = WorldProxy(world_graph, world_shops) if use_proxy else None
+    agent = {"func": func, "state": {}, "radius": radius, "indexes": indexes}
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        round_number, coin, position, resources, fills, time_used = message
+        seen = world_shops if radius is WORLD else within(world_graph, position, radius)
+        for w in seen:
+            for info, i in node_cells[w]:
+                info["quantity"] = quantities[i]
+        agent.update(coin=coin, position=position, resources=resources, fills=fills, time=time_used)
+        state = engine.agent_state(agent, round_number, total_rounds, world_graph, world_shops, proxy)
+        state["meta"]["deadline_ns"] = time.monotonic_ns() + turn_budget_ns
+        start = time.process_time()
+        move = error = None
+        try:
+            move = func(state, agent["state"])
+        except Exception as e:
+            error = e
+        elapsed = time.process_time() - start
+        conn.send(sendable(move, error, elapsed))
+
+
+def sendable(move, error, elapsed):
+    """A worker's reply, with a move or error that won't pickle replaced
+    by an error saying so."""
+    try:
+        pickle.dumps((move, error))
+    except Exception as e:
+        move, error = None, RuntimeError("move could not be sent back: %s" % e)
+    return move, error, elapsed
+
+
+def make_decider(pool, workers, world_graph, world_shops, world_agents, total_rounds, proxy=None):
+    """The decider for run_sim's pool argument: None, "thread", "process",
+    "agent" (a process per agent), or "auto" for threads on a free-threaded
+    build and processes on others."""
+    workers = workers or os.cpu_count() or 1
+    if pool == "auto":
+        pool = "thread" if free_threaded() else "process"
+    if pool is None:
+        return Decider(world_graph, world_shops, total_rounds, proxy)
+    if pool == "thread":
+        return ThreadDecider(workers, world_graph, world_shops, total_rounds, proxy)
+    if pool == "process":
+        return ProcessDecider(workers, world_graph, world_shops, world_agents, total_rounds, proxy)
+    if pool == "agent":
+        return AgentProcessDecider(world_graph, world_shops, world_agents, total_rounds, proxy)
+    raise ValueError("pool expected None, 'thread', 'process', 'agent' or 'auto', actual: %r" % (pool,))
+
+
+def decide_round(decider, world_agents, round_number, world_graph, world_shops):
+    """One (move, called, error, state) per agent, in turn order: the next
+    step of a committed plan, or the agent's answer to a call."""
+    decided = [None] * len(world_agents)
+    turns = []
+    for turn, agent in enumerate(world_agents):
+        position = agent["position"]
+        move = engine.next_plan_step(agent, world_shops[position], world_graph[position])
+        if move is None:
+            turns.append(turn)
+        else:
+            decided[turn] = (move, False, None, None)
+    for turn, decision in zip(turns, decider.decide([world_agents[t] for t in turns], round_number)):
+        decided[turn] = decision
+    return decided
+
+
+def proceeds(agent, shop, sells):
+    """Coin the engine will pay for the sells it accepts."""
+    if not isinstance(sells, dict):
+        return 0
+    total = 0
+    for resource_name, quantity in sells.items():
+        try:
+            quantity = int(quantity)
+        except (TypeError, ValueError):
+            continue
+        if resource_name in shop and 0 <= quantity <= agent["resources"].get(resource_name, 0):
+            total += quantity * shop[resource_name]["buy"]
+    return total
+
+
+def resolve_buys(world_agents, decided, world_shops, rng):
+    """Scale down buys that together ask more of a shop's resource than it
+    holds, in place: pro rata, leftover units by largest remainder, ties at
+    random. Each order counts for at most what the agent can pay for, given
+    its coin, this move's sells and its earlier buys, as the engine settles
+    them; orders the engine would reject anyway are left for it to."""
+    wanted = {}  # (node, resource) -> [(turn, quantity)]
+    for turn, (agent, (move, *_)) in enumerate(zip(world_agents, decided)):
+        if not isinstance(move, dict):
+            continue
+        buys = move.get("resources_to_buy_from_shop")
+        if not isinstance(buys, dict):
+            continue
+        shop = world_shops[agent["position"]]
+        budget = agent["coin"] + proceeds(agent, shop, move.get("resources_to_sell_to_shop"))
+        for resource_name, quantity in buys.items():
+            try:
+                quantity = int(quantity)
+            except (TypeError, ValueError):
+                continue
+            if quantity <= 0 or resource_name not in shop:
+                continue
+            price = shop[resource_name]["sell"]
+            if price > 0:
+                quantity = min(quantity, budget // price)
+                budget -= quantity * price
+            if quantity > 0:
+                wanted.setdefault((agent["position"], resource_name), []).append((turn, quantity))
+
+    for (node, resource_name), orders in wanted.items():
+        stock = world_shops[node][resource_name]["quantity"]
+        total = sum(quantity for _, quantity in orders)
+        if len(orders) < 2 or total <= stock:
+            continue
+        shares = {turn: quantity * stock // total for turn, quantity in orders}
+        left = stock - sum(shares.values())
+        by_remainder = sorted(orders, key=lambda o: (-(o[1] * stock % total), rng.random()))
+        for turn, _ in by_remainder[:left]:
+            shares[turn] += 1
+        for turn, share in shares.items():
+            move, *rest = decided[turn]
+            move = dict(move, resources_to_buy_from_shop=dict(move["resources_to_buy_from_shop"]))
+            if share:
+                move["resources_to_buy_from_shop"][resource_name] = share
+            else:
+                del move["resources_to_buy_from_shop"][resource_name]
+            decided[turn] = (move, *rest)
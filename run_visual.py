@@ -8,7 +8,10 @@ Controls:
     +/-   - Speed up/slow down
     Q     - Quit
 
-Debug log is written to ekon_debug_*.log
+Debug log is written to ekon_debug_*.bin (python debug_logger.py <file> for text)
+
+    --record          also write a replay recording to ekon_replay_*.jsonl
+    --replay FILE     scrub through a recording instead of running agents
 """
 
 import sys
@@ -18,17 +21,25 @@ from visualizer import GameVisualizer, create_observer
 
 def main():
     debug = '--debug' in sys.argv or '-d' in sys.argv
+    record = '--record' in sys.argv
 
     visualizer = GameVisualizer(tick_rate=0.5)
 
+    if '--replay' in sys.argv:
+        from replay import Replay
+        visualizer.run_replay(Replay(sys.argv[sys.argv.index('--replay') + 1]))
+        return
+
+    options = {'debug_log': debug, 'record': record}
+
     def run_with_observer(vis):
         observer = create_observer(vis)
-        sim.run_sim(observer=observer, debug_log=debug, quiet=True)
+        sim.run_sim(observer=observer, quiet=True, **options)
 
-    visualizer.run(run_with_observer)
+    visualizer.run(run_with_observer, options)
 
     if debug:
-        print("Debug log written to ekon_debug_*.log")
+        print("Debug log written to ekon_debug_*.bin (python debug_logger.py <file> for text)")
 
 
 if __name__ == '__main__':
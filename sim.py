@@ -1,22 +1,35 @@
-import copy
 import logging
 import random
 import time
+from collections import deque
 
 import agents
 import utils.logger as L
+from agents.registry import DEFAULT_MANIFEST
+from engine import (STARTING_COIN, agent_state, build_indexes, match_standing_orders, next_plan_step,
+                    set_standing_orders)
+from events import Dispatch
+from views import WorldProxy
 
 # Log everything, and send it to stderr.
 logging.basicConfig(level=logging.DEBUG)
 
 # TODO: JSON config
 num_rounds = 200
-traveller_start_gold = 10000
+traveller_start_gold = STARTING_COIN
 resource_prices = [5,25]
 starting_quantity = [10,1000]
 node_count = 400
 edge_ratio = 0.02
 resource_names = ["GOLD", "SILVER", "NANOCHIPS", "CAKE", "AZURE_INSTANCES"]
+# Soft per-turn time budget. Agents get meta["deadline_ns"], a
+# time.monotonic_ns() timestamp, and meta["time_used"], their running total
+# in seconds. Nothing is enforced: overrunning only costs efficiency.
+turn_budget_ns = 1000000
+# Hand whole-world agents one read-only views.WorldProxy per game instead of
+# a fresh dict of every node each turn. Lookups get slower, so it only pays
+# on big worlds; python benchmark.py --world-proxy measures the break-even.
+world_proxy = False
 # Note: mine_rate was considered but intentionally not implemented.
 # Without replenishment, quantities deplete permanently which creates
 # interesting scarcity dynamics and makes quantity-aware scoring matter.
@@ -75,7 +88,9 @@ def shop_resource(buyrange, sellrange, quantityrange):
         "quantity": random.randint(*quantityrange)
     }
 
-def run_sim(observer=None, debug_log=False, quiet=False):
+def run_sim(observer=None, debug_log=False, quiet=False, record=None, seed=None, ledger=None,
+            round_model="sequential", pool=None, workers=None, checkpoint=None, checkpoint_every=100,
+            resume=None):
     """
     Run the trading simulation.
 
@@ -83,179 +98,363 @@ def run_sim(observer=None, debug_log=False, quiet=False):
         observer: Optional dict with callbacks:
             - on_round_end(round_num, total_rounds, agents, shops) -> bool
               Returns False to stop simulation early
+            - on_round_events(events), with 'events': ('trades', 'moves')
+              Called once per round with the applied trades and moves as
+              column tables, see events.py
             - on_agent_action(agent_name, action_type, details)
-              Called when agents buy/sell/move
+              Called for each buy/sell/move, batched at round end
         debug_log: If True, write detailed debug log to file
         quiet: If True, suppress all console output (for visualizer mode)
+        record: Write a replay recording (see replay.py) to this filename,
+            or to ekon_replay_*.jsonl if True
+        seed: Seed the random module before building the world
+        ledger: A ledger.Ledger to fill with every trade and move, or a
+            filename (True for ekon_ledger_*.npz) to save one to; needs numpy
+        round_model: "sequential" (each agent sees the trades of those before
+            it) or "snapshot" (all decide on the round-start world, then
+            overlapping buys are split fairly; see rounds.py)
+        pool: For the snapshot model, run decisions on a "thread" or
+            "process" pool of workers (default: one per core) instead of
+            one after another; "agent" for a process per agent; "auto"
+            takes threads on a free-threaded build and processes otherwise
+        checkpoint: Save the whole engine state to this filename (True for
+            ekon_checkpoint_*.bin) every checkpoint_every rounds; see
+            checkpoint.py. Needs pool None or "thread"
+        resume: Carry on the game saved in this checkpoint file, with its
+            own round model, length and random state; seed is ignored
     """
+    if checkpoint or resume:
+        import checkpoint as checkpoints
+    saved = None
+    if resume:
+        if record:
+            raise ValueError("record needs a game played from round 0, not resumed")
+        saved = checkpoints.load(resume, agents.agents)
+        round_model = saved["config"]["round_model"]
+    if round_model not in ("sequential", "snapshot"):
+        raise ValueError("round_model expected 'sequential' or 'snapshot', actual: %r" % (round_model,))
+    if pool is not None and round_model != "snapshot":
+        raise ValueError("pool needs round_model='snapshot'")
+    if checkpoint and pool not in (None, "thread"):
+        raise ValueError("checkpoint needs agents' state in the engine, pool None or 'thread'")
+    if checkpoint is True:
+        checkpoint = checkpoints.default_filename()
+    if seed is not None and not saved:
+        random.seed(seed)
+
     # Setup debug logger
     dlog = None
     if debug_log:
         from debug_logger import DebugLogger
-        dlog = DebugLogger()
+        dlog = DebugLogger(policy="block")
+
+    ledger_file = None
+    if ledger:
+        from ledger import Ledger, require_numpy
+        if not isinstance(ledger, Ledger):
+            require_numpy()  # fail now, not after the game
+            ledger_file, ledger = ledger, Ledger()
+
+    rec = None
+    if record:
+        from replay import Recorder
+        rec = Recorder(record)
 
     # Suppress console output in quiet mode
     if quiet:
         logging.getLogger().setLevel(logging.CRITICAL)
-        L.quiet = True
+        L.configure(quiet=True)
+
+    # Disabled logger functions are bound to L.noop; skip the per-turn one outright
+    print_agent = None if L.print_agent is L.noop else L.print_agent
 
     # Here comes the mega function!
     # TODO: refactor ;)
 
     # setup games
 
-    world_graph = build_graph(node_count, edge_ratio)
-
-    world_shops = make_world_shops(world_graph)
-
-    world_agents = [{
-            "name":name,
-            "func":func,
-            "coin": traveller_start_gold,
-            "position": random.choice(list(world_graph.keys())),
-            "resources": {},
-            "time": 0,
-            "state": {}  # Persistent state across rounds - agents can use for caching
-        } for name,func in agents.agents.items()]
+    if saved:
+        world_graph = saved["graph"]
+        world_shops = saved["shops"]
+        world_agents = saved["agents"]
+        total_rounds = saved["config"]["num_rounds"]
+        first_round = saved["round"] + 1
+        random.setstate(saved["random"]["random"])
+    else:
+        world_graph = build_graph(node_count, edge_ratio)
+
+        world_shops = make_world_shops(world_graph)
+
+        world_agents = [{
+                "name":name,
+                "func":func,
+                "coin": traveller_start_gold,
+                "position": random.choice(list(world_graph.keys())),
+                "resources": {},
+                "time": 0,
+                "state": {},  # Persistent state across rounds - agents can use for caching
+                "plan": deque(),  # Committed future moves, see next_plan_step
+                "orders": None,  # Standing orders, see set_standing_orders
+                "fills": [],  # Standing order fills since the agent was last called
+                "manifest": agents.manifests.get(name, DEFAULT_MANIFEST)
+            } for name,func in agents.agents.items()]
+
+        # Only build what the playing agents' manifests ask for
+        indexes = build_indexes(world_shops, [a["manifest"] for a in world_agents])
+        for a in world_agents:
+            a["radius"] = a["manifest"].radius
+            a["indexes"] = {name: indexes[name] for name in a["manifest"].indexes}
+        total_rounds = num_rounds
+        first_round = 0
+
+    proxy = WorldProxy(world_graph, world_shops) if world_proxy else None
+
+    decider = None
+    resolver = None
+    if round_model == "snapshot":
+        import rounds
+        decider = rounds.make_decider(pool, workers, world_graph, world_shops, world_agents, total_rounds, proxy)
+        resolver = random.Random()
+        if saved:
+            resolver.setstate(saved["random"]["resolver"])
+        else:
+            resolver.seed(random.getrandbits(64))
 
     if dlog:
         dlog.log_setup(world_graph, world_shops, world_agents)
+    if ledger:
+        ledger.start(world_shops, world_agents, resource_names)
+
+    # Event batches are only built for kinds an observer subscribed to
+    subscribers = [o for o in (observer, ledger and ledger.observer()) if o]
+    dispatch = Dispatch(subscribers) if subscribers else None
+    if rec:
+        rec.start(seed, {
+            "num_rounds": total_rounds,
+            "traveller_start_gold": traveller_start_gold,
+            "resource_prices": resource_prices,
+            "starting_quantity": starting_quantity,
+            "node_count": node_count,
+            "edge_ratio": edge_ratio,
+            "resource_names": resource_names,
+            "turn_budget_ns": turn_budget_ns,
+        }, world_graph, world_shops, world_agents)
+
+    def fill_standing_orders(turn, current_agent, trades):
+        for action, resource_name, quantity, price in match_standing_orders(
+                current_agent, world_shops[current_agent["position"]]):
+            if dlog:
+                dlog.log_transaction(current_agent["name"], action, resource_name, quantity, price, True)
+            if rec:
+                rec.trade(current_agent["name"], action, resource_name, quantity, price)
+            if trades is not None:
+                trades.append(turn, current_agent["name"], current_agent["position"], resource_name,
+                              quantity, price, action, True)
 
     # run game
 
-    for round_number in range(num_rounds):
-        if dlog:
-            dlog.log_round_start(round_number, num_rounds, world_agents)
-
-        L.print_round_start(round_number)
-        L.print_nodes(world_shops)
-
-        random.shuffle(world_agents)
-
-        for current_agent in world_agents:
-            state_to_pass = {
-                "you": {
-                    "coin":current_agent["coin"],
-                    "position":current_agent["position"],
-                    "resources": copy.deepcopy(current_agent["resources"])
-                },
-                "meta": {
-                    "current_round" : round_number,
-                    "total_rounds" : num_rounds
-                },
-                "world": {w: {"neighbours":neighbours, "resources": world_shops[w]} for w,neighbours in world_graph.items()}
-            }
-
-            start = time.time()
-            move = None
-            try:
-                move = current_agent["func"](state_to_pass, current_agent["state"])
-            except Exception as e:
-                current_agent["time"] += (time.time() - start)
-                L.invalid(current_agent, '', e)
-                if dlog:
-                    dlog.log_agent_exception(current_agent["name"], e)
-                continue
-            current_agent["time"] += (time.time() - start)
-
+    try:
+        for round_number in range(first_round, total_rounds):
             if dlog:
-                dlog.log_agent_turn(current_agent, state_to_pass, move)
-
-            if not isinstance(move, dict):
-                L.invalid(current_agent, "Returned move expected to be type dict, actual: %s" % move)
-                continue
-
-            current_shop = world_shops[current_agent["position"]]
-
-            # run agent sell commands
-            for resource_name, quantity in move.get("resources_to_sell_to_shop", {}).items():
-                quantity = int(quantity)
-                if quantity < 0:
-                    L.invalid(current_agent, "SELL: negative amount?")
-                    continue
-                if resource_name not in current_shop:
-                    L.invalid(current_agent, "SELL: shop does buy resource name %s" % resource_name)
-                    continue
-                if resource_name not in  current_agent["resources"]:
-                    L.invalid(current_agent, "SELL: agent does not have resource name %s" % resource_name)
-                    continue
-                total_price = quantity * current_shop[resource_name]["buy"]
-                if (quantity <= current_agent["resources"].get(resource_name, 0)):
-                    current_shop[resource_name]["quantity"] += quantity
-                    current_agent["resources"][resource_name] -= quantity
-                    current_agent["coin"] += total_price
-                    if dlog:
-                        dlog.log_transaction(current_agent["name"], "sell", resource_name, quantity, current_shop[resource_name]["buy"], True)
-                    if observer and 'on_agent_action' in observer:
-                        observer['on_agent_action'](current_agent["name"], "sold", f"{quantity} {resource_name} for ${total_price:,}")
+                dlog.log_round_start(round_number, total_rounds, world_agents)
+
+            L.print_round_start(round_number)
+            L.print_nodes(world_shops)
+
+            random.shuffle(world_agents)
+            if rec:
+                rec.round_start(round_number, world_agents, world_shops)
+
+            events = dispatch.begin(round_number) if dispatch else None
+            trades = events.trades if events else None
+            moves = events.moves if events else None
+
+            # Standing orders fill at the start of each turn. Snapshot rounds
+            # fill them all first, so decisions and the split of contested
+            # buys (rounds.resolve_buys) see the stock they leave.
+            decided = None
+            if decider:
+                for turn, current_agent in enumerate(world_agents):
+                    if current_agent["orders"]:
+                        fill_standing_orders(turn, current_agent, trades)
+                decided = rounds.decide_round(decider, world_agents, round_number, world_graph, world_shops)
+                rounds.resolve_buys(world_agents, decided, world_shops, resolver)
+
+            for turn, current_agent in enumerate(world_agents):
+                if current_agent["orders"] and not decider:
+                    fill_standing_orders(turn, current_agent, trades)
+
+                if decided is not None:
+                    # Decided against the round-start world, see rounds.py
+                    move, called, error, state_to_pass = decided[turn]
                 else:
+                    # Committed plans run without calling the agent until they end
+                    # or a step can no longer execute exactly as planned.
+                    move = next_plan_step(current_agent, world_shops[current_agent["position"]],
+                                          world_graph[current_agent["position"]])
+                    called = move is None
+                    error = None
+                    if called:
+                        state_to_pass = agent_state(current_agent, round_number, total_rounds, world_graph, world_shops, proxy)
+                        state_to_pass["meta"]["deadline_ns"] = time.monotonic_ns() + turn_budget_ns
+                        current_agent["fills"] = []
+
+                        start = time.time()
+                        try:
+                            move = current_agent["func"](state_to_pass, current_agent["state"])
+                        except Exception as e:
+                            error = e
+                        current_agent["time"] += (time.time() - start)
+
+                if called:
+                    if error is not None:
+                        L.invalid(current_agent, '', error)
+                        if dlog:
+                            dlog.log_agent_exception(current_agent["name"], error)
+                        continue
+
                     if dlog:
-                        dlog.log_transaction(current_agent["name"], "sell", resource_name, quantity, current_shop[resource_name]["buy"], False, "insufficient quantity")
-                    L.invalid(current_agent, "SELL: agent does not have sufficient quantity of %s" % resource_name)
-
-            # run agent buy commands
-            for resource_name, quantity in move.get("resources_to_buy_from_shop", {}).items():
-                quantity = int(quantity)
-                if quantity < 0:
-                    L.invalid(current_agent, "BUY: negative amount?")
-                    continue
-                if resource_name not in current_shop:
-                    L.invalid(current_agent, "BUY: shop does not have resource name %s" % resource_name)
-                    continue
-                total_price = quantity * current_shop[resource_name]["sell"]
-                if quantity <= current_shop[resource_name]["quantity"]:
-                    if current_agent["coin"] >= total_price:
-                        current_shop[resource_name]["quantity"] -= quantity
-                        if resource_name not in current_agent["resources"]:
-                            current_agent["resources"][resource_name] = 0
-                        current_agent["resources"][resource_name] += quantity
-                        current_agent["coin"] -= total_price
+                        dlog.log_agent_turn(current_agent, state_to_pass, move)
+
+                    if not isinstance(move, dict):
+                        L.invalid(current_agent, "Returned move expected to be type dict, actual: %s" % move)
+                        continue
+
+                    if move.get("plan"):
+                        if isinstance(move["plan"], list):
+                            current_agent["plan"].extend(move["plan"])
+                        else:
+                            L.invalid(current_agent, "Plan expected to be type list, actual: %s" % move["plan"])
+
+                    if "standing_orders" in move:
+                        error = set_standing_orders(current_agent, move["standing_orders"])
+                        if error:
+                            L.invalid(current_agent, error)
+
+                current_shop = world_shops[current_agent["position"]]
+
+                # run agent sell commands
+                for resource_name, quantity in move.get("resources_to_sell_to_shop", {}).items():
+                    quantity = int(quantity)
+                    if quantity < 0:
+                        L.invalid(current_agent, "SELL: negative amount?")
+                        continue
+                    if resource_name not in current_shop:
+                        L.invalid(current_agent, "SELL: shop does buy resource name %s" % resource_name)
+                        continue
+                    if resource_name not in  current_agent["resources"]:
+                        L.invalid(current_agent, "SELL: agent does not have resource name %s" % resource_name)
+                        continue
+                    total_price = quantity * current_shop[resource_name]["buy"]
+                    if (quantity <= current_agent["resources"].get(resource_name, 0)):
+                        current_shop[resource_name]["quantity"] += quantity
+                        current_agent["resources"][resource_name] -= quantity
+                        current_agent["coin"] += total_price
                         if dlog:
-                            dlog.log_transaction(current_agent["name"], "buy", resource_name, quantity, current_shop[resource_name]["sell"], True)
-                        if observer and 'on_agent_action' in observer:
-                            observer['on_agent_action'](current_agent["name"], "bought", f"{quantity} {resource_name} for ${total_price:,}")
+                            dlog.log_transaction(current_agent["name"], "sell", resource_name, quantity, current_shop[resource_name]["buy"], True)
+                        if rec:
+                            rec.trade(current_agent["name"], "sell", resource_name, quantity, current_shop[resource_name]["buy"])
+                        if trades is not None:
+                            trades.append(turn, current_agent["name"], current_agent["position"], resource_name,
+                                          quantity, current_shop[resource_name]["buy"], "sell")
                     else:
                         if dlog:
-                            dlog.log_transaction(current_agent["name"], "buy", resource_name, quantity, current_shop[resource_name]["sell"], False, "insufficient coin")
-                        L.invalid(current_agent, "BUY: insufficient coin to purchase %s" % resource_name)
-                else:
-                    if dlog:
-                        dlog.log_transaction(current_agent["name"], "buy", resource_name, quantity, current_shop[resource_name]["sell"], False, "shop out of stock")
-                    L.invalid(current_agent, "BUY: insufficient quantity in shop, resource: %s" % resource_name)
-
-            L.print_agent(current_agent, move, current_shop)
-
-            # move agent
-            if move.get("move", None) is not None:
-                if (move["move"] in world_graph[current_agent["position"]].keys() or
-                    move["move"] == current_agent["position"]):
-                    old_pos = current_agent["position"]
-                    current_agent["position"] = move["move"]
-                    if dlog and old_pos != move["move"]:
-                        dlog.log_movement(current_agent["name"], old_pos, move["move"], True)
-                    if observer and 'on_agent_action' in observer and old_pos != move["move"]:
-                        observer['on_agent_action'](current_agent["name"], "moved", f"to node {move['move']}")
-                else:
-                    if dlog:
-                        dlog.log_movement(current_agent["name"], current_agent["position"], move["move"], False, "invalid destination")
-                    L.invalid(current_agent, "Invalid Location to move to: %s" % move["move"])
-
+                            dlog.log_transaction(current_agent["name"], "sell", resource_name, quantity, current_shop[resource_name]["buy"], False, "insufficient quantity")
+                        L.invalid(current_agent, "SELL: agent does not have sufficient quantity of %s" % resource_name)
+
+                # run agent buy commands
+                for resource_name, quantity in move.get("resources_to_buy_from_shop", {}).items():
+                    quantity = int(quantity)
+                    if quantity < 0:
+                        L.invalid(current_agent, "BUY: negative amount?")
+                        continue
+                    if resource_name not in current_shop:
+                        L.invalid(current_agent, "BUY: shop does not have resource name %s" % resource_name)
+                        continue
+                    total_price = quantity * current_shop[resource_name]["sell"]
+                    if quantity <= current_shop[resource_name]["quantity"]:
+                        if current_agent["coin"] >= total_price:
+                            current_shop[resource_name]["quantity"] -= quantity
+                            if resource_name not in current_agent["resources"]:
+                                current_agent["resources"][resource_name] = 0
+                            current_agent["resources"][resource_name] += quantity
+                            current_agent["coin"] -= total_price
+                            if dlog:
+                                dlog.log_transaction(current_agent["name"], "buy", resource_name, quantity, current_shop[resource_name]["sell"], True)
+                            if rec:
+                                rec.trade(current_agent["name"], "buy", resource_name, quantity, current_shop[resource_name]["sell"])
+                            if trades is not None:
+                                trades.append(turn, current_agent["name"], current_agent["position"], resource_name,
+                                              quantity, current_shop[resource_name]["sell"], "buy")
+                        else:
+                            if dlog:
+                                dlog.log_transaction(current_agent["name"], "buy", resource_name, quantity, current_shop[resource_name]["sell"], False, "insufficient coin")
+                            L.invalid(current_agent, "BUY: insufficient coin to purchase %s" % resource_name)
+                    else:
+                        if dlog:
+                            dlog.log_transaction(current_agent["name"], "buy", resource_name, quantity, current_shop[resource_name]["sell"], False, "shop out of stock")
+                        L.invalid(current_agent, "BUY: insufficient quantity in shop, resource: %s" % resource_name)
+
+                if print_agent:
+                    print_agent(current_agent, move, current_shop)
+
+                # move agent
+                if move.get("move", None) is not None:
+                    if (move["move"] in world_graph[current_agent["position"]].keys() or
+                        move["move"] == current_agent["position"]):
+                        old_pos = current_agent["position"]
+                        current_agent["position"] = move["move"]
+                        if dlog and old_pos != move["move"]:
+                            dlog.log_movement(current_agent["name"], old_pos, move["move"], True)
+                        if rec and old_pos != move["move"]:
+                            rec.move(current_agent["name"], move["move"])
+                        if moves is not None and old_pos != move["move"]:
+                            moves.append(turn, current_agent["name"], old_pos, move["move"])
+                    else:
+                        if dlog:
+                            dlog.log_movement(current_agent["name"], current_agent["position"], move["move"], False, "invalid destination")
+                        L.invalid(current_agent, "Invalid Location to move to: %s" % move["move"])
 
-        L.print_round_end()
 
-        if dlog:
-            dlog.log_round_end(world_agents)
+            L.print_round_end()
 
-        # Call observer at end of round
-        if observer and 'on_round_end' in observer:
-            if not observer['on_round_end'](round_number, num_rounds, world_agents, world_shops):
-                break  # Observer requested stop
+            if dlog:
+                dlog.log_round_end(world_agents)
+            if rec:
+                rec.round_end(world_agents)
+
+            if checkpoint and (round_number + 1) % checkpoint_every == 0:
+                checkpoints.save(checkpoint, round_number, {
+                    "num_rounds": total_rounds,
+                    "round_model": round_model,
+                    "seed": saved["config"]["seed"] if saved else seed,
+                }, world_graph, world_shops, world_agents, {
+                    "random": random.getstate(),
+                    "resolver": resolver.getstate() if resolver else None,
+                })
+
+            # Call observer at end of round
+            if events:
+                dispatch.deliver(events)
+            if observer and 'on_round_end' in observer:
+                if not observer['on_round_end'](round_number, total_rounds, world_agents, world_shops):
+                    break  # Observer requested stop
+    finally:
+        # Pools hold worker processes and shared memory; free them however the game ends
+        if decider:
+            decider.close()
 
     # display winner
 
     if dlog:
         dlog.log_final_results(world_agents)
         dlog.close()
+    if rec:
+        rec.close()
+    if ledger:
+        ledger.finish(world_agents)
+        if ledger_file:
+            ledger.save(ledger_file)
 
     L.print_results(world_agents)
 
@@ -0,0 +1,118 @@
+"""
+Constant-memory running statistics, shared by SimStats, benchmark.py and
+experiment.py.
+
+Running keeps Welford's count/mean/M2, so a metric costs three numbers no
+matter how many runs are added, and two Runnings merge exactly (Chan et
+al.), so per-process results can be combined without keeping samples.
+
+    s = Running()
+    for x in samples:
+        s.add(x)
+    s.mean, s.std, s.ci()     # ci() is the half-width: mean +/- ci()
+"""
+
+import math
+from statistics import NormalDist
+
+
+EXACT_BELOW_DF = 10
+
+
+def _t_central(t, df):
+    """P(|T| < t) for Student t with integer df, by the closed-form sums."""
+    theta = math.atan(t / math.sqrt(df))
+    c2 = math.cos(theta) ** 2
+    term = total = 1.0
+    if df % 2:
+        for k in range(1, (df - 1) // 2):
+            term *= c2 * 2 * k / (2 * k + 1)
+            total += term
+        if df == 1:
+            return 2 * theta / math.pi
+        return 2 / math.pi * (theta + math.sin(theta) * math.cos(theta) * total)
+    for k in range(1, df // 2):
+        term *= c2 * (2 * k - 1) / (2 * k)
+        total += term
+    return math.sin(theta) * total
+
+
+def t_critical(confidence, df):
+    """Two-sided Student t critical value. Exact (to float precision) below
+    EXACT_BELOW_DF, by Newton's method on the t distribution; from there a
+    Cornish-Fisher expansion around the normal, within 0.0004% at 95%,
+    0.003% at 99% and 0.03% at 99.9%."""
+    p = 0.5 + confidence / 2
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    z2 = z * z
+    t = z + (z * (z2 + 1) / 4 / df
+             + z * (5 * z2 * z2 + 16 * z2 + 3) / 96 / df ** 2
+             + z * (3 * z2 ** 3 + 19 * z2 * z2 + 17 * z2 - 15) / 384 / df ** 3
+             + z * (79 * z2 ** 4 + 776 * z2 ** 3 + 1482 * z2 * z2 - 1920 * z2 - 945) / 92160 / df ** 4)
+    if df >= EXACT_BELOW_DF:
+        return t
+    log_norm = math.lgamma((df + 1) / 2) - math.lgamma(df / 2) - 0.5 * math.log(df * math.pi)
+    for _ in range(20):
+        density = 2 * math.exp(log_norm - (df + 1) / 2 * math.log1p(t * t / df))
+        step = (_t_central(t, df) - confidence) / density
+        t -= step
+        if abs(step) <= 1e-12 * t:
+            break
+    return t
+
+
+class Running:
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other):
+        """Fold another Running in, as if its samples had been added here."""
+        if not other.n:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        return self
+
+    @property
+    def total(self):
+        return self.mean * self.n
+
+    @property
+    def variance(self):
+        """Sample variance (n - 1)."""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def sem(self):
+        """Standard error of the mean."""
+        return math.sqrt(self.variance / self.n) if self.n > 1 else 0.0
+
+    def ci(self, confidence=0.95):
+        """Half-width of the t confidence interval for the mean; 0 below 2 samples."""
+        if self.n < 2:
+            return 0.0
+        return t_critical(confidence, self.n - 1) * self.sem
+
+    def __repr__(self):
+        return "Running(n=%d, mean=%g, std=%g)" % (self.n, self.mean, self.std)
@@ -147,7 +147,7 @@ def test_agent(agent_name, agent_func, num_tests=20, verbose=True):
         for i in range(num_tests // len(scenarios) + 1):
             try:
                 world_state = create_state()
-                move = agent_func(world_state)
+                move = agent_func(world_state, {})
                 valid, errs = validate_move(move, world_state)
 
                 if valid:
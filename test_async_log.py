@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for async_log.AsyncLog, the background log writer.
+
+Usage:
+    python -m pytest test_async_log.py
+"""
+
+import threading
+
+import pytest
+
+from async_log import AsyncLog
+
+
+class Sink:
+    """Collects batches; blocks while gate is clear."""
+
+    def __init__(self):
+        self.events = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, batch):
+        self.gate.wait()
+        self.events.extend(batch)
+
+
+def test_writes_everything_in_order():
+    sink = Sink()
+    log = AsyncLog(sink, batch_size=8)
+    for i in range(1000):
+        log.push(i)
+    log.flush()
+    assert sink.events == list(range(1000))
+    log.push("last")
+    log.close()
+    assert sink.events[-1] == "last"
+    assert (log.pushed, log.written, log.dropped) == (1001, 1001, 0)
+
+
+def test_block_policy_is_lossless():
+    sink = Sink()
+    sink.gate.clear()
+    log = AsyncLog(sink, max_size=4, batch_size=2, flush_interval=0.001)
+    threading.Timer(0.05, sink.gate.set).start()
+    for i in range(50):
+        log.push(i)
+    log.close()
+    assert sink.events == list(range(50))
+
+
+@pytest.mark.parametrize("policy", ["drop", "sample"])
+def test_lossy_policies_drop_when_full(policy):
+    sink = Sink()
+    sink.gate.clear()
+    log = AsyncLog(sink, max_size=4, policy=policy, sample_every=2, batch_size=2, flush_interval=60)
+    for i in range(20):
+        log.push(i)
+    sink.gate.set()
+    log.close()
+    assert log.dropped > 0
+    assert log.pushed + log.dropped == 20
+    assert len(sink.events) == log.pushed
+    assert sink.events == sorted(sink.events)
+
+
+def test_sink_failure_loses_only_its_batch():
+    seen = []
+
+    def sink(batch):
+        if "boom" in batch:
+            raise RuntimeError("sink failed")
+        seen.extend(batch)
+
+    log = AsyncLog(sink)
+    log.push("boom")
+    log.flush()
+    log.push("after")
+    log.close()
+    assert seen == ["after"]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        AsyncLog(list.append, policy="spill")
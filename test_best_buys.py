@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for agents.utils.best_buys, the exact integer buy optimiser.
+
+Usage:
+    python -m pytest test_best_buys.py
+"""
+
+import itertools
+import random
+
+from agents.utils import best_buys, resale_values
+
+
+def brute_force(budget, shop, values):
+    """Best profit over every integer allocation (small shops only)."""
+    items = [(res, info) for res, info in shop.items()
+             if values.get(res, 0) > info['sell'] > 0 and info['quantity'] > 0]
+    best = 0
+    ranges = [range(min(info['quantity'], budget // info['sell']) + 1) for _, info in items]
+    for qtys in itertools.product(*ranges):
+        cost = sum(q * info['sell'] for q, (_, info) in zip(qtys, items))
+        if cost <= budget:
+            best = max(best, sum(q * (values[res] - info['sell']) for q, (res, info) in zip(qtys, items)))
+    return best
+
+
+def random_shop(rng, n):
+    shop, values = {}, {}
+    for k in range(n):
+        res = "R%d" % k
+        sell = rng.randint(1, 12)
+        shop[res] = {'buy': sell - 1, 'sell': sell, 'quantity': rng.randint(0, 8)}
+        values[res] = sell + rng.randint(-2, 6)
+    return shop, values
+
+
+def check(budget, shop, values):
+    buys, profit = best_buys(budget, shop, values)
+    assert profit == brute_force(budget, shop, values)
+    assert all(isinstance(q, int) and q > 0 for q in buys.values())
+    assert sum(q * shop[r]['sell'] for r, q in buys.items()) <= budget
+    assert all(q <= shop[r]['quantity'] for r, q in buys.items())
+    assert profit == sum(q * (values[r] - shop[r]['sell']) for r, q in buys.items())
+
+
+def test_matches_brute_force():
+    rng = random.Random(26)
+    for _ in range(400):
+        shop, values = random_shop(rng, rng.randint(1, 4))
+        check(rng.randint(0, 60), shop, values)
+
+
+def test_beats_greedy_by_ratio():
+    # Greedy by margin/price takes A (ratio 0.5) and strands 4 coin; two Bs
+    # (ratio 0.4) use the whole budget for more profit.
+    shop = {'A': {'buy': 1, 'sell': 6, 'quantity': 1},
+            'B': {'buy': 1, 'sell': 5, 'quantity': 2}}
+    values = {'A': 9, 'B': 7}
+    buys, profit = best_buys(10, shop, values)
+    assert (buys, profit) == ({'B': 2}, 4)
+
+
+def test_nothing_to_buy():
+    shop = {'A': {'buy': 1, 'sell': 5, 'quantity': 10}}
+    assert best_buys(100, shop, {'A': 5}) == ({}, 0)
+    assert best_buys(100, shop, {}) == ({}, 0)
+    assert best_buys(0, shop, {'A': 9}) == ({}, 0)
+    assert best_buys(4, shop, {'A': 9}) == ({}, 0)
+
+
+def test_float_budget_and_quantity():
+    shop = {'A': {'buy': 1, 'sell': 3, 'quantity': 4.0}}
+    buys, profit = best_buys(10.9, shop, {'A': 5})
+    assert buys == {'A': 3} and isinstance(buys['A'], int)
+    assert profit == 6
+
+
+def test_resale_values():
+    world = {0: {'resources': {'A': {'buy': 4}, 'B': {'buy': 2}}},
+             1: {'resources': {'A': {'buy': 7}}},
+             2: {'resources': {'B': {'buy': 9}}}}
+    assert resale_values(world, [0, 1]) == {'A': 7, 'B': 2}
+    assert resale_values(world, []) == {}
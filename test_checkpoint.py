@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for checkpoints (checkpoint.py): a resumed game ends exactly as the
+uninterrupted one.
+
+Usage:
+    python -m pytest test_checkpoint.py
+"""
+
+import pytest
+
+import agents as agents_module
+import checkpoint
+
+REGISTRY = agents_module.agents
+ROSTER = ("ultimate", "global_arb", "route_plan", "global_arb_orders")
+
+
+def counter(ws, state):
+    """Walks by a count kept in its state dict, so a lost state shows."""
+    state["calls"] = state.get("calls", 0) + 1
+    neighbours = sorted(ws['world'][ws['you']['position']]['neighbours'])
+    return {'resources_to_sell_to_shop': {}, 'resources_to_buy_from_shop': {},
+            'move': neighbours[state["calls"] % len(neighbours)]}
+
+
+def roster():
+    return {**{name: REGISTRY[name] for name in ROSTER}, "counter": counter}
+
+
+def outcome(final):
+    return sorted((a['name'], a['coin'], a['position'], dict(a['resources']), a['state'].get('calls'))
+                  for a in final)
+
+
+@pytest.mark.parametrize("round_model", ["sequential", "snapshot"])
+def test_resumed_game_ends_as_the_uninterrupted_one(play, tmp_path, round_model):
+    filename = str(tmp_path / "game.ckpt")
+    whole = outcome(play(roster(), rounds=25, seed=50, round_model=round_model,
+                         checkpoint=filename, checkpoint_every=7))
+    saved = checkpoint.load(filename, roster())
+    assert saved["round"] == 20
+    assert saved["config"] == {"num_rounds": 25, "round_model": round_model, "seed": 50}
+    assert all(a["func"] is roster()[a["name"]] for a in saved["agents"])
+    # seed and round model are the checkpoint's, not the caller's
+    assert outcome(play(roster(), rounds=5, seed=1, resume=filename)) == whole
+
+
+def test_resume_plays_only_the_remaining_rounds(play, tmp_path):
+    filename = str(tmp_path / "game.ckpt")
+    play(roster(), rounds=12, seed=50, checkpoint=filename, checkpoint_every=5)
+    played = []
+    play(roster(), resume=filename, each_round=lambda r, world_agents, world_shops: played.append(r))
+    assert played == [10, 11]
+
+
+def test_refused(play, tmp_path):
+    filename = tmp_path / "game.ckpt"
+    play(roster(), rounds=5, seed=50, checkpoint=str(filename), checkpoint_every=5)
+    with pytest.raises(ValueError):
+        play(roster(), resume=str(filename), record=str(tmp_path / "game.jsonl"))
+    with pytest.raises(ValueError):
+        play(roster(), round_model="snapshot", pool="process", checkpoint=str(filename))
+    filename.write_bytes(b"not a checkpoint")
+    with pytest.raises(ValueError):
+        checkpoint.load(str(filename), roster())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the turn-deadline helpers in agents/utils.py and deep_global.
+
+Usage:
+    python -m pytest test_deadline.py
+"""
+
+import random
+import time
+
+from agents import deep_global
+from agents.utils import Deadline, iterative_deepening
+from test_agent import create_mock_world_state, validate_move
+
+
+def state_with_deadline(deadline_ns):
+    return {'meta': {'deadline_ns': deadline_ns}}
+
+
+def test_deadline_without_clock_never_expires():
+    deadline = Deadline(None, stride=1)
+    assert not any(deadline.expired() for _ in range(100))
+
+
+def test_deadline_reads_clock_every_stride_and_latches():
+    deadline = Deadline(time.monotonic_ns() - 1, stride=4)
+    assert [deadline.expired() for _ in range(5)] == [False, False, False, True, True]
+    deadline.at = None
+    assert deadline.expired()
+
+
+def test_deepening_without_deadline_runs_every_depth():
+    depths = []
+
+    def search(depth, deadline):
+        depths.append(depth)
+        return depth
+
+    assert iterative_deepening(search, {'meta': {}}, 4) == 4
+    assert depths == [1, 2, 3, 4]
+
+
+def test_deepening_keeps_last_finished_depth():
+    def search(depth, deadline):
+        if depth == 3:
+            deadline.at = 0
+            while not deadline.expired():
+                pass
+            return "partial"
+        return depth
+
+    far = time.monotonic_ns() + 10**12
+    assert iterative_deepening(search, state_with_deadline(far), 5, stride=1) == 2
+
+
+def test_deepening_returns_partial_first_depth():
+    def search(depth, deadline):
+        while not deadline.expired():
+            pass
+        return "partial %d" % depth
+
+    past = time.monotonic_ns() - 1
+    assert iterative_deepening(search, state_with_deadline(past), 5, stride=1) == "partial 1"
+
+
+def test_deepening_stops_before_overrunning():
+    def search(depth, deadline):
+        time.sleep(0.01 * depth)
+        return depth
+
+    # depth 1 takes 10ms, so a 15ms budget leaves no room for depth 2's ~20ms
+    soon = time.monotonic_ns() + 15_000_000
+    assert iterative_deepening(search, state_with_deadline(soon), 5) == 1
+
+
+def test_deep_global_moves_are_valid():
+    random.seed(28)
+    for current_round in (0, 50, 199):
+        for deadline in (None, time.monotonic_ns(), time.monotonic_ns() + 10**9):
+            ws = create_mock_world_state(current_round=current_round)
+            ws['meta']['deadline_ns'] = deadline
+            move = deep_global.agent(ws, {})
+            valid, errors = validate_move(move, ws)
+            assert valid, errors
+            assert all(isinstance(q, int) for q in move['resources_to_buy_from_shop'].values())
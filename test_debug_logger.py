@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the binary debug log: DebugLogger, read_events and to_text.
+
+Usage:
+    python -m pytest test_debug_logger.py
+"""
+
+import io
+
+import pytest
+
+from debug_logger import DebugLogger, read_events, to_text
+
+
+def write_game(filename, policy=None):
+    log = DebugLogger(filename, policy=policy)
+    agents = [{'name': 'a', 'coin': 100, 'position': 0, 'resources': {}, 'time': 0.5},
+              {'name': 'b', 'coin': 100, 'position': 1, 'resources': {'GOLD': 2}, 'time': 0.25}]
+    log.log_setup({0: {1: 1}, 1: {0: 1}}, {0: {'GOLD': {'buy': 4, 'sell': 5, 'quantity': 9}},
+                                           1: {'GOLD': {'buy': 6, 'sell': 7, 'quantity': 9}}}, agents)
+    log.log_round_start(0, 1, agents)
+    log.log_agent_turn(agents[0], {}, {})
+    log.log_transaction('a', 'buy', 'GOLD', 3, 5, True)
+    log.log_transaction('a', 'buy', 'GOLD', 10**30, 5, False, "insufficient coin")
+    log.log_movement('a', 0, 1, True)
+    log.log_agent_turn(agents[1], {}, None)
+    log.log_transaction('b', 'sell', 'GOLD', 1, 6, False, "agent is asleep")
+    log.log_movement('b', 1, [2], False)
+    log.log_agent_exception('b', ValueError("bad"))
+    log.log_round_end(agents)
+    log.log_final_results(agents)
+    log.close()
+
+
+@pytest.mark.parametrize("policy", [None, "block"])
+def test_round_trip(tmp_path, policy):
+    filename = tmp_path / "log.bin"
+    write_game(filename, policy)
+    events = [e for e in read_events(filename) if e[0] != "blob"]
+    assert events == [
+        ("round_start", 0, 1, ['a', 'b']),
+        ("turn", 'a', True),
+        ("trade", 'a', "buy", 'GOLD', 3, 5, True, None),
+        ("trade", 'a', "buy", 'GOLD', 2**63 - 1, 5, False, "insufficient coin"),
+        ("move", 'a', 0, 1, True),
+        ("turn", 'b', False),
+        ("trade", 'b', "sell", 'GOLD', 1, 6, False, "agent is asleep"),
+        ("move", 'b', '1', '[2]', False),
+        ("exception", 'b', "ValueError: bad"),
+        ("round_end",),
+    ]
+    blobs = [e[1] for e in read_events(filename) if e[0] == "blob"]
+    assert [next(iter(b)) for b in blobs] == ["started", "nodes", "final", "ended"]
+    assert blobs[2]["final"] == [['a', 0.5], ['b', 0.25]]
+
+
+def test_text_replays_trades(tmp_path):
+    filename = tmp_path / "log.bin"
+    write_game(filename)
+    out = io.StringIO()
+    to_text(filename, out)
+    text = out.getvalue()
+    assert "[BUY] a: 3 GOLD @ $5 = $15 - OK" in text
+    assert "Move returned: None/Invalid" in text
+    assert "[MOVE] b: 1 -> [2] FAILED (invalid destination)" in text
+    # a's coin after its buy, rebuilt from the trades
+    assert "Coin: $85" in text
+
+
+def test_rejects_other_files(tmp_path):
+    filename = tmp_path / "log.txt"
+    filename.write_text("=== Ekon Debug Log ===")
+    with pytest.raises(ValueError):
+        list(read_events(filename))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for per-round observer event batches (events.py).
+
+Usage:
+    python -m pytest test_events.py
+"""
+
+import pytest
+
+import agents as agents_module
+from engine import STARTING_COIN
+from events import Dispatch, RoundEvents
+
+REGISTRY = agents_module.agents
+ROSTER = ("ultimate", "global_arb", "global_arb_orders")
+
+
+def test_only_subscribed_kinds_are_built():
+    assert Dispatch([{'on_round_end': print}]).begin(0) is None
+    events = Dispatch([{'on_round_events': print, 'events': ('moves',)}]).begin(3)
+    assert events.round == 3 and events.trades is None and len(events.moves) == 0
+    events = Dispatch([{'on_agent_action': print}]).begin(0)
+    assert events.trades is not None and events.moves is not None
+    with pytest.raises(ValueError):
+        Dispatch([{'on_round_events': print, 'events': ('trades', 'bids')}])
+
+
+def test_actions_interleave_by_turn():
+    events = RoundEvents(0, True, True)
+    events.trades.append(0, 'a', 5, 'GOLD', 2, 1000, 'buy')
+    events.moves.append(0, 'a', 5, 6)
+    events.trades.append(1, 'b', 7, 'CAKE', 1, 9, 'sell', standing=True)
+    events.trades.append(2, 'c', 7, 'CAKE', 1, 9, 'sell')
+    events.moves.append(2, 'c', 7, 8)
+    assert list(events.actions()) == [
+        ('a', 'bought', '2 GOLD for $2,000'),
+        ('a', 'moved', 'to node 6'),
+        ('b', 'sold', '1 CAKE for $9 (standing order)'),
+        ('c', 'sold', '1 CAKE for $9'),
+        ('c', 'moved', 'to node 8'),
+    ]
+
+
+def test_deliver_calls_every_subscriber():
+    got = []
+    dispatch = Dispatch([{'on_round_events': got.append},
+                         {'on_agent_action': lambda *action: got.append(action)}])
+    events = dispatch.begin(0)
+    events.moves.append(0, 'a', 1, 2)
+    dispatch.deliver(events)
+    assert got == [events, ('a', 'moved', 'to node 2')]
+
+
+def test_batches_account_for_the_game(play):
+    coin = {}
+    positions = {}
+    rounds = []
+
+    def on_round_events(events):
+        rounds.append(events.round)
+        t = events.trades
+        for agent, quantity, price, side in zip(t.agent, t.quantity, t.price, t.side):
+            coin[agent] = coin.get(agent, STARTING_COIN) + (quantity * price if side == 'sell' else -quantity * price)
+        m = events.moves
+        for agent, origin, dest in zip(m.agent, m.origin, m.dest):
+            assert positions.get(agent, origin) == origin
+            positions[agent] = dest
+
+    final = play({name: REGISTRY[name] for name in ROSTER}, rounds=20, seed=34,
+                 observer={'on_round_events': on_round_events})
+    assert rounds == list(range(20))
+    for a in final:
+        assert coin.get(a['name'], STARTING_COIN) == a['coin']
+        assert positions[a['name']] == a['position']
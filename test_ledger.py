@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar trade ledger and its analytics. The analytics tests
+are skipped without numpy.
+
+Usage:
+    python -m pytest test_ledger.py
+"""
+
+import io
+
+import pytest
+
+import agents as agents_module
+from ledger import BUY, MOVE, SELL, Ledger
+
+REGISTRY = agents_module.agents
+ROSTER = ("ultimate", "global_arb", "global_arb_orders")
+
+
+@pytest.fixture
+def game(play):
+    """A Ledger filled by a short game, and the per-round event counts it saw."""
+    ledger = Ledger(capacity=4)
+    counts = []
+    observer = {'on_round_events': lambda events: counts.append((len(events.trades), len(events.moves)))}
+    play({name: REGISTRY[name] for name in ROSTER}, rounds=25, seed=36, ledger=ledger, observer=observer)
+    return ledger, counts
+
+
+def column(ledger, name):
+    return list(ledger.columns[name][:ledger.rows])
+
+
+def test_rows_follow_event_batches(game):
+    ledger, counts = game
+    assert ledger.rows == sum(t + m for t, m in counts) > 4
+    assert ledger.capacity >= ledger.rows
+    assert all(len(c) == ledger.capacity for c in ledger.columns.values())
+
+    rounds, sides = column(ledger, "round"), column(ledger, "side")
+    expected = [(r, side) for r, (t, m) in enumerate(counts) for side in ['trade'] * t + [MOVE] * m]
+    assert [(r, 'trade' if s != MOVE else s) for r, s in zip(rounds, sides)] == expected
+
+    for side, resource, qty, price in zip(sides, column(ledger, "resource"), column(ledger, "qty"),
+                                          column(ledger, "price")):
+        if side == MOVE:
+            assert (resource, qty, price) == (-1, 0, 0)
+        else:
+            assert side in (BUY, SELL) and resource >= 0 and qty >= 0 and price > 0
+
+
+def test_coin_adds_up(game):
+    ledger, _ = game
+    net = [0] * len(ledger.agent_names)
+    for agent, side, qty, price in zip(column(ledger, "agent"), column(ledger, "side"),
+                                       column(ledger, "qty"), column(ledger, "price")):
+        net[agent] += qty * price if side == SELL else -qty * price
+    assert [s + n for s, n in zip(ledger.start_coin, net)] == ledger.final_coin
+
+
+def test_analytics(game, tmp_path):
+    np = pytest.importorskip("numpy")
+    import analytics
+
+    ledger, counts = game
+    d = analytics.load(ledger)
+    saved = analytics.load(ledger.save(tmp_path / "game.npz"))
+    assert d.keys() == saved.keys()
+    assert all(np.array_equal(d[k], saved[k]) for k in d)
+
+    assert np.array_equal(analytics.cash_flow(d).sum(axis=1), analytics.profit(d))
+    trades, moves = analytics.activity(d)
+    assert (trades.sum(), moves.sum()) == tuple(map(sum, zip(*counts)))
+    below, ratio = analytics.sells_below_global_max(d)
+    assert ((0 <= below) & (below <= 1) & (0 <= ratio) & (ratio <= 1)).all()
+    bought, sold, _, _ = analytics.resource_volume(d)
+    assert bought.sum() == d['qty'][d['side'] == BUY].sum()
+
+    out = io.StringIO()
+    analytics.report(d, out=out)
+    assert all(name in out.getvalue() for name in ROSTER)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for utils/logger.py's configure() and its no-op binding.
+
+Usage:
+    python -m pytest test_logger.py
+"""
+
+import pytest
+
+import utils.logger as L
+
+PRINTERS = ("print_agent", "invalid", "print_node", "print_nodes", "print_round_start", "print_round_end")
+
+
+@pytest.fixture(autouse=True)
+def restore_flags():
+    saved = {name: getattr(L, name) for name in L.FLAGS}
+    yield
+    L.configure(**saved)
+
+
+def off():
+    L.configure(quiet=False, shops=False, agent_name="", other_agents=False, round_info=False)
+
+
+def test_disabled_printers_are_noop():
+    off()
+    assert all(getattr(L, name) is L.noop for name in PRINTERS)
+
+
+def test_flags_rebind_their_printers(capsys):
+    off()
+    L.configure(round_info=True)
+    assert L.print_round_start is not L.noop and L.print_agent is L.noop
+    L.print_round_start(7)
+    assert "Round: 7" in capsys.readouterr().out
+
+    L.configure(agent_name="a", agent_coin=True)
+    assert L.print_agent is not L.noop and L.invalid is not L.noop
+    L.print_agent({'name': 'a', 'coin': 12, 'position': 0}, {}, {})
+    L.print_agent({'name': 'b', 'coin': 99, 'position': 0}, {}, {})
+    out = capsys.readouterr().out
+    assert "Coin: 12" in out and "99" not in out
+
+    L.configure(agent_name="", round_info=False)
+    assert all(getattr(L, name) is L.noop for name in PRINTERS)
+
+
+def test_quiet_results(capsys):
+    agents = [{'name': 'a', 'coin': 5, 'time': 0.1}]
+    L.configure(quiet=True)
+    L.print_results(agents)
+    assert capsys.readouterr().out == ""
+    L.configure(quiet=False)
+    L.print_results(agents)
+    assert "('a', 5)" in capsys.readouterr().out
+
+
+def test_unknown_flag():
+    with pytest.raises(TypeError):
+        L.configure(verbose=True)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for agent manifests and the engine indexes they ask for.
+
+Usage:
+    python -m pytest test_manifest.py
+"""
+
+import pytest
+
+import agents as agents_module
+import engine
+from agents.registry import LOCAL, PLANNING, TIERS, WORLD, Manifest
+from agents.utils import global_max_buy
+
+SHOPS = {0: {'GOLD': {'buy': 5, 'sell': 9, 'quantity': 1}},
+         1: {'GOLD': {'buy': 7, 'sell': 8, 'quantity': 1}, 'CAKE': {'buy': 2, 'sell': 3, 'quantity': 1}}}
+
+
+def test_manifest_validation():
+    assert Manifest() == (None, None, None, (), WORLD)
+    assert Manifest(PLANNING, indexes=["global_max_buy"], radius=2).indexes == ("global_max_buy",)
+    assert Manifest(radius=0).radius == 0
+    for bad in ({'tier': "speedy"}, {'radius': -1}, {'radius': 1.5}, {'radius': "world"}):
+        with pytest.raises(ValueError):
+            Manifest(**bad)
+    assert Manifest(PLANNING, 0.3, 100, ("global_max_buy",), LOCAL).to_dict() == {
+        'tier': PLANNING, 'ms_per_round': 0.3, 'profit_per_round': 100,
+        'indexes': ["global_max_buy"], 'radius': LOCAL}
+
+
+def test_registered_manifests_are_valid():
+    registry = agents_module.agents
+    for name in registry.names():
+        manifest = registry.manifest(name)
+        assert manifest.tier in TIERS, name
+        assert set(manifest.indexes) <= engine.ENGINE_INDEXES.keys(), name
+
+
+def test_only_declared_indexes_are_built():
+    assert engine.build_indexes(SHOPS, [Manifest(), Manifest(radius=LOCAL)]) == {}
+    built = engine.build_indexes(SHOPS, [Manifest(indexes=("global_max_buy",))] * 2)
+    assert built == {"global_max_buy": {'GOLD': 7, 'CAKE': 2}}
+    with pytest.raises(ValueError):
+        engine.build_indexes(SHOPS, [Manifest(indexes=("shortest_paths",))])
+
+
+def test_helper_prefers_the_index():
+    world = {node: {'neighbours': {}, 'resources': shop} for node, shop in SHOPS.items()}
+    index = {'GOLD': 7, 'CAKE': 2}
+    assert global_max_buy({'meta': {'global_max_buy': index}, 'world': {}}) is index
+    assert global_max_buy({'meta': {}, 'world': world}) == index
+
+
+def test_game_hands_indexes_to_declaring_agents_only(play, monkeypatch):
+    seen = {}
+
+    def watcher(name):
+        def agent(ws, state):
+            seen.setdefault(name, []).append(ws['meta'].get('global_max_buy'))
+            return {'resources_to_sell_to_shop': {}, 'resources_to_buy_from_shop': {}, 'move': None}
+        return agent
+
+    monkeypatch.setattr(agents_module, "manifests", {"wants": Manifest(indexes=("global_max_buy",))})
+    play({"wants": watcher("wants"), "plain": watcher("plain")}, rounds=3)
+    index = seen["wants"][0]
+    assert index and all(i is index for i in seen["wants"])
+    assert seen["plain"] == [None] * 3
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for metrics.py, on numpy (skipped when it isn't installed) and on the
+plain-list fallback.
+
+Usage:
+    python -m pytest test_metrics.py
+"""
+
+import pytest
+
+import metrics
+from metrics import EFFICIENCY_FLOOR_MS, STARTING_COIN
+
+
+@pytest.fixture(params=["numpy", "lists"], autouse=True)
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(metrics, "np", None)
+    return request.param
+
+
+def floats(values):
+    return [float(v) for v in values]
+
+
+def test_per_run():
+    ppr, tpr, eff = metrics.per_run([STARTING_COIN + 200, STARTING_COIN - 100, STARTING_COIN],
+                                    [0.01, 0.0, 0.002], 100)
+    assert floats(ppr) == [2.0, -1.0, 0.0]
+    assert floats(tpr) == pytest.approx([0.1, 0.0, 0.02])
+    assert floats(eff) == pytest.approx([20.0, -1.0 / EFFICIENCY_FLOOR_MS, 0.0])
+    assert float(eff[0]) == pytest.approx(metrics.efficiency(2.0, 0.1))
+
+    ppr, _, _ = metrics.per_run([STARTING_COIN + 100] * 2, [0.1, 0.1], [10, 50])
+    assert floats(ppr) == [10.0, 2.0]
+
+
+def test_ranking_is_stable():
+    assert metrics.ranking([3.0, 5.0, 3.0, -1.0, 5.0]) == [1, 4, 0, 2, 3]
+    assert metrics.ranking([]) == []
+
+
+def test_wins_and_counts():
+    names = ['a', 'b', 'c', 'a', 'b', 'c', 'a', 'b']
+    run = [0, 0, 0, 1, 1, 1, 3, 3]
+    eff = [1.0, 3.0, 2.0, 5.0, 5.0, 4.0, -2.0, -1.0]
+    # run 1 ties between a and b: the first listed wins; run 2 has no rows
+    assert metrics.wins(run, eff, 4) == [1, 3, -1, 7]
+    assert metrics.win_counts(names, run, eff, 4) == {'a': 1, 'b': 2}
+    # rows needn't be grouped by run (the tied a still listed before b)
+    order = [7, 2, 3, 0, 6, 4, 1, 5]
+    shuffled = [[column[i] for i in order] for column in (names, run, eff)]
+    assert metrics.win_counts(*shuffled, 4) == {'a': 1, 'b': 2}
+
+
+def test_agent_metrics():
+    agents = [{'name': 'a', 'coin': STARTING_COIN + 500, 'time': 0.05},
+              {'name': 'b', 'coin': STARTING_COIN + 100, 'time': 0.001}]
+    rows, winner = metrics.agent_metrics(agents, 50)
+    assert [(a['name'], p) for a, p, _, _ in rows] == [('a', 10.0), ('b', 2.0)]
+    assert all(type(v) is float for _, p, t, e in rows for v in (p, t, e))
+    assert winner == 1
+    assert metrics.agent_metrics([], 50) == ([], None)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for committed plans: engine.next_plan_step and plans in a game.
+
+Usage:
+    python -m pytest test_plans.py
+"""
+
+from collections import deque
+
+from engine import next_plan_step
+
+SHOP = {'GOLD': {'buy': 8, 'sell': 10, 'quantity': 5}}
+NEIGHBOURS = {1: 1, 2: 1}
+
+
+def planner(*steps, coin=100, held=None):
+    return {'plan': deque(steps), 'coin': coin, 'resources': held or {}, 'position': 0}
+
+
+def move(sells=None, buys=None, to=0, **conditions):
+    return {'resources_to_sell_to_shop': sells or {}, 'resources_to_buy_from_shop': buys or {},
+            'move': to, **conditions}
+
+
+def test_no_plan():
+    assert next_plan_step(planner(), SHOP, NEIGHBOURS) is None
+
+
+def test_steps_play_in_order():
+    first, second = move(buys={'GOLD': 2}, to=1), move(to=2)
+    agent = planner(first, second)
+    assert next_plan_step(agent, SHOP, NEIGHBOURS) is first
+    assert next_plan_step(agent, SHOP, NEIGHBOURS) is second
+    assert next_plan_step(agent, SHOP, NEIGHBOURS) is None
+
+
+def test_price_conditions():
+    agent = planner(move(buys={'GOLD': 1}, max_buy_price={'GOLD': 10}),
+                    move(sells={'GOLD': 1}, min_sell_price={'GOLD': 8}), held={'GOLD': 1})
+    assert next_plan_step(agent, SHOP, NEIGHBOURS) is not None
+    assert next_plan_step(agent, SHOP, NEIGHBOURS) is not None
+
+    for step in (move(buys={'GOLD': 1}, max_buy_price={'GOLD': 9}),
+                 move(sells={'GOLD': 1}, min_sell_price={'GOLD': 9})):
+        agent = planner(step, move(), held={'GOLD': 1})
+        assert next_plan_step(agent, SHOP, NEIGHBOURS) is None
+        assert not agent['plan']
+
+
+def test_step_that_would_be_rejected_drops_plan():
+    for step in (move(buys={'GOLD': 6}),  # more than the shop has
+                 move(buys={'GOLD': 5}),  # costs 50, with 40 coin
+                 move(buys={'SILVER': 1}),  # not sold here
+                 move(sells={'GOLD': 2}),  # only one held
+                 move(to=3),  # not a neighbour
+                 "not a move"):
+        agent = planner(step, move(), coin=40, held={'GOLD': 1})
+        assert next_plan_step(agent, SHOP, NEIGHBOURS) is None
+        assert not agent['plan']
+
+
+def test_sells_pay_for_buys():
+    agent = planner(move(sells={'GOLD': 1}, buys={'GOLD': 2}), coin=12, held={'GOLD': 1})
+    assert next_plan_step(agent, SHOP, NEIGHBOURS) is not None
+
+
+def test_agent_is_called_only_when_its_plan_runs_out(play):
+    calls = []
+
+    def agent(ws, state):
+        calls.append(ws['meta']['current_round'])
+        stay = move(to=ws['you']['position'])
+        return {**stay, 'plan': [stay, stay, stay]}
+
+    play({'planner': agent}, rounds=10)
+    assert calls == [0, 4, 8]
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for population mode and batch entry points (population.py).
+Skipped without numpy.
+
+Usage:
+    python -m pytest test_population.py
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import engine  # noqa: E402
+import sim  # noqa: E402
+from agents import global_arb  # noqa: E402
+from population import BatchWorld, Population, run_population, settle  # noqa: E402
+
+RESOURCES = ["GOLD", "CAKE"]
+
+
+@pytest.fixture
+def small_world(monkeypatch):
+    monkeypatch.setattr(sim, "node_count", 30)
+
+
+def two_shops():
+    graph = {0: {1: 1}, 1: {0: 1}}
+    shops = {0: {"GOLD": {"buy": 4, "sell": 5, "quantity": 6}},
+             1: {"GOLD": {"buy": 8, "sell": 9, "quantity": 2}, "CAKE": {"buy": 1, "sell": 2, "quantity": 3}}}
+    return graph, shops
+
+
+def orders(*rows):
+    """(agent, resource, quantity) rows as settle's column arrays."""
+    columns = list(zip(*rows)) or [(), (), ()]
+    return tuple(np.array(c, dtype=np.int64) for c in columns)
+
+
+def test_settle_fills_in_turn_order():
+    graph, shops = two_shops()
+    pop = Population(["x"], [3], graph, shops, RESOURCES, np.random.default_rng(0))
+    pop.position[:] = 0
+    pop.coin[:] = [100, 100, 12]
+    rank = np.array([2, 0, 1])  # agent 1 plays first, then 2, then 0
+    accepted, filled, touched = settle(pop, rank, orders(), orders((0, 0, 4), (1, 0, 4), (2, 0, 2)))
+    # 10 units wanted, 6 in stock: agent 1 gets 4, agent 2 its 2, agent 0 none
+    assert (accepted, filled) == (10, 6)
+    assert pop.inventory[:, 0].tolist() == [0, 4, 2]
+    assert pop.coin.tolist() == [100, 80, 2]
+    assert pop.stock[0, 0] == 0
+    assert touched.tolist() == [0]
+
+
+def test_settle_sells_first_and_caps_buys_by_coin():
+    graph, shops = two_shops()
+    pop = Population(["x"], [2], graph, shops, RESOURCES, np.random.default_rng(0))
+    pop.position[:] = 1
+    pop.coin[:] = [0, 10]
+    pop.inventory[0, 0] = 2
+    sells = orders((0, 0, 2), (1, 0, 1))  # agent 1 holds none: rejected
+    buys = orders((0, 1, 3), (0, 0, 2), (1, 1, 2), (1, 0, 1))
+    accepted, filled, _ = settle(pop, np.array([0, 1]), sells, buys)
+    # agent 0: 16 from its sale pays for 3 CAKE (6), then 2 GOLD (18) overrun: dropped.
+    # agent 1: 2 CAKE (4) then GOLD (9) overruns 10: dropped; CAKE runs out after agent 0
+    assert accepted == 5 and filled == 3
+    assert pop.coin.tolist() == [10, 10]
+    assert pop.inventory.tolist() == [[0, 3], [0, 0]]
+    assert pop.stock[1].tolist() == [4, 0]
+
+
+def test_run_conserves_units(small_world):
+    pop = run_population({"global_arb": 40, "zen": 40, "ultimate": 5}, rounds=15, seed=45, batch=False)
+    assert len(pop) == 85 and pop.strategy.tolist() == [0] * 40 + [1] * 40 + [2] * 5
+    units = pop.stock_history[0]  # every unit is in a shop or held
+    assert (pop.stock_history[-1] + pop.inventory.sum(axis=0) == units).all()
+    assert len(pop.fill_rate) == 15 and all(0 <= r <= 1 for r in pop.fill_rate)
+    assert (pop.coin >= 0).all() and (pop.inventory >= 0).all() and (pop.stock >= 0).all()
+    names = [row[0] for row in pop.summary(15)]
+    assert names == ["global_arb", "zen", "ultimate"]
+
+
+def test_run_is_seeded(small_world):
+    first = run_population({"zen": 30, "ultimate": 10}, rounds=10, seed=45)
+    again = run_population({"zen": 30, "ultimate": 10}, rounds=10, seed=45)
+    assert (first.coin == again.coin).all() and (first.position == again.position).all()
+
+
+def test_observer_stops_early(small_world):
+    seen = []
+    run_population({"zen": 5}, rounds=10, seed=45,
+                   observer={"on_round_end": lambda r, total, pop: seen.append(r) or r < 2})
+    assert seen == [0, 1, 2]
+
+
+def test_valid_moves():
+    graph = {0: {1: 1}, 1: {0: 1, 2: 1}, 2: {1: 1}}
+    shops = {w: {"GOLD": {"buy": 1, "sell": 2, "quantity": 1}} for w in graph}
+    pop = Population(["x"], [1], graph, shops, RESOURCES, np.random.default_rng(0))
+    world = BatchWorld(pop, graph, shops)
+    position = np.array([0, 0, 0, 1, 1, 2, 2, 2])
+    dest = np.array([0, 1, 2, 0, 2, 1, -1, 3])
+    assert world.valid_moves(position, dest).tolist() == [True, True, False, True, True, True, False, False]
+
+
+def test_global_arb_batch_trades_like_agent(small_world):
+    random.seed(46)
+    graph = sim.build_graph(sim.node_count, sim.edge_ratio)
+    shops = sim.make_world_shops(graph)
+    names = sim.resource_names
+    rng = np.random.default_rng(46)
+    m = 500
+    pop = Population(["global_arb"], [m], graph, shops, names, rng)
+    pop.coin[:] = rng.integers(0, 20000, size=m)
+    pop.inventory[:] = rng.integers(0, 4, size=(m, len(names))) * rng.integers(0, 2, size=(m, len(names)))
+    index = engine.global_max_buy(shops)
+    world = engine.world_view(graph, shops, 0, None)
+
+    for current_round in (5, 19):
+        meta = {"current_round": current_round, "total_rounds": 20, "global_max_buy": index}
+        out = global_arb.agent_batch({"position": pop.position.copy(), "coin": pop.coin, "inventory": pop.inventory,
+                                      "meta": meta, "world": BatchWorld(pop, graph, shops)}, {})
+        for i in range(m):
+            held = {names[j]: int(q) for j, q in enumerate(pop.inventory[i]) if q}
+            move = global_arb.agent({"you": {"coin": int(pop.coin[i]), "position": int(pop.position[i]),
+                                             "resources": held, "fills": []},
+                                     "meta": meta, "world": world}, {})
+            sells = {names[j]: int(q) for j, q in enumerate(out["sell"][i]) if q}
+            buys = {names[j]: int(q) for j, q in enumerate(out["buy"][i]) if q}
+            assert sells == {r: q for r, q in move["resources_to_sell_to_shop"].items() if q}
+            assert buys == {r: int(q) for r, q in move["resources_to_buy_from_shop"].items() if int(q)}
+            if current_round == 19:
+                assert out["move"][i] == pop.position[i]
+
+
+def test_batch_games_use_the_entry_point(small_world, monkeypatch):
+    calls = []
+    real = global_arb.agent_batch
+
+    def agent_batch(batch, state):
+        calls.append(len(batch["position"]))
+        return real(batch, state)
+
+    monkeypatch.setattr(global_arb, "agent_batch", agent_batch)
+    pop = run_population({"global_arb": 200, "zen": 10}, rounds=8, seed=46)
+    assert calls == [200] * 8
+    assert (pop.time[:200] > 0).all()
+    assert (pop.stock_history[-1] + pop.inventory.sum(axis=0) == pop.stock_history[0]).all()
+    one_by_one = run_population({"global_arb": 200, "zen": 10}, rounds=8, seed=46, batch=False)
+    assert len(calls) == 8 and len(one_by_one) == 210
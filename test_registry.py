@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for agents.registry.AgentRegistry: lazy imports, opt-in agents and
+cached import failures.
+
+Usage:
+    python -m pytest test_registry.py
+"""
+
+import importlib
+import logging
+
+import pytest
+
+from agents import zen
+from agents.registry import DEFAULT_MANIFEST, FAST, AgentRegistry, Manifest
+
+
+@pytest.fixture
+def imports(monkeypatch):
+    """Names of the agent modules the registry imports, in order."""
+    seen = []
+    real = importlib.import_module
+
+    def import_module(name, package=None):
+        seen.append(name)
+        return real(name, package)
+
+    monkeypatch.setattr(importlib, "import_module", import_module)
+    return seen
+
+
+def registry():
+    return AgentRegistry({
+        "zen": "zen:agent",
+        "arb": ("global_arb:agent", Manifest(FAST, 0.003, 4000)),
+        "missing": "no_such_module:agent",
+        "typo": "zen:agnet",
+        "planner": "zen:agent",
+    }, opt_in=("planner",))
+
+
+def test_nothing_imports_until_looked_up(imports):
+    agents = registry()
+    assert agents.names() == ["zen", "arb", "missing", "typo", "planner"]
+    assert agents.manifest("arb") == Manifest(FAST, 0.003, 4000)
+    assert agents.manifest("zen") is DEFAULT_MANIFEST
+    assert imports == []
+    assert agents["zen"] is zen.agent
+    assert imports == [".zen"]
+    agents["zen"]
+    assert imports == [".zen"]
+
+
+def test_roster_skips_failures_and_opt_in(caplog):
+    caplog.set_level(logging.WARNING)  # a quiet run_sim earlier leaves the root logger at CRITICAL
+    agents = registry()
+    assert list(agents) == ["zen", "arb"]
+    assert len(agents) == 2
+    assert dict(agents.items()) == {"zen": zen.agent, "arb": agents["arb"]}
+    assert sorted(agents.failures) == ["missing", "typo"]
+    assert caplog.text.count("Skipping agent") == 2
+
+
+def test_opt_in_plays_only_by_name():
+    agents = registry()
+    assert "planner" not in list(agents)
+    assert "planner" in agents
+    assert agents["planner"] is zen.agent
+
+
+def test_failures_are_cached(imports):
+    agents = registry()
+    for name, module in (("missing", ".no_such_module"), ("typo", ".zen")):
+        with pytest.raises(ImportError):
+            agents[name]
+        count = len(imports)
+        with pytest.raises(ImportError, match="failed to import"):
+            agents[name]
+        assert name not in agents
+        assert len(imports) == count
+        assert imports[-1] == module
+    assert isinstance(agents.failures["missing"], ModuleNotFoundError)
+    assert isinstance(agents.failures["typo"], AttributeError)
+
+
+def test_unknown_name():
+    with pytest.raises(KeyError):
+        registry()["nobody"]
+    assert "nobody" not in registry()
+
+
+def test_batch_entry_points():
+    agents = registry()
+    assert agents.batch("zen") is None
+    assert agents.batch("arb") is importlib.import_module("agents.global_arb").agent_batch
+    with pytest.raises(ImportError):
+        agents.batch("missing")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for game recordings and replay.Replay seeking.
+
+Usage:
+    python -m pytest test_replay.py
+"""
+
+import copy
+import random
+
+import pytest
+
+import agents as agents_module
+from replay import KEYFRAME_EVERY, Replay
+
+REGISTRY = agents_module.agents
+ROSTER = ("ultimate", "global_arb", "route_plan", "global_arb_orders")
+ROUNDS = 2 * KEYFRAME_EVERY + 5
+
+
+def snapshot(world_agents, world_shops):
+    return (sorted((a['name'], a['coin'], a['position'], dict(a['resources']), a['time']) for a in world_agents),
+            {node: {res: info['quantity'] for res, info in shop.items()} for node, shop in world_shops.items()})
+
+
+@pytest.fixture
+def recorded(play, tmp_path):
+    """(Replay, per-round snapshots) of a game with trades, plans and standing orders."""
+    filename = tmp_path / "game.jsonl"
+    rounds = []
+    play({name: REGISTRY[name] for name in ROSTER}, rounds=ROUNDS, seed=33, record=filename,
+         each_round=lambda r, world_agents, world_shops: rounds.append(copy.deepcopy(snapshot(world_agents, world_shops))))
+    return Replay(filename), rounds
+
+
+def test_header(recorded):
+    replay, rounds = recorded
+    assert len(replay) == ROUNDS == len(rounds)
+    assert replay.seed == 33
+    assert sorted(replay.names) == sorted(ROSTER)
+    assert replay.keyframes == list(range(0, ROUNDS, KEYFRAME_EVERY))
+
+
+def test_seek_matches_game_in_any_order(recorded):
+    replay, rounds = recorded
+    order = list(range(ROUNDS)) + list(range(ROUNDS - 1, -1, -1))
+    order += random.Random(33).sample(range(ROUNDS), ROUNDS)
+    for round_number in order:
+        assert snapshot(*replay.seek(round_number)) == rounds[round_number], round_number
+
+
+def test_seek_keeps_turn_order(play, tmp_path):
+    filename = tmp_path / "game.jsonl"
+    orders = []
+    play({name: REGISTRY[name] for name in ROSTER}, rounds=5, seed=33, record=filename,
+         each_round=lambda r, world_agents, world_shops: orders.append([a['name'] for a in world_agents]))
+    replay = Replay(filename)
+    assert [[a['name'] for a in replay.seek(r)[0]] for r in range(5)] == orders
+
+
+def test_frames_and_play(recorded):
+    replay, rounds = recorded
+    assert [snapshot(agents, shops) for _, agents, shops in replay.frames(3, 8)] == rounds[3:8]
+
+    seen = []
+    actions = []
+    replay.play({'on_round_end': lambda r, total, agents, shops: seen.append(r) or r < 4,
+                 'on_agent_action': lambda *action: actions.append(action)})
+    assert seen == [0, 1, 2, 3, 4]
+    assert actions == [a for r in range(5) for a in replay.actions(r)]
+    assert any(kind == "bought" for _, kind, _ in actions)
+
+
+def test_seek_out_of_range(recorded):
+    replay, _ = recorded
+    for round_number in (-1, ROUNDS):
+        with pytest.raises(IndexError):
+            replay.seek(round_number)
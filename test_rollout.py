@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for engine.fork (copy-on-write world forks) and the rollout agent.
+
+Usage:
+    python -m pytest test_rollout.py
+"""
+
+import copy
+import random
+import time
+
+import engine
+from agents import rollout
+from test_agent import create_mock_world_state, validate_move
+
+
+def line_world():
+    """0 - 1 - 2 - 3, one resource per shop."""
+    world = {}
+    for n in range(4):
+        neighbours = {m: 1 for m in (n - 1, n + 1) if 0 <= m < 4}
+        world[n] = {'neighbours': neighbours,
+                    'resources': {'GOLD': {'buy': 5 + n, 'sell': 10 - n, 'quantity': 10}}}
+    return world
+
+
+def test_fork_leaves_world_and_parent_untouched():
+    world = line_world()
+    before = copy.deepcopy(world)
+    root = engine.fork(world)
+    holdings = {}
+    coin = root.settle(0, 100, holdings, {}, {'GOLD': 4})
+    assert (coin, holdings) == (60, {'GOLD': 4})
+    assert root.quantity(0, 'GOLD') == 6
+
+    child = root.fork()
+    child.settle(0, coin, holdings, {}, {'GOLD': 6})
+    assert child.quantity(0, 'GOLD') == 0
+    assert root.quantity(0, 'GOLD') == 6
+    assert child.stock(0)['GOLD'] == {'buy': 5, 'sell': 10, 'quantity': 0}
+    assert world == before
+
+
+def test_settle_rejects_what_run_sim_would():
+    root = engine.fork(line_world())
+    holdings = {'GOLD': 2}
+    # selling more than held, buying more than stocked or affordable: skipped
+    coin = root.settle(1, 20, holdings, {'GOLD': 3, 'SILVER': 1}, {'GOLD': 11})
+    assert (coin, holdings) == (20, {'GOLD': 2})
+    coin = root.settle(1, 20, holdings, {}, {'GOLD': 3})
+    assert (coin, holdings) == (20, {'GOLD': 2})
+    # sells run first, so their proceeds pay for the buys
+    coin = root.settle(1, 20, holdings, {'GOLD': 2}, {'GOLD': 3.7})
+    assert (coin, holdings) == (5, {'GOLD': 3})
+    assert root.quantity(1, 'GOLD') == 9
+
+
+def test_radius_confines_fork():
+    root = engine.fork(line_world(), origin=0, radius=1)
+    assert root.neighbours(1) == [0]
+    assert root.can_move(0, 1) and not root.can_move(1, 2)
+    assert not root.can_move(0, 2)
+    assert root.fork().nodes is root.nodes
+    assert engine.fork(line_world()).neighbours(1) == [0, 2]
+
+
+def test_rollout_moves_are_valid():
+    random.seed(27)
+    for current_round in (0, 50, 199):
+        for _ in range(5):
+            ws = create_mock_world_state(current_round=current_round)
+            move = rollout.agent(ws, {})
+            valid, errors = validate_move(move, ws)
+            assert valid, errors
+            assert all(isinstance(q, int) for q in move['resources_to_buy_from_shop'].values())
+
+
+def test_rollout_respects_deadline():
+    random.seed(27)
+    ws = create_mock_world_state()
+    state = {}
+    ws['meta']['deadline_ns'] = time.monotonic_ns()
+    move = rollout.agent(ws, state)
+    assert validate_move(move, ws)[0]
+    # index and random stream are kept across turns
+    assert set(state) == {'gb', 'rng'}
+    rng = state['rng']
+    rollout.agent(ws, state)
+    assert state['rng'] is rng
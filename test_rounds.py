@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Tests for snapshot rounds (rounds.py): splitting contested buys,
+deciding against the round-start world, and the pools that decide.
+
+Usage:
+    python -m pytest test_rounds.py
+"""
+
+import multiprocessing
+import random
+from collections import deque
+
+import pytest
+
+import rounds
+
+SHOP = {'GOLD': {'buy': 4, 'sell': 5, 'quantity': 10}, 'CAKE': {'buy': 1, 'sell': 2, 'quantity': 100}}
+
+
+def trader(ws, state):
+    """Deterministic: sells everything, buys all it can of the shop's
+    cheapest resource and walks its neighbours in turn."""
+    you = ws['you']
+    pos = you['position']
+    shop = ws['world'][pos]['resources']
+    sells = {r: q for r, q in you['resources'].items() if q > 0 and r in shop}
+    coin = you['coin'] + sum(q * shop[r]['buy'] for r, q in sells.items())
+    res = min(shop, key=lambda r: (shop[r]['sell'], r))
+    neighbours = sorted(ws['world'][pos]['neighbours'])
+    return {'resources_to_sell_to_shop': sells,
+            'resources_to_buy_from_shop': {res: min(shop[res]['quantity'], coin // max(shop[res]['sell'], 1))},
+            'move': neighbours[ws['meta']['current_round'] % len(neighbours)]}
+
+
+def traders(n=6):
+    return {"trader_%d" % i: trader for i in range(n)}
+
+
+def seated(coin=1000, position=0, held=None):
+    return {'coin': coin, 'position': position, 'resources': held or {}}
+
+
+def buying(**buys):
+    return ({'resources_to_sell_to_shop': {}, 'resources_to_buy_from_shop': buys, 'move': 0}, True, None, None)
+
+
+def shops(quantity=10):
+    return {0: {res: dict(info, quantity=quantity if res == 'GOLD' else info['quantity'])
+                for res, info in SHOP.items()}}
+
+
+def split(decided, world_agents=None, world_shops=None, seed=0):
+    world_agents = world_agents or [seated() for _ in decided]
+    rounds.resolve_buys(world_agents, decided, world_shops or shops(), random.Random(seed))
+    return [move['resources_to_buy_from_shop'] if isinstance(move, dict) else move for move, *_ in decided]
+
+
+def test_uncontested_buys_are_untouched():
+    decided = [buying(GOLD=6), buying(GOLD=4), buying(CAKE=500)]
+    moves = [d[0] for d in decided]
+    split(decided)
+    assert [d[0] for d in decided] == moves
+    assert all(d[0] is m for d, m in zip(decided, moves))
+
+
+def test_contested_stock_is_split_pro_rata():
+    decided = [buying(GOLD=12, CAKE=1), buying(GOLD=6), buying(GOLD=2)]
+    original = decided[0][0]
+    # 20 asked of 10: 6, 3 and 1, exactly
+    assert split(decided) == [{'GOLD': 6, 'CAKE': 1}, {'GOLD': 3}, {'GOLD': 1}]
+    # the agent's own move dict is left alone
+    assert original['resources_to_buy_from_shop'] == {'GOLD': 12, 'CAKE': 1}
+
+
+def test_leftover_units_go_by_largest_remainder():
+    # 7, 2 and 1 asked of 6 units: 4.2, 1.2 and 0.6 -> 4, 1 and 0, and the
+    # unit left over to the largest remainder
+    assert split([buying(GOLD=7), buying(GOLD=2), buying(GOLD=1)], world_shops=shops(6)) == [
+        {'GOLD': 4}, {'GOLD': 1}, {'GOLD': 1}]
+    # equal remainders: the unit is drawn at random, never split or lost
+    winners = set()
+    for seed in range(20):
+        shares = split([buying(GOLD=5), buying(GOLD=5)], world_shops=shops(3), seed=seed)
+        assert sorted(s['GOLD'] for s in shares) == [1, 2]
+        winners.add(shares[0]['GOLD'])
+    assert winners == {1, 2}
+
+
+def test_zero_share_drops_the_order():
+    assert split([buying(GOLD=30), buying(GOLD=1)], world_shops=shops(2)) == [{'GOLD': 2}, {}]
+
+
+def test_orders_count_only_what_the_agent_can_pay():
+    # the second agent can pay for 2 GOLD, not 10; with its sale, 4
+    poor = [seated(), seated(coin=10)]
+    assert split([buying(GOLD=10), buying(GOLD=10)], poor) == [{'GOLD': 8}, {'GOLD': 2}]
+    selling = buying(GOLD=10)
+    selling[0]['resources_to_sell_to_shop'] = {'CAKE': 10}
+    poor[1]['resources'] = {'CAKE': 10}
+    assert split([buying(GOLD=10), selling], poor) == [{'GOLD': 7}, {'GOLD': 3}]
+    # earlier buys in the same move spend the budget first: after 4 CAKE the
+    # second can't pay for any GOLD, so nothing is contested (the engine
+    # rejects that buy itself)
+    assert split([buying(GOLD=10), buying(CAKE=4, GOLD=10)], poor) == [{'GOLD': 10}, {'CAKE': 4, 'GOLD': 10}]
+
+
+def test_rejected_orders_are_left_to_the_engine():
+    decided = [buying(GOLD=10), buying(GOLD=-5, SILVER=3), buying(GOLD="lots"),
+               (None, True, ValueError("boom"), None), ({'resources_to_buy_from_shop': [1]}, True, None, None)]
+    assert split(decided) == [{'GOLD': 10}, {'GOLD': -5, 'SILVER': 3}, {'GOLD': "lots"}, None, [1]]
+
+
+def test_planned_steps_skip_the_decider():
+    calls = []
+
+    class Recorder:
+        def decide(self, agents, round_number):
+            calls.append([a['name'] for a in agents])
+            return [("called", True, None, None) for _ in agents]
+
+    step = {'resources_to_sell_to_shop': {}, 'resources_to_buy_from_shop': {}, 'move': 0}
+    world_agents = [dict(seated(), name=name, plan=deque(plan))
+                    for name, plan in (("a", []), ("b", [step]), ("c", []))]
+    decided = rounds.decide_round(Recorder(), world_agents, 0, {0: {}}, shops())
+    assert calls == [["a", "c"]]
+    assert [d[0] for d in decided] == ["called", step, "called"]
+    assert decided[1][1] is False
+
+
+def test_snapshot_games_replay_from_a_seed(play):
+    def outcome(**kwargs):
+        return sorted((a['name'], a['coin'], a['position'], sorted(a['resources'].items()))
+                      for a in play(traders(), rounds=15, seed=47, **kwargs))
+
+    snapshot = outcome(round_model="snapshot")
+    assert outcome(round_model="snapshot") == snapshot
+    assert outcome() != snapshot
+
+
+def test_read_only_views_follow_the_engine():
+    graph = {0: {1: 1}, 1: {0: 1}}
+    world_shops = shops()
+    ro_graph, ro_shops = rounds.read_only(graph, world_shops)
+    with pytest.raises(TypeError):
+        ro_graph[2] = {}
+    with pytest.raises(TypeError):
+        ro_graph[0][1] = 5
+    with pytest.raises(TypeError):
+        del ro_shops[0]['GOLD']
+    with pytest.raises(TypeError):
+        ro_shops[0]['GOLD']['quantity'] = 0
+    # views, not copies: the engine's writes show through
+    world_shops[0]['GOLD']['quantity'] = 3
+    assert ro_shops[0]['GOLD']['quantity'] == 3
+
+
+def test_unknown_pool():
+    with pytest.raises(ValueError):
+        rounds.make_decider("fibers", 2, {}, {}, [], 10)
+
+
+def test_thread_pool_plays_the_same_game(play):
+    def outcome(**kwargs):
+        return sorted((a['name'], a['coin'], a['position'], sorted(a['resources'].items()))
+                      for a in play(traders(), rounds=15, seed=48, round_model="snapshot", **kwargs))
+
+    assert outcome(pool="thread", workers=3) == outcome()
+
+
+def test_thread_pool_agents_cannot_write_the_world(play):
+    errors = []
+    stock = []
+
+    def vandal(ws, state):
+        node = ws['world'][ws['you']['position']]
+        for res in node['resources']:
+            try:
+                node['resources'][res]['quantity'] = 0
+            except TypeError as e:
+                errors.append(e)
+        try:
+            node['neighbours'].clear()
+        except AttributeError as e:
+            errors.append(e)
+        return trader(ws, state)
+
+    def count_stock(round_number, world_agents, world_shops):
+        stock.append(sum(info['quantity'] for shop in world_shops.values() for info in shop.values()))
+
+    play({"vandal": vandal, **traders(3)}, rounds=5, seed=48, each_round=count_stock,
+         round_model="snapshot", pool="thread", workers=2)
+    assert len(errors) >= 5
+    assert len(stock) == 5 and all(stock)
+
+
+@pytest.mark.parametrize("pool", ["process", "agent"])
+def test_process_pools_play_the_same_game(play, pool):
+    def outcome(**kwargs):
+        return sorted((a['name'], a['coin'], a['position'], sorted(a['resources'].items()))
+                      for a in play(traders(), rounds=10, seed=49, round_model="snapshot", **kwargs))
+
+    assert outcome(pool=pool, workers=2) == outcome()
+
+
+def test_unpicklable_moves_become_errors():
+    assert rounds.sendable({'move': 3}, None, 0.5) == ({'move': 3}, None, 0.5)
+    move, error, elapsed = rounds.sendable({'move': lambda: 3}, None, 0.5)
+    assert move is None and isinstance(error, RuntimeError) and elapsed == 0.5
+
+
+@pytest.mark.parametrize("pool", ["process", "agent"])
+def test_pools_are_closed_when_a_game_stops_early(play, monkeypatch, pool):
+    deciders = []
+    real = rounds.make_decider
+
+    def make_decider(*args, **kwargs):
+        deciders.append(real(*args, **kwargs))
+        return deciders[-1]
+
+    def stop_at_3(round_number, world_agents, world_shops):
+        if round_number == 3:
+            raise RuntimeError("observer failed")
+
+    monkeypatch.setattr(rounds, "make_decider", make_decider)
+    with pytest.raises(RuntimeError, match="observer failed"):
+        play(traders(3), rounds=10, seed=49, each_round=stop_at_3, round_model="snapshot", pool=pool, workers=2)
+    assert len(deciders) == 1
+    assert multiprocessing.active_children() == []
+    assert deciders[0].processes == [] and getattr(deciders[0], "memory", None) is None
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for engine-matched standing orders (engine.set_standing_orders and
+engine.match_standing_orders).
+
+Usage:
+    python -m pytest test_standing_orders.py
+"""
+
+from engine import match_standing_orders, set_standing_orders
+
+
+def trader(coin=100, held=None):
+    return {'coin': coin, 'resources': held or {}, 'orders': None, 'fills': []}
+
+
+def shop(buy=8, sell=10, quantity=5):
+    return {'GOLD': {'buy': buy, 'sell': sell, 'quantity': quantity}}
+
+
+def test_set_validates_and_normalises():
+    agent = trader()
+    assert set_standing_orders(agent, {'sell': {'GOLD': '7'}, 'buy': {'CAKE': (3.0, 6)}}) is None
+    assert agent['orders'] == ({'GOLD': 7.0}, {'CAKE': [3, 6.0]})
+    assert set_standing_orders(agent, {}) is None
+    assert agent['orders'] is None
+
+    for bad in ([], {'sell': []}, {'buy': {'GOLD': 5}}, {'sell': {'GOLD': 'high'}}):
+        agent['orders'] = 'kept'
+        assert set_standing_orders(agent, bad)
+        assert agent['orders'] == 'kept'
+
+
+def test_sells_fill_at_or_above_min_price():
+    agent = trader(held={'GOLD': 3})
+    set_standing_orders(agent, {'sell': {'GOLD': 9}})
+    stock = shop()
+    assert match_standing_orders(agent, stock) == []
+    stock['GOLD']['buy'] = 9
+    assert match_standing_orders(agent, stock) == [('sell', 'GOLD', 3, 9)]
+    assert (agent['coin'], agent['resources'], stock['GOLD']['quantity']) == (127, {'GOLD': 0}, 8)
+    # sell orders stand until replaced
+    assert agent['orders'] == ({'GOLD': 9.0}, {})
+
+
+def test_buys_fill_up_to_quantity_and_expire():
+    agent = trader(coin=35)
+    set_standing_orders(agent, {'buy': {'GOLD': [6, 10]}})
+    stock = shop(quantity=5)
+    # coin allows three
+    assert match_standing_orders(agent, stock) == [('buy', 'GOLD', 3, 10)]
+    assert agent['orders'] == ({}, {'GOLD': [3, 10.0]})
+    agent['coin'] = 100
+    assert match_standing_orders(agent, stock) == [('buy', 'GOLD', 2, 10)]
+    assert stock['GOLD']['quantity'] == 0
+    stock['GOLD']['quantity'] = 9
+    assert match_standing_orders(agent, stock) == [('buy', 'GOLD', 1, 10)]
+    assert agent['orders'] is None
+    assert agent['resources'] == {'GOLD': 6}
+    assert len(agent['fills']) == 3
+
+
+def test_buys_skip_prices_above_limit():
+    agent = trader()
+    set_standing_orders(agent, {'buy': {'GOLD': [1, 9.5]}, 'sell': {}})
+    assert match_standing_orders(agent, shop(sell=10)) == []
+    assert match_standing_orders(agent, {}) == []
+
+
+def test_sells_run_before_buys():
+    agent = trader(coin=0, held={'GOLD': 1})
+    set_standing_orders(agent, {'sell': {'GOLD': 8}, 'buy': {'GOLD': [1, 10]}})
+    fills = match_standing_orders(agent, shop(buy=8, sell=8))
+    assert fills == [('sell', 'GOLD', 1, 8), ('buy', 'GOLD', 1, 8)]
+
+
+def test_fills_reported_on_next_call(play):
+    seen = []
+
+    def agent(ws, state):
+        you = ws['you']
+        seen.append(list(you['fills']))
+        stay = {'resources_to_sell_to_shop': {}, 'resources_to_buy_from_shop': {}, 'move': you['position']}
+        if ws['meta']['current_round'] == 0:
+            return {**stay, 'standing_orders': {'buy': {r: [1, 25] for r in ws['world'][you['position']]['resources']}}}
+        return stay
+
+    final = play({'orders': agent}, rounds=3)
+    bought = sum(final[0]['resources'].values())
+    assert seen[0] == [] and len(seen[1]) == bought > 0 and seen[2] == []
+    assert all(action == 'buy' and qty == 1 for action, _, qty, _ in seen[1])
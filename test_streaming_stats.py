@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming_stats: Running (Welford, with merge) and t_critical.
+
+Usage:
+    python -m pytest test_streaming_stats.py
+"""
+
+import random
+import statistics
+
+import pytest
+
+from streaming_stats import EXACT_BELOW_DF, Running, _t_central, t_critical
+
+# Two-sided Student t critical values from standard tables
+T_95 = {1: 12.706205, 2: 4.302653, 3: 3.182446, 4: 2.776445, 5: 2.570582, 6: 2.446912,
+        7: 2.364624, 8: 2.306004, 9: 2.262157, 10: 2.228139, 30: 2.042272, 120: 1.979930}
+T_99 = {3: 5.840909, 5: 4.032143, 9: 3.249836, 20: 2.845340}
+
+
+def running(samples):
+    s = Running()
+    for x in samples:
+        s.add(x)
+    return s
+
+
+@pytest.mark.parametrize("confidence, table, rel", [(0.95, T_95, 4e-6), (0.99, T_99, 3e-5)])
+def test_t_critical_matches_tables(confidence, table, rel):
+    # exact below EXACT_BELOW_DF (to the tables' 6 places), else within the
+    # approximation's documented error
+    for df, t in table.items():
+        expected = pytest.approx(t, abs=2e-6) if df < EXACT_BELOW_DF else pytest.approx(t, rel=rel)
+        assert t_critical(confidence, df) == expected, df
+
+
+def test_t_critical_is_exact_below_threshold():
+    for confidence in (0.8, 0.95, 0.99, 0.999):
+        for df in range(3, EXACT_BELOW_DF):
+            assert _t_central(t_critical(confidence, df), df) == pytest.approx(confidence, abs=1e-12)
+
+
+def test_running_matches_statistics():
+    samples = [random.Random(39).gauss(100, 15) for _ in range(500)]
+    s = running(samples)
+    assert s.n == 500
+    assert s.mean == pytest.approx(statistics.fmean(samples))
+    assert s.variance == pytest.approx(statistics.variance(samples))
+    assert s.total == pytest.approx(sum(samples))
+    assert s.ci() == pytest.approx(t_critical(0.95, 499) * statistics.stdev(samples) / 500 ** 0.5)
+
+
+def test_merge_equals_adding_everything():
+    rng = random.Random(39)
+    samples = [rng.expovariate(0.01) for _ in range(300)]
+    whole = running(samples)
+    for cut in (0, 1, 2, 150, 299, 300):
+        merged = running(samples[:cut]).merge(running(samples[cut:]))
+        assert merged.n == whole.n
+        assert merged.mean == pytest.approx(whole.mean)
+        assert merged.variance == pytest.approx(whole.variance)
+
+    parts = [running(samples[i:i + 7]) for i in range(0, 300, 7)]
+    folded = Running()
+    for part in parts:
+        folded.merge(part)
+    assert folded.variance == pytest.approx(whole.variance)
+
+
+def test_too_few_samples():
+    assert (Running().variance, Running().sem, Running().ci()) == (0.0, 0.0, 0.0)
+    one = running([5.0])
+    assert (one.mean, one.variance, one.ci()) == (5.0, 0.0, 0.0)
+    assert running([1.0, 3.0]).ci() == pytest.approx(12.706205 * 1.0, abs=1e-5)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the k-hop world views and WorldProxy in views.py.
+
+Usage:
+    python -m pytest test_views.py
+"""
+
+import random
+
+import agents as agents_module
+import sim
+from agents.registry import LOCAL, Manifest
+from views import WorldProxy, neighbourhood, within
+
+
+def random_graph(seed, nodes=40):
+    random.seed(seed)
+    return sim.build_graph(nodes, 0.05)
+
+
+def hops(world_graph, centre):
+    """Hop distance from centre to every node reachable in world_graph, by
+    BFS; nodes without an entry have no onward edges."""
+    dist = {centre: 0}
+    frontier = [centre]
+    while frontier:
+        reached = []
+        for w in frontier:
+            for n in world_graph.get(w, ()):
+                if n not in dist:
+                    dist[n] = dist[w] + 1
+                    reached.append(n)
+        frontier = reached
+    return dist
+
+
+def test_within_matches_hop_distance():
+    for seed in range(5):
+        graph = random_graph(seed)
+        for centre in (0, 17, 39):
+            dist = hops(graph, centre)
+            for radius in range(5):
+                nodes = list(within(graph, centre, radius))
+                assert nodes[0] == centre
+                assert len(nodes) == len(set(nodes))
+                assert set(nodes) == {w for w, d in dist.items() if d <= radius}
+                # nearer nodes come first
+                assert [dist[w] for w in nodes] == sorted(dist[w] for w in nodes)
+
+
+def test_neighbourhood_shares_the_engine_dicts():
+    graph = random_graph(43)
+    shops = sim.make_world_shops(graph)
+    view = neighbourhood(graph, shops, 5, 2)
+    assert set(view) == set(within(graph, 5, 2))
+    for w, node in view.items():
+        assert node["neighbours"] is graph[w] and node["resources"] is shops[w]
+    assert list(neighbourhood(graph, shops, 5, 0)) == [5]
+
+
+def test_game_hands_each_agent_its_radius(play, monkeypatch):
+    radii = {"local": LOCAL, "two": 2, "world": None}
+    views = {}
+
+    def watcher(name):
+        def agent(ws, state):
+            views.setdefault(name, []).append((ws['you']['position'], ws['world']))
+            neighbours = list(ws['world'][ws['you']['position']]['neighbours'])
+            return {'resources_to_sell_to_shop': {}, 'resources_to_buy_from_shop': {},
+                    'move': random.choice(neighbours)}
+        return agent
+
+    monkeypatch.setattr(agents_module, "manifests", {name: Manifest(radius=r) for name, r in radii.items()})
+    play({name: watcher(name) for name in radii}, rounds=5, seed=43)
+
+    for name, radius in radii.items():
+        for position, world in views[name]:
+            if radius is None:
+                assert len(world) == sim.node_count
+                continue
+            # the view's own edges must reach exactly its nodes within radius
+            dist = hops({w: node['neighbours'] for w, node in world.items()}, position)
+            assert set(world) == {w for w, d in dist.items() if d <= radius}
+
+
+def test_world_proxy_reads_like_the_world_dict():
+    graph = random_graph(44)
+    shops = sim.make_world_shops(graph)
+    proxy = WorldProxy(graph, shops)
+    world = {w: {"neighbours": graph[w], "resources": shops[w]} for w in graph}
+    assert len(proxy) == len(world) and list(proxy) == list(world)
+    assert 3 in proxy and -1 not in proxy
+    for w, node in proxy.items():
+        assert dict(node) == world[w]
+        assert node["neighbours"] is graph[w] and node["resources"] is shops[w]
+    assert proxy == world
+    # live: later trades show through the same proxy
+    res = next(iter(shops[3]))
+    shops[3][res]["quantity"] += 1
+    assert proxy[3]["resources"][res]["quantity"] == shops[3][res]["quantity"]
+
+
+def test_world_proxy_plays_the_same_game(play, monkeypatch):
+    worlds = []
+
+    def probe(ws, state):
+        worlds.append(type(ws['world']))
+        return {'resources_to_sell_to_shop': {}, 'resources_to_buy_from_shop': {}, 'move': None}
+
+    # whole-world agents, which get the proxy, and a local one, which doesn't
+    roster = {name: agents_module.agents[name] for name in ("route_plan", "champion_v8", "champion_v3", "ultimate")}
+    roster["probe"] = probe
+
+    def outcome():
+        return sorted((a['name'], a['coin'], a['position']) for a in play(roster, rounds=20, seed=44))
+
+    dicts = outcome()
+    monkeypatch.setattr(sim, "world_proxy", True)
+    assert outcome() == dicts
+    assert worlds == [dict] * 20 + [WorldProxy] * 20
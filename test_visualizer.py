@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the visualizer's snapshot publishing and frame diffing, without
+a terminal.
+
+Usage:
+    python -m pytest test_visualizer.py
+"""
+
+import pytest
+
+from visualizer import GameVisualizer, SimStats, batch_run
+
+
+class FakeScreen:
+    """Records the curses calls _flush makes."""
+
+    def __init__(self, rows=10, cols=40):
+        self.size = (rows, cols)
+        self.calls = []
+
+    def getmaxyx(self):
+        return self.size
+
+    def clear(self):
+        self.calls.append(("clear",))
+
+    def move(self, y, x):
+        self.calls.append(("move", y))
+
+    def clrtoeol(self):
+        pass
+
+    def addstr(self, y, x, text, attr=0):
+        self.calls.append(("addstr", y, x, text))
+
+    def refresh(self):
+        pass
+
+
+@pytest.fixture
+def vis():
+    vis = GameVisualizer()
+    yield vis
+    vis.activity.close()
+
+
+def agents(*rows):
+    return [{'name': name, 'coin': coin, 'time': time} for name, coin, time in rows]
+
+
+def test_update_state_only_publishes(vis):
+    game = agents(('a', 10500, 0.01), ('b', 10100, 0.0))
+    vis.update_state(9, 20, game, None)
+    assert vis.published == (9, 20, [('a', 10500, 0.01), ('b', 10100, 0.0)])
+    assert vis.current_state is None
+    game[0]['coin'] = 0  # the snapshot doesn't share the engine's records
+    assert vis.published[2][0][1] == 10500
+
+
+def test_view_is_rebuilt_only_for_new_snapshots(vis):
+    assert vis._view() is None
+    vis.update_state(9, 20, agents(('a', 10500, 0.01), ('b', 10100, 0.0)), None)
+    view = vis._view()
+    assert view['round'] == 9 and view['total_rounds'] == 20
+    # b: $10/round at the 0.001ms floor beats a: $50/round at 1ms
+    assert [a['name'] for a in view['agents']] == ['b', 'a']
+    assert view['agents'][1]['profit_per_round'] == 50.0
+    assert view['agents'][1]['time_per_round'] == pytest.approx(1.0)
+    assert vis._view() is view
+
+    vis.update_state(10, 20, agents(('a', 10500, 0.01), ('b', 10100, 0.0)), None)
+    assert vis._view() is not view
+
+
+def test_flush_redraws_only_changed_rows(vis):
+    vis.stdscr = screen = FakeScreen()
+    vis._put(0, 0, "title")
+    vis._put(1, 0, "row one")
+    vis._put(1, 10, "more")
+    vis._flush()
+    assert screen.calls[0] == ("clear",)
+    assert [c for c in screen.calls if c[0] == "addstr"] == [
+        ("addstr", 0, 0, "title"), ("addstr", 1, 0, "row one"), ("addstr", 1, 10, "more")]
+
+    screen.calls = []
+    vis._put(0, 0, "title")
+    vis._put(1, 0, "row two")
+    vis._flush()
+    assert screen.calls == [("move", 1), ("addstr", 1, 0, "row two")]
+
+    # a row left out of the frame is cleared; text is clipped to the screen
+    screen.calls = []
+    vis._put(1, 0, "row two")
+    vis._put(2, 30, "x" * 20)
+    vis._flush()
+    assert screen.calls == [("move", 0), ("move", 2), ("addstr", 2, 30, "x" * 9)]
+
+    # a resize repaints everything
+    screen.size = (20, 40)
+    screen.calls = []
+    vis._put(1, 0, "row two")
+    vis._flush()
+    assert screen.calls == [("clear",), ("move", 1), ("addstr", 1, 0, "row two")]
+
+
+def small_world(monkeypatch):
+    import sim
+    monkeypatch.setattr(sim, "node_count", 30)
+    monkeypatch.setattr(sim, "num_rounds", 8)
+
+
+def test_batch_run_seeds_by_index(monkeypatch):
+    small_world(monkeypatch)
+    def coin(result):
+        game, total_rounds = result
+        assert total_rounds == 8 and all(set(a) == {'name', 'coin', 'time'} for a in game)
+        return sorted((a['name'], a['coin']) for a in game)
+
+    # output file options are dropped, not passed to the worker's game
+    first = coin(batch_run(0, {'seed': 38, 'record': True}))
+    assert first == coin(batch_run(0, {'seed': 38}))
+    assert first != coin(batch_run(1, {'seed': 38}))
+
+
+def test_merged_stats_match_one_collector():
+    games = [agents(('a', 10000 + 10 * i, 0.001 * (i + 1)), ('b', 10400 - 10 * i, 0.002)) for i in range(6)]
+    whole, left, right = SimStats(), SimStats(), SimStats()
+    for i, game in enumerate(games):
+        whole.record_run(game, 20)
+        (left if i % 2 else right).record_run(game, 20)
+    merged = left.merge(right)
+    assert (merged.runs, dict(merged.wins)) == (whole.runs, dict(whole.wins))
+    for metric in SimStats.METRICS:
+        for name in 'ab':
+            mine, theirs = getattr(merged, metric)[name], getattr(whole, metric)[name]
+            assert mine.n == theirs.n
+            assert mine.mean == pytest.approx(theirs.mean)
+            assert mine.variance == pytest.approx(theirs.variance)
+
+
+def test_batch_carries_on_past_failed_games(vis, monkeypatch):
+    small_world(monkeypatch)
+    vis.jobs = 1
+    vis.sim_options = {'round_model': 'nonsense'}
+    vis._run_batch(2)
+    assert (vis.failed_runs, vis.stats.runs, vis.runs_to_do) == (2, 0, 0)
+
+    vis.sim_options = {'seed': 38}
+    vis._run_batch(2)
+    assert (vis.failed_runs, vis.stats.runs) == (2, 2)
+    assert vis.published[0] == 7
@@ -1,3 +1,11 @@
+"""
+Console output for the sim, switched by the module flags below.
+
+Set flags with configure(), not by assigning them: it also rebinds the
+print functions, and the ones whose flags are off become a shared no-op,
+so the sim's per-turn calls don't even test a flag.
+"""
+
 import logging
 
 # Log everything, and send it to stderr.
@@ -17,7 +25,7 @@ agent_current_shop = False
 round_info = False
 time_logging = False
 
-def print_agent(agent,move,current_shop):
+def _print_agent(agent,move,current_shop):
     if agent_name == agent["name"] or other_agents:
         print("--------------------------------------------")
         print("Agent: " + agent["name"])
@@ -35,7 +43,7 @@ def print_agent(agent,move,current_shop):
             print("Current Shop: ")
             print(current_shop)
 
-def invalid(agent, message='', exc=None):
+def _invalid(agent, message='', exc=None):
     if agent_name == agent["name"] or other_agents:
         if message:
             print("Invalid Move(%s): %s" % (agent['name'], message))
@@ -45,25 +53,25 @@ def invalid(agent, message='', exc=None):
 
 
 
-def print_node(shop_node, snode):
+def _print_node(shop_node, snode):
     if shops:
         print("NODE: " + str(shop_node))
         print(snode)
 
-def print_nodes(world_shops):
+def _print_nodes(world_shops):
     if shops:
         for shop_nodes,node in world_shops.items():
-            print_node(shop_nodes,node)
+            _print_node(shop_nodes,node)
         print("")
 
 
-def print_round_start(round_number):
+def _print_round_start(round_number):
     if round_info:
         print("")
         print("================= Round: " +  str(round_number) + "============================")
         print("")
 
-def print_round_end():
+def _print_round_end():
     if round_info:
         print("")
         print("==========================================================================")
@@ -85,3 +93,31 @@ def print_results(world_agents):
         print(sorted(
             [(a["name"], "%.5f" % a["time"]) for a in world_agents],
             key = lambda a: a[1]))
+
+
+def noop(*args, **kwargs):
+    """What disabled print functions are bound to; callers may test for it and skip the call."""
+
+
+FLAGS = ("quiet", "shops", "agent_name", "other_agents", "agent_coin", "agent_position",
+         "agent_resources", "agent_move", "agent_current_shop", "round_info", "time_logging")
+
+
+def configure(**flags):
+    """Set flags by name and rebind the print functions to match."""
+    g = globals()
+    for name, value in flags.items():
+        if name not in FLAGS:
+            raise TypeError("unknown logger flag %r" % name)
+        g[name] = value
+
+    per_agent = bool(agent_name or other_agents)
+    g['print_agent'] = _print_agent if per_agent else noop
+    g['invalid'] = _invalid if per_agent else noop
+    g['print_node'] = _print_node if shops else noop
+    g['print_nodes'] = _print_nodes if shops else noop
+    g['print_round_start'] = _print_round_start if round_info else noop
+    g['print_round_end'] = _print_round_end if round_info else noop
+
+
+configure()
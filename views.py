@@ -0,0 +1,96 @@
+"""
+World views handed to agents as state["world"].
+
+An agent whose manifest (agents/registry.py) declares a radius k gets only
+the nodes within k hops of where it stands, so the engine's per-turn cost
+follows the size of the neighbourhood, not of the world: a radius-1 agent
+costs the same on a 400-node world as on a 100k-node one.
+
+    world = neighbourhood(world_graph, world_shops, position, 2)
+    world[position]["neighbours"], world[n2]["resources"]   # n2 two hops out
+    world[far_away]                                          # KeyError
+
+The view is a plain dict built before the agent's clock starts. Building
+entries on first lookup instead (a dict with __missing__) was tried: it
+moves the work into the agent's timed call, and made depth2_global_all
+~40% slower per round by its own measure.
+
+Whole-world agents get a fresh dict of every node each turn, unless
+sim.world_proxy is set: then one read-only WorldProxy per game stands in
+for it, making NodeViews on lookup. That costs nothing per turn and no
+memory per node, but each lookup is Python code in the agent's timed call;
+python benchmark.py --world-proxy shows where it breaks even.
+"""
+
+from collections.abc import Mapping
+
+
+def within(world_graph, centre, radius):
+    """Nodes at most radius hops from centre, centre first."""
+    if radius == 1:
+        return (centre, *world_graph[centre])
+    nodes = {centre: None}  # dict keeps hop order
+    frontier = [centre]
+    for _ in range(radius):
+        reached = []
+        for w in frontier:
+            for n in world_graph[w]:
+                if n not in nodes:
+                    nodes[n] = None
+                    reached.append(n)
+        frontier = reached
+    return nodes
+
+
+def neighbourhood(world_graph, world_shops, centre, radius):
+    """The state["world"] of nodes within radius hops of centre."""
+    return {w: {"neighbours": world_graph[w], "resources": world_shops[w]}
+            for w in within(world_graph, centre, radius)}
+
+
+class NodeView(Mapping):
+    """One node of a WorldProxy: view["neighbours"], view["resources"]."""
+    __slots__ = ("neighbours", "resources")
+    _keys = ("neighbours", "resources")
+
+    def __init__(self, neighbours, resources):
+        self.neighbours = neighbours
+        self.resources = resources
+
+    def __getitem__(self, key):
+        if key == "resources":
+            return self.resources
+        if key == "neighbours":
+            return self.neighbours
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return 2
+
+
+class WorldProxy(Mapping):
+    """Read-only node -> NodeView mapping over the engine's graph and shops.
+
+    Views are made on each lookup and hold references, not copies, so one
+    proxy serves every agent for the whole game.
+    """
+    __slots__ = ("_graph", "_shops")
+
+    def __init__(self, world_graph, world_shops):
+        self._graph = world_graph
+        self._shops = world_shops
+
+    def __getitem__(self, w):
+        return NodeView(self._graph[w], self._shops[w])
+
+    def __contains__(self, w):
+        return w in self._graph
+
+    def __iter__(self):
+        return iter(self._graph)
+
+    def __len__(self):
+        return len(self._graph)
@@ -4,70 +4,107 @@ Uses curses for interactive display with play/pause/step controls.
 """
 
 import curses
+import os
+import random
 import threading
 import time
 from collections import deque, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
-STARTING_COIN = 10000  # Must match sim.py
+from async_log import AsyncLog
+from metrics import agent_metrics, per_run, ranking
+from streaming_stats import Running
 
+FPS = 20  # Redraw rate; the sim never waits on drawing
 
-def calc_efficiency(ppr, tpr_ms):
-    """Calculate efficiency: profit per round per ms of CPU time."""
-    if tpr_ms <= 0.001:  # Avoid division by zero
-        return ppr * 1000  # Treat as 0.001ms
-    return ppr / tpr_ms
+
+# run_sim options that name output files; parallel batch games would
+# write over each other's, so batches leave them out
+BATCH_SKIPS = ("debug_log", "record", "ledger", "checkpoint", "resume")
+
+
+def batch_run(index, options):
+    """One headless game in a pool worker, reduced to what SimStats needs.
+    options are the run_sim keyword arguments the visualizer was started
+    with; a seeded batch plays seed + index + 1."""
+    import sim
+    options = {key: value for key, value in options.items() if key not in BATCH_SKIPS}
+    if options.get("seed") is not None:
+        options["seed"] += index + 1
+    else:
+        random.seed()  # forked workers would otherwise all play the same game
+    result = []
+
+    def on_round_end(round_num, total_rounds, agents, world_shops):
+        if round_num == total_rounds - 1:
+            result.append(([{'name': a['name'], 'coin': a['coin'], 'time': a['time']} for a in agents], total_rounds))
+        return True
+
+    options["quiet"] = True
+    sim.run_sim(observer={'on_round_end': on_round_end}, **options)
+    return result[0] if result else None
 
 
 class SimStats:
-    """Track aggregate statistics across multiple simulation runs."""
+    """Track aggregate statistics across multiple simulation runs.
+
+    Each metric is a streaming_stats.Running per agent, so memory doesn't
+    grow with runs and confidence intervals come for free.
+    """
+
+    METRICS = ('coin', 'ppr', 'tpr', 'efficiency')
 
     def __init__(self):
         self.runs = 0
         self.wins = defaultdict(int)
-        self.total_coins = defaultdict(int)
-        self.total_profit_per_round = defaultdict(float)
-        self.total_time_per_round = defaultdict(float)  # in ms
-        self.total_efficiency = defaultdict(float)
+        self.coin = defaultdict(Running)
+        self.ppr = defaultdict(Running)
+        self.tpr = defaultdict(Running)  # in ms
+        self.efficiency = defaultdict(Running)
 
     def record_run(self, agents, total_rounds):
         """Record results from a completed simulation."""
         self.runs += 1
 
-        # Calculate efficiency for each agent and sort by it
-        agents_with_eff = []
-        for agent in agents:
-            profit = agent['coin'] - STARTING_COIN
-            ppr = profit / total_rounds if total_rounds > 0 else 0
-            tpr_ms = (agent['time'] / total_rounds * 1000) if total_rounds > 0 else 0
-            eff = calc_efficiency(ppr, tpr_ms)
-            agents_with_eff.append((agent, eff, ppr, tpr_ms))
-
         # Winner is determined by efficiency ($/round/ms)
-        sorted_agents = sorted(agents_with_eff, key=lambda x: x[1], reverse=True)
-
-        # Record winner
-        if sorted_agents:
-            self.wins[sorted_agents[0][0]['name']] += 1
+        rows, winner = agent_metrics(agents, total_rounds)
+        if winner is not None:
+            self.wins[agents[winner]['name']] += 1
 
         # Record stats for each agent
-        for agent, eff, ppr, tpr_ms in agents_with_eff:
+        for agent, ppr, tpr_ms, eff in rows:
             name = agent['name']
-            self.total_coins[name] += agent['coin']
-            self.total_profit_per_round[name] += ppr
-            self.total_time_per_round[name] += tpr_ms
-            self.total_efficiency[name] += eff
+            self.coin[name].add(agent['coin'])
+            self.ppr[name].add(ppr)
+            self.tpr[name].add(tpr_ms)
+            self.efficiency[name].add(eff)
+
+    def merge(self, other):
+        """Fold in another SimStats, e.g. one filled in a worker process."""
+        self.runs += other.runs
+        for name, count in other.wins.items():
+            self.wins[name] += count
+        for metric in self.METRICS:
+            mine = getattr(self, metric)
+            for name, stats in getattr(other, metric).items():
+                mine[name].merge(stats)
+        return self
 
     def get_avg_coin(self, name):
-        return self.total_coins[name] / self.runs if self.runs else 0
+        return self.coin[name].mean
 
     def get_avg_ppr(self, name):
-        return self.total_profit_per_round[name] / self.runs if self.runs else 0
+        return self.ppr[name].mean
 
     def get_avg_tpr(self, name):
-        return self.total_time_per_round[name] / self.runs if self.runs else 0
+        return self.tpr[name].mean
 
     def get_avg_efficiency(self, name):
-        return self.total_efficiency[name] / self.runs if self.runs else 0
+        return self.efficiency[name].mean
+
+    def get_ci(self, metric, name, confidence=0.95):
+        """Half-width of the confidence interval for an agent's mean of metric."""
+        return getattr(self, metric)[name].ci(confidence)
 
     def get_win_rate(self, name):
         return self.wins[name] / self.runs if self.runs else 0
@@ -84,44 +121,88 @@ class GameVisualizer:
         self.quit_requested = False
         self.restart_requested = False
         self.runs_to_do = 0  # Queue of simulations to run
-
-        self.current_state = None
+        self.cancel_requested = False  # Stop the running batch
+        self.jobs = os.cpu_count() or 1  # Batch worker processes
+        self.sim_options = {}  # run_sim keyword arguments for batch games
+        self.failed_runs = 0  # Batch games that raised or lost their worker
+
+        self.current_state = None  # leaderboard view, built by the renderer
+        self.published = None  # latest round snapshot, swapped in by the sim thread
+        self._viewed = None  # the snapshot current_state was built from
         self.activity_log = deque(maxlen=50)
+        # Formatting and the lock move to a writer thread; under a flood of
+        # actions it samples rather than slow the sim down
+        self.activity = AsyncLog(self._append_activity, max_size=1024, policy="sample",
+                                 batch_size=256)
         self.stats = SimStats()
 
         self.lock = threading.Lock()
         self.stdscr = None
+        self.controls = " [SPACE] Play/Pause  [N] Step  [M] Max  [+/-] Speed  [R] Restart  [Q] Quit "
+        self._frame = {}  # y -> [(x, text, attr)] being composed
+        self._shown = {}  # what's on screen now, per row
+        self._screen_size = None
+        self._next_frame = 0
 
     def reset_for_new_run(self):
         """Reset state for a new simulation run."""
         self.current_state = None
+        self.published = None
+        self._viewed = None
+        self.activity.flush()
         self.activity_log.clear()
         self.restart_requested = False
         self.playing = False
         self.step_requested = False
 
     def log_activity(self, message):
+        self.activity.push(message)
+
+    def _append_activity(self, batch):
+        # Only the last maxlen lines can survive, don't format the rest
+        keep = self.activity_log.maxlen
+        lines = deque(maxlen=keep)
+        for entry in batch[-keep:]:
+            if type(entry) is str:
+                lines.append(entry)
+            elif type(entry) is tuple:
+                lines.append("%s: %s %s" % entry)
+            else:  # a RoundEvents batch
+                lines.extend("%s: %s %s" % action for action in entry.actions())
         with self.lock:
-            self.activity_log.append(message)
+            self.activity_log.extend(lines)
 
     def update_state(self, round_num, total_rounds, agents, world_shops):
-        with self.lock:
-            # Calculate metrics for each agent
-            agents_with_metrics = []
-            for agent in agents:
-                a = dict(agent)
-                rounds = round_num + 1
-                a['time_per_round'] = (agent['time'] / rounds * 1000) if rounds > 0 else 0  # ms
-                profit = agent['coin'] - STARTING_COIN
-                a['profit_per_round'] = profit / rounds if rounds > 0 else 0
-                a['efficiency'] = calc_efficiency(a['profit_per_round'], a['time_per_round'])
-                agents_with_metrics.append(a)
-
-            self.current_state = {
-                'round': round_num,
-                'total_rounds': total_rounds,
-                'agents': sorted(agents_with_metrics, key=lambda a: a['efficiency'], reverse=True),
-            }
+        """Called on the sim thread: snapshot the numbers and swap the reference.
+        No lock and no sorting; the renderer builds the leaderboard from
+        whichever snapshot is latest when it next draws."""
+        self.published = (round_num, total_rounds, [(a['name'], a['coin'], a['time']) for a in agents])
+
+    def _view(self):
+        """Leaderboard for the latest snapshot, rebuilt only when a new one is published."""
+        published = self.published
+        if published is not self._viewed:
+            self._viewed = published
+            if published is None:
+                self.current_state = None
+            else:
+                round_num, total_rounds, snapshot = published
+                names = [name for name, _, _ in snapshot]
+                ppr, tpr, eff = per_run([coin for _, coin, _ in snapshot], [spent for _, _, spent in snapshot],
+                                        round_num + 1)
+                agents_by_eff = [{
+                    'name': names[i],
+                    'coin': snapshot[i][1],
+                    'time_per_round': float(tpr[i]),  # ms
+                    'profit_per_round': float(ppr[i]),
+                    'efficiency': float(eff[i]),
+                } for i in ranking(eff)]
+                self.current_state = {
+                    'round': round_num,
+                    'total_rounds': total_rounds,
+                    'agents': agents_by_eff,
+                }
+        return self.current_state
 
     def record_results(self, agents, total_rounds):
         """Called when simulation ends to record stats."""
@@ -150,27 +231,68 @@ class GameVisualizer:
             time.sleep(0.05)
 
     def _put(self, y, x, text, attr=0):
-        """Safely add string to screen."""
-        try:
-            max_y, max_x = self.stdscr.getmaxyx()
-            if 0 <= y < max_y and 0 <= x < max_x:
-                self.stdscr.addstr(y, x, text[:max_x - x - 1], attr)
-        except curses.error:
-            pass
+        """Add a string to the frame being composed; _flush draws it."""
+        self._frame.setdefault(y, []).append((x, text, attr))
 
     def _hline(self, y, width):
         self._put(y, 0, "-" * width)
 
+    def _tick(self, stdscr):
+        """Wait for a key until the next frame is due, drawing it if it is.
+        Returns the key, or -1."""
+        wait = self._next_frame - time.monotonic()
+        stdscr.timeout(max(0, int(wait * 1000)))
+        try:
+            key = stdscr.getch()
+        except curses.error:
+            key = -1
+        now = time.monotonic()
+        if now >= self._next_frame:
+            self._draw()
+            self._next_frame = max(self._next_frame + 1 / FPS, now)
+        return key
+
     def _draw(self):
         """Render current state."""
         if not self.stdscr:
             return
-
+        self._compose()
+        self._flush()
+
+    def _flush(self):
+        """Redraw only the rows that differ from what's on screen."""
+        frame, self._frame = self._frame, {}
+        stdscr = self.stdscr
+        size = stdscr.getmaxyx()
+        if size != self._screen_size:
+            self._screen_size = size
+            self._shown = {}
+            stdscr.clear()
+        max_y, max_x = size
+        shown = self._shown
+        for y in set(frame) | set(shown):
+            row = frame.get(y)
+            if row == shown.get(y) or not 0 <= y < max_y:
+                continue
+            try:
+                stdscr.move(y, 0)
+                stdscr.clrtoeol()
+                for x, text, attr in row or ():
+                    if 0 <= x < max_x:
+                        stdscr.addstr(y, x, text[:max_x - x - 1], attr)
+            except curses.error:
+                pass
+            if row:
+                shown[y] = row
+            else:
+                shown.pop(y, None)
+        stdscr.refresh()
+
+    def _compose(self):
+        """Lay out the current state into the frame."""
         max_y, max_x = self.stdscr.getmaxyx()
-        self.stdscr.erase()
-
+        state = self._view()
         with self.lock:
-            state = self.current_state
             logs = list(self.activity_log)
             stats = self.stats
 
@@ -184,6 +306,8 @@ class GameVisualizer:
         runs_str = f"Runs: {stats.runs}" if stats.runs else ""
         if self.runs_to_do > 0:
             runs_str += f" (+{self.runs_to_do} queued)"
+        if self.failed_runs:
+            runs_str += f"  Failed: {self.failed_runs}"
 
         title = f" EKON  {rnd}  [{status}]  Speed: {speed}  {runs_str} "
         self._put(0, 0, "=" * max_x, curses.A_BOLD)
@@ -230,10 +354,10 @@ class GameVisualizer:
             self._hline(stats_y, max_x)
             self._put(stats_y + 1, 0, f" AGGREGATE ({stats.runs} runs)", curses.A_BOLD | curses.A_UNDERLINE)
             # Column headers for aggregate
-            self._put(stats_y + 2, 0, "     NAME                         EFF($/r/ms)   WINS     WR%    AVG COIN      $/r        ms/r", curses.A_DIM)
+            self._put(stats_y + 2, 0, "     NAME                         EFF($/r/ms)   WINS     WR%    AVG COIN      $/r  (95% CI)        ms/r", curses.A_DIM)
 
             # Show agents sorted by average efficiency
-            all_agents = list(stats.total_efficiency.keys())
+            all_agents = list(stats.efficiency.keys())
             agents_by_eff = sorted(all_agents, key=lambda n: stats.get_avg_efficiency(n), reverse=True)
 
             for i, name in enumerate(agents_by_eff[:5]):
@@ -246,7 +370,8 @@ class GameVisualizer:
                 avg_tpr = stats.get_avg_tpr(name)
                 avg_eff = stats.get_avg_efficiency(name)
                 display_name = name[:28].ljust(28)
-                line = f" {i+1}. {display_name} {avg_eff:>12,.1f}   {stats.wins[name]:>4}   {wr:>5.1f}% ${avg_coin:>12,.0f} {avg_ppr:>+8,.0f} {avg_tpr:>10.4f}"
+                ppr_ci = stats.get_ci('ppr', name)
+                line = f" {i+1}. {display_name} {avg_eff:>12,.1f}   {stats.wins[name]:>4}   {wr:>5.1f}% ${avg_coin:>12,.0f} {avg_ppr:>+8,.0f} ±{ppr_ci:<7,.0f} {avg_tpr:>10.4f}"
                 self._put(y, 0, line)
             log_start = stats_y + 3 + min(5, len(agents_by_eff)) + 1
         else:
@@ -266,9 +391,7 @@ class GameVisualizer:
 
         # Controls
         self._hline(max_y - 2, max_x)
-        self._put(max_y - 1, 0, " [SPACE] Play/Pause  [N] Step  [M] Max  [+/-] Speed  [R] Restart  [Q] Quit ", curses.A_REVERSE)
-
-        self.stdscr.refresh()
+        self._put(max_y - 1, 0, self.controls, curses.A_REVERSE)
 
     def _handle_key(self, key):
         """Process keyboard input."""
@@ -290,28 +413,40 @@ class GameVisualizer:
             self.max_speed = False
             self.tick_rate = min(5.0, self.tick_rate + 0.1)
 
-    def _run_batch(self, sim_func, count):
-        """Run multiple simulations in max speed mode."""
-        old_max_speed = self.max_speed
-        old_playing = self.playing
-        self.max_speed = True
-        self.playing = True
-
-        for i in range(count):
-            if self.quit_requested:
-                break
-            self.reset_for_new_run()
-            self.runs_to_do = count - i - 1
-            self.playing = True
-            self.max_speed = True
-            sim_func(self)
-
-        self.runs_to_do = 0
-        self.max_speed = old_max_speed
-        self.playing = old_playing
-
-    def run(self, sim_func):
-        """Run the visualizer with simulation function."""
+    def _run_batch(self, count):
+        """Run count games on a process pool, adding each to the stats as it
+        finishes. The leaderboard shows the latest finished game. Cancelling
+        drops queued games; ones already running finish and are ignored.
+        A game that raises, or whose worker dies, counts as failed and the
+        batch carries on."""
+        self.cancel_requested = False
+        self.runs_to_do = count
+        executor = ProcessPoolExecutor(max_workers=min(self.jobs, count))
+        pending = {executor.submit(batch_run, i, self.sim_options) for i in range(count)}
+        try:
+            while pending and not (self.quit_requested or self.cancel_requested):
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.runs_to_do -= 1
+                    try:
+                        result = future.result()
+                    except Exception as e:  # BrokenProcessPool fails every game left on the pool
+                        self.failed_runs += 1
+                        self.log_activity(f"Batch game failed: {e!r}")
+                        continue
+                    if result:
+                        agents, total_rounds = result
+                        self.update_state(total_rounds - 1, total_rounds, agents, None)
+                        self.record_results(agents, total_rounds)
+        finally:
+            self.runs_to_do = 0
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, sim_func, sim_options=None):
+        """Run the visualizer with simulation function. sim_options are the
+        run_sim keyword arguments sim_func uses, for the [T]/[H] batches to
+        play the same kind of game (less BATCH_SKIPS)."""
+        self.sim_options = dict(sim_options or {})
 
         def curses_main(stdscr):
             self.stdscr = stdscr
@@ -326,16 +461,11 @@ class GameVisualizer:
                 sim_thread = threading.Thread(target=lambda: sim_func(self), daemon=True)
                 sim_thread.start()
 
-                # Main loop
+                # Main loop: keys as they come, a frame every 1/FPS
                 while not self.quit_requested and not self.restart_requested:
-                    try:
-                        key = stdscr.getch()
-                        if key != -1:
-                            self._handle_key(key)
-                    except curses.error:
-                        pass
-
-                    self._draw()
+                    key = self._tick(stdscr)
+                    if key != -1:
+                        self._handle_key(key)
 
                     # Sim ended naturally
                     if not sim_thread.is_alive() and not self.restart_requested:
@@ -344,14 +474,82 @@ class GameVisualizer:
 
         curses.wrapper(curses_main)
 
+    def run_replay(self, replay):
+        """Scrub through a recording (see replay.py); no agents are run."""
+        self.controls = " [SPACE] Play/Pause  [</>] -/+1  [,/.] -/+10  [HOME/END] Ends  [M] Max  [+/-] Speed  [Q] Quit "
+        last = len(replay) - 1
+
+        def show(round_number, previous):
+            agents, shops = replay.seek(round_number)
+            if round_number == previous + 1:
+                for action in replay.actions(round_number):
+                    self.activity.push(action)
+            else:
+                self.activity.flush()
+                with self.lock:
+                    self.activity_log.clear()
+            self.update_state(round_number, replay.total_rounds, agents, shops)
+
+        def curses_main(stdscr):
+            self.stdscr = stdscr
+            curses.curs_set(0)
+            stdscr.nodelay(True)
+            stdscr.timeout(50)
+            stdscr.keypad(True)
+
+            shown = -1
+            target = 0
+            next_tick = 0
+            while not self.quit_requested:
+                if target != shown:
+                    show(target, shown)
+                    shown = target
+
+                key = self._tick(stdscr)
+                if key in (ord('<'), curses.KEY_LEFT):
+                    target = max(0, shown - 1)
+                elif key in (ord('>'), curses.KEY_RIGHT) or key in (ord('n'), ord('N')):
+                    target = min(last, shown + 1)
+                elif key == ord(','):
+                    target = max(0, shown - 10)
+                elif key == ord('.'):
+                    target = min(last, shown + 10)
+                elif key == curses.KEY_HOME:
+                    target = 0
+                elif key == curses.KEY_END:
+                    target = last
+                elif key != -1:
+                    self._handle_key(key)
+
+                if self.playing and shown < last and time.monotonic() >= next_tick:
+                    target = shown + 1
+                    next_tick = time.monotonic() + (0 if self.max_speed else self.tick_rate)
+
+        curses.wrapper(curses_main)
+
+    def _watch_batch(self, stdscr, count):
+        """Keep drawing while a batch runs; C cancels it, Q quits."""
+        controls = self.controls
+        self.controls = " [C] Cancel batch  [Q] Quit "
+        batch_thread = threading.Thread(target=lambda: self._run_batch(count), daemon=True)
+        batch_thread.start()
+        while batch_thread.is_alive() and not self.quit_requested:
+            key = self._tick(stdscr)
+            if key == ord('q') or key == ord('Q'):
+                self.quit_requested = True
+            elif key == ord('c') or key == ord('C'):
+                self.cancel_requested = True
+        batch_thread.join()
+        self.controls = controls
+
     def _show_end_screen(self, stdscr, sim_func):
         """Show end-of-simulation options."""
-        self._draw()
+        self._compose()
         prompt = " [1] +1  [T] +10  [H] +100  [Q] Quit "
         self._put(self.stdscr.getmaxyx()[0] - 1, 0,
                   prompt.ljust(self.stdscr.getmaxyx()[1] - 1),
                   curses.A_REVERSE | curses.A_BOLD)
-        self.stdscr.refresh()
+        self._flush()
 
         stdscr.nodelay(False)
         while not self.quit_requested:
@@ -365,35 +563,13 @@ class GameVisualizer:
             elif key == ord('t') or key == ord('T'):
                 # Run 10 in background with display updates
                 stdscr.nodelay(True)
-                stdscr.timeout(50)
-                batch_thread = threading.Thread(
-                    target=lambda: self._run_batch(sim_func, 10), daemon=True)
-                batch_thread.start()
-                while batch_thread.is_alive() and not self.quit_requested:
-                    try:
-                        key = stdscr.getch()
-                        if key == ord('q') or key == ord('Q'):
-                            self.quit_requested = True
-                    except curses.error:
-                        pass
-                    self._draw()
+                self._watch_batch(stdscr, 10)
                 if not self.quit_requested:
                     self._show_end_screen(stdscr, sim_func)
                 return
             elif key == ord('h') or key == ord('H'):
                 stdscr.nodelay(True)
-                stdscr.timeout(50)
-                batch_thread = threading.Thread(
-                    target=lambda: self._run_batch(sim_func, 100), daemon=True)
-                batch_thread.start()
-                while batch_thread.is_alive() and not self.quit_requested:
-                    try:
-                        key = stdscr.getch()
-                        if key == ord('q') or key == ord('Q'):
-                            self.quit_requested = True
-                    except curses.error:
-                        pass
-                    self._draw()
+                self._watch_batch(stdscr, 100)
                 if not self.quit_requested:
                     self._show_end_screen(stdscr, sim_func)
                 return
@@ -414,10 +590,8 @@ def create_observer(visualizer):
 
         return visualizer.should_continue()
 
-    def on_agent_action(agent_name, action_type, details):
-        visualizer.log_activity(f"{agent_name}: {action_type} {details}")
-
     return {
         'on_round_end': on_round_end,
-        'on_agent_action': on_agent_action,
+        'on_round_events': visualizer.activity.push,
+        'events': ('trades', 'moves'),
     }